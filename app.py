@@ -7,9 +7,9 @@ import random
 import os
 from datetime import datetime, date
 from src.data_processor import load_data, preprocess_data  # type: ignore
-from src.model import ExpenseCategorizer, AnomalyDetector  # type: ignore
-from src.utils import render_charts, get_random_quote, format_currency, convert_amount  # type: ignore
-from src.subscription_detector import SubscriptionDetector  # type: ignore
+from src.bank_formats import detect_date_format, parse_dates  # type: ignore
+from src.model import ExpenseCategorizer, AmountForest, AnomalyDetector  # type: ignore
+from src.utils import render_charts, get_random_quote, format_currency, convert_amount, user_data_path  # type: ignore
 from src.goals import GoalManager  # type: ignore
 from src.financial_health import calculate_financial_health_score  # type: ignore
 from src.advisor import FinancialAdvisor  # type: ignore
@@ -18,6 +18,15 @@ from src.gamification import BadgeManager  # type: ignore
 from src.auth import signup_user, login_user  # type: ignore
 from src.utils import generate_excel, generate_pdf  # type: ignore
 from src.business_model import BusinessExpenseCategorizer  # type: ignore
+from src.training_worker import get_training_worker  # type: ignore
+from src.model_registry import session_memory_report  # type: ignore
+from src.anomaly_baselines import BaselineIndex, RunningStats  # type: ignore
+from src.merchant_index import MerchantIndex  # type: ignore
+from src.subscription_state import SubscriptionState  # type: ignore
+from src.ingestion import account_name, ingest_csv, ingest_files  # type: ignore
+from src.upload_cache import UploadCache  # type: ignore
+from src.dedup import FingerprintIndex  # type: ignore
+from src.transaction_schema import apply_schema, memory_report, unapply_schema  # type: ignore
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="MoneyGroww", layout="wide", initial_sidebar_state="expanded")
@@ -274,7 +283,10 @@ div[data-testid="stMetric"]:hover {{
 if 'data' not in st.session_state: st.session_state.data = None
 if 'categorizer' not in st.session_state: 
     st.session_state.categorizer = ExpenseCategorizer()
-    st.session_state.categorizer.load_model() # Try to load existing model
+    st.session_state.categorizer.load_model() # Shared process-wide, unpickled once
+else:
+    # Pick up a model retrained by another session (cheap when unchanged)
+    st.session_state.categorizer.sync_shared_model()
 if 'goal_manager' not in st.session_state: st.session_state.goal_manager = GoalManager()
 if 'currency' not in st.session_state: st.session_state.currency = 'INR'
 
@@ -396,6 +408,12 @@ if col_side1.button("Logout", key="logout_btn", use_container_width=True):
     st.session_state.authenticated = False
     st.session_state.username = None
     st.session_state.app_mode = None # Clear mode on logout
+    st.session_state.anomaly_detector = None
+    st.session_state.merchant_index = None
+    st.session_state.subscription_state = None
+    st.session_state.upload_cache = None
+    st.session_state.multi_file_ids = None
+    st.session_state.fingerprint_index = None
     st.rerun()
 
 if col_side2.button("Switch Mode", key="switch_mode_btn", use_container_width=True):
@@ -426,6 +444,141 @@ page = st.sidebar.radio(
 st.sidebar.markdown("---")
 st.sidebar.info(f"✨ **Quote:**\n\n{get_random_quote()}")
 
+# --- MERCHANT INDEX ---
+def get_merchant_index():
+    """
+    Per-user index of merchant spelling variants, grown as new
+    descriptions appear and saved between sessions.
+    """
+    if st.session_state.get('merchant_index') is None:
+        index = MerchantIndex(user_data_path(st.session_state.username, 'merchant_index.joblib'))
+        index.load()
+        st.session_state.merchant_index = index
+    return st.session_state.merchant_index
+
+# --- RECURRING CHARGES ---
+def get_subscription_state(df):
+    """
+    Per-user recurring-charge state, brought up to date with any rows of
+    `df` it has not seen yet.
+    """
+    if st.session_state.get('subscription_state') is None:
+        state = SubscriptionState(user_data_path(st.session_state.username, 'subscription_state.joblib'),
+                                  merchant_index=get_merchant_index())
+        state.load()
+        st.session_state.subscription_state = state
+    state = st.session_state.subscription_state
+    if df is not None and state.update(df):
+        state.save()
+        get_merchant_index().save()
+    return state
+
+# --- ANOMALY BASELINES ---
+def get_anomaly_detector():
+    """
+    Per-user detector whose fitted forest, spending baselines and running
+    statistics persist between uploads.
+    """
+    if st.session_state.get('anomaly_detector') is None:
+        baselines = BaselineIndex(user_data_path(st.session_state.username, 'anomaly_baselines.pkl'),
+                                  merchant_index=get_merchant_index())
+        baselines.load()
+        running = RunningStats(user_data_path(st.session_state.username, 'anomaly_running.pkl'))
+        running.load()
+        forest = AmountForest(user_data_path(st.session_state.username, 'anomaly_forest.joblib'))
+        forest.load()
+        st.session_state.anomaly_detector = AnomalyDetector(baselines=baselines, running=running, forest=forest)
+    return st.session_state.anomaly_detector
+
+# --- UPLOAD CACHE ---
+# Uploads larger than this are streamed in chunks instead of read whole
+STREAM_UPLOAD_BYTES = 20 * 1024 * 1024
+
+def get_upload_cache():
+    """
+    Per-user cache of processed uploads, keyed by file bytes and model versions.
+    """
+    if st.session_state.get('upload_cache') is None:
+        st.session_state.upload_cache = UploadCache(user_data_path(st.session_state.username, 'upload_cache'))
+    return st.session_state.upload_cache
+
+def get_fingerprint_index():
+    """
+    Per-user index of ingested rows, used to drop overlapping statement rows.
+    """
+    if st.session_state.get('fingerprint_index') is None:
+        index = FingerprintIndex(user_data_path(st.session_state.username, 'fingerprints.bin'))
+        index.load()
+        st.session_state.fingerprint_index = index
+    return st.session_state.fingerprint_index
+
+def load_personal_upload(up_file, bank_format=None, account=None):
+    """
+    Cleans, categorizes and flags an uploaded statement, or loads the result
+    from the upload cache if the same bytes were processed by the same
+    models. Large files are streamed in chunks. `bank_format` names a
+    statement layout (see bank_formats); None detects it from the file.
+    Rows get `account` (default: account_name of the file name), as in
+    multi-file uploads, so overlapping statements are recognised either way.
+
+    Returns:
+        (DataFrame, caption or None)
+    """
+    categorizer = st.session_state.categorizer
+    ad = get_anomaly_detector()
+    cache = get_upload_cache()
+    data = up_file.getvalue()
+
+    def versions():
+        return categorizer.model_version, categorizer.confidence_threshold, ad.forest.fitted_at, bank_format
+
+    def with_account(df):
+        # Not part of the cache key: the same bytes may belong to another account
+        df['account'] = account or account_name(up_file.name)
+        return apply_schema(df)
+
+    cached = cache.get(cache.key(data, *versions()))
+    if cached is not None:
+        return with_account(cached), "Loaded from cache: this file was already processed by the current model."
+
+    if up_file.size > STREAM_UPLOAD_BYTES:
+        store = cache.store(cache.key(data, *versions()))
+        with st.spinner("Processing large file in chunks..."):
+            summary = ingest_csv(up_file, categorizer, ad, store, format=bank_format)
+        df = with_account(store.load())
+        # Fitting the forest changes its version; file the result under the new one
+        cache.commit(cache.key(data, *versions()), store)
+        return df, (f"Streamed {summary['rows']:,} rows in {summary['chunks']} chunks "
+                    f"(processing {summary['process_seconds']}s, anomalies {summary['anomaly_seconds']}s).")
+
+    df = apply_schema(categorizer.predict(preprocess_data(load_data(up_file, bank_format))))
+    categorizer.cache.save()
+    df = apply_schema(ad.detect_anomalies(df))
+    cache.put(cache.key(data, *versions()), df)
+    return with_account(df), None
+
+# --- BACKGROUND TRAINING ---
+training_worker = get_training_worker()
+
+def training_key(kind):
+    # Stable across reruns and sessions, so a user's edits coalesce into one job
+    return f"{kind}:{st.session_state.get('username') or 'anonymous'}"
+
+@st.fragment(run_every=2)
+def render_training_status():
+    """
+    Polls the background trainer so pages stay interactive while models fit.
+    """
+    for label, kind in [("Categorization model", "personal"), ("Business model", "business")]:
+        status = training_worker.status(training_key(kind))
+        if status['state'] in ('queued', 'running'):
+            st.info(f"⏳ {label}: {status['state']} ({status.get('rows', 0):,} rows)")
+        elif status['state'] == 'failed':
+            st.error(f"{label} training failed: {status.get('error')}")
+
+with st.sidebar:
+    render_training_status()
+
 # --- DATA PREP ---
 df = st.session_state.get('data', None)
 income_cats = ['Income', 'Salary', 'Deposit']
@@ -487,8 +640,9 @@ if page == "📊 Dashboard":
     """, unsafe_allow_html=True)
         
     # --- SMART ADVISOR INSIGHTS (Top 3) ---
-    advisor = FinancialAdvisor(df, st.session_state.salary)
+    advisor = FinancialAdvisor(df, st.session_state.salary, merchant_index=get_merchant_index())
     insights = advisor.get_combined_insights()
+    get_merchant_index().save()
     
     if insights:
         st.markdown("### ⚡ Actionable Insights")
@@ -692,6 +846,15 @@ if page == "📊 Dashboard":
             fig.update_layout(showlegend=False, margin={'t':0, 'b':0, 'l':0, 'r':0},
                               annotations=[{'text':"Exp", 'x':0.5, 'y':0.5, 'font_size':20, 'showarrow':False}])
             st.plotly_chart(fig, use_container_width=True)
+
+        # Next 30 days of recurring charges, from the saved recurrence state
+        upcoming = get_subscription_state(df).upcoming(30)
+        if not upcoming.empty:
+            st.subheader("Upcoming Bills")
+            st.metric("Due in 30 days", format_currency(convert_amount(upcoming['Amount'].sum(), curr), curr))
+            for _, bill in upcoming.head(5).iterrows():
+                st.caption(f"{bill['Date']:%d %b} · {bill['Description']} · "
+                           f"{format_currency(convert_amount(bill['Amount'], curr), curr)}")
             
         # --- BADGES ---
         st.subheader("Achievements")
@@ -730,7 +893,7 @@ elif page == "🧠 Smart Advisor":
     
     if df is None: st.warning("No Data"); st.stop()
     
-    advisor = FinancialAdvisor(df, st.session_state.salary)
+    advisor = FinancialAdvisor(df, st.session_state.salary, merchant_index=get_merchant_index())
     breakdown = advisor.analyze_50_30_20()
     
     st.markdown("### 📊 50/30/20 Rule Analysis")
@@ -773,6 +936,7 @@ elif page == "🧠 Smart Advisor":
         
         # Use combined insights here too
         insights = advisor.get_combined_insights()
+        get_merchant_index().save()
         
         # Grid-like layout for top 3 insights if possible, else list
         for i, insight in enumerate(insights):
@@ -939,8 +1103,12 @@ elif page == "🔍 Analysis":
         st.subheader("Anomaly Detection")
         # Ensure anomalies are checked
         if 'is_anomaly' not in df.columns:
-            ad = AnomalyDetector()
-            df = ad.detect_anomalies(df)
+            ad = get_anomaly_detector()
+            df = apply_schema(ad.detect_anomalies(df))
+            st.session_state.data = df
+        elif df['is_anomaly'].isna().any():
+            # Only rows added since the last check are scored
+            df = apply_schema(get_anomaly_detector().detect_new(df))
             st.session_state.data = df
             
         anomalies = df[df['is_anomaly'] == -1]
@@ -953,13 +1121,36 @@ elif page == "🔍 Analysis":
             st.dataframe(display_anomalies, use_container_width=True)
         else:
             st.success("No anomalies found.")
+
+        baseline_stats = get_anomaly_detector().baselines.stats
+        if not baseline_stats.empty:
+            with st.expander("Spending Baselines"):
+                st.caption("Typical spend per merchant and category, built up across uploads. "
+                           "Rows with enough history are judged against their own baseline.")
+                table = baseline_stats.reset_index()
+                table['Typical Range'] = table['q25'].round(0).astype(int).astype(str) + " - " + table['q75'].round(0).astype(int).astype(str)
+                table = table.rename(columns={'level': 'Level', 'key': 'Name', 'count': 'Transactions', 'median': 'Median'})
+                table['Median'] = table['Median'].round(2)
+                st.dataframe(table[['Level', 'Name', 'Transactions', 'Median', 'Typical Range']],
+                             use_container_width=True, hide_index=True)
             
     with t3:
         st.subheader("Recurring Subscriptions")
-        sd = SubscriptionDetector()
-        subs = sd.detect_subscriptions(df)
+        subscription_state = get_subscription_state(df)
+        subs = subscription_state.subscriptions()
         if not subs.empty:
+            st.caption("Weekly, monthly, quarterly and annual charges found from the spacing of each merchant's payments.")
             st.dataframe(subs, use_container_width=True)
+
+            st.subheader("Upcoming Bills")
+            horizon = st.slider("Days ahead", 7, 90, 30, key="upcoming_days")
+            upcoming = subscription_state.upcoming(horizon)
+            if not upcoming.empty:
+                st.metric("Expected Outflow", f"{upcoming['Amount'].sum():,.2f}")
+                upcoming['Date'] = upcoming['Date'].dt.strftime('%Y-%m-%d')
+                st.dataframe(upcoming, use_container_width=True, hide_index=True)
+            else:
+                st.info("No recurring charges due in this window.")
         else:
             st.info("No subscriptions detected.")
 
@@ -1029,11 +1220,15 @@ elif page == "📋 Transactions":
     if df is None: st.warning("No Data"); st.stop()
     assert df is not None
     
-    edited = st.data_editor(df, num_rows="dynamic", key="main_editor", use_container_width=True)
+    # Plain strings in the editor, so cells are not limited to existing categories
+    edited = st.data_editor(unapply_schema(df), num_rows="dynamic", key="main_editor", use_container_width=True)
     if st.button("Save Changes & Retrain"):
-        categorizer.train(edited)
-        st.session_state.data = edited
-        st.success("Updated!")
+        # Online update in the background: only learns from edited or newly labeled rows
+        training_worker.submit(training_key("personal"), categorizer, 'train_incremental', edited)
+        if 'is_anomaly' in edited.columns:
+            edited = get_anomaly_detector().detect_new(edited)
+        st.session_state.data = apply_schema(edited)
+        st.success("Updated! The model is learning your changes in the background.")
         st.rerun()
 
 
@@ -1281,12 +1476,8 @@ elif page == "🏢 Business Finance":
                 st.header("Data Management")
                 edited_biz = st.data_editor(biz_filtered, num_rows="dynamic", key="biz_editor")
                 if st.button("Retrain Business Model"):
-                    with st.spinner("Training..."):
-                        try:
-                            biz_categorizer.train(edited_biz)
-                            st.success("Business model retrained!")
-                        except Exception as e:
-                            st.error(f"Training failed: {e}")
+                    training_worker.submit(training_key("business"), biz_categorizer, 'train', edited_biz)
+                    st.success("Business model retraining started in the background.")
                 st.download_button(
                     label="Download Processed Data",
                     data=edited_biz.to_csv(index=False).encode('utf-8'),
@@ -1544,18 +1735,78 @@ elif page == "⚙️ Settings":
     if st.session_state.app_mode == "Individual":
         st.subheader("Data Upload")
         up_file = st.file_uploader("Upload Personal Expense CSV", type=['csv'])
+        format_names = {"Auto-detect": None, "Signed amount": 'signed',
+                        "Amount + Dr/Cr column": 'amount_with_type', "Debit / Credit columns": 'debit_credit'}
+        bank_format = format_names[st.selectbox("Statement format", list(format_names))]
+        append = st.checkbox("Append to existing data (only new rows are scored)",
+                             disabled=st.session_state.data is None)
         if up_file:
+            account = st.text_input("Account", value=account_name(up_file.name), key=f"account_{up_file.file_id}",
+                                    help="Statements of one account share this name, so overlapping rows are skipped.")
             try:
-                raw = load_data(up_file)
-                pro = preprocess_data(raw)
-                cn = st.session_state.categorizer.predict(pro)
-                ad = AnomalyDetector()
-                fn = ad.detect_anomalies(cn)
-                st.session_state.data = fn
-                st.success("Personal expense data loaded!")
+                existing = st.session_state.data
+                if append and existing is not None and 'is_anomaly' in existing.columns:
+                    # Reruns keep the uploaded file; append it only once
+                    if st.session_state.get('appended_file_id') != up_file.file_id:
+                        raw = load_data(up_file, bank_format)
+                        pro = preprocess_data(raw)
+                        pro['account'] = account
+                        index = get_fingerprint_index()
+                        if not len(index):
+                            # Data loaded before the index existed
+                            index.dedupe(existing)
+                        pro, dropped = index.dedupe(pro)
+                        index.save()
+                        cn = apply_schema(st.session_state.categorizer.predict(pro))
+                        st.session_state.categorizer.cache.save()
+                        combined = pd.concat([existing, cn], ignore_index=True)
+                        st.session_state.data = apply_schema(get_anomaly_detector().detect_new(combined))
+                        st.session_state.appended_file_id = up_file.file_id
+                        st.session_state.appended_duplicates = dropped
+                    st.success("New transactions appended!")
+                    if st.session_state.get('appended_duplicates'):
+                        st.caption(f"Skipped {st.session_state.appended_duplicates:,} rows already in your data.")
+                else:
+                    st.session_state.data, note = load_personal_upload(up_file, bank_format, account)
+                    if st.session_state.get('indexed_file_id') != (up_file.file_id, account):
+                        # The upload replaces the data, so it replaces the index too
+                        index = get_fingerprint_index()
+                        index.reset()
+                        index.dedupe(st.session_state.data)
+                        index.save()
+                        st.session_state.indexed_file_id = (up_file.file_id, account)
+                    st.success("Personal expense data loaded!")
+                    if note:
+                        st.caption(note)
             except Exception as e:
                 st.error(f"Error: {e}")
 
+        with st.expander("Upload several statements at once"):
+            multi_files = st.file_uploader("Monthly statements (any accounts)", type=['csv'],
+                                           accept_multiple_files=True, key="multi_upload")
+            if multi_files:
+                accounts = [st.text_input(f"Account for {f.name}", value=account_name(f.name), key=f"account_{f.file_id}")
+                            for f in multi_files]
+                try:
+                    # Reruns keep the uploaded files; process each selection once
+                    file_ids = tuple(zip((f.file_id for f in multi_files), accounts))
+                    if st.session_state.get('multi_file_ids') != file_ids:
+                        index = get_fingerprint_index()
+                        index.reset()
+                        with st.spinner(f"Processing {len(multi_files)} statements..."):
+                            merged, timings = ingest_files([(f.name, f.getvalue()) for f in multi_files],
+                                                           st.session_state.categorizer, format=bank_format,
+                                                           index=index, accounts=accounts)
+                            merged = apply_schema(get_anomaly_detector().detect_anomalies(apply_schema(merged)))
+                        st.session_state.data = merged
+                        index.save()
+                        st.session_state.multi_file_ids = file_ids
+                        st.session_state.multi_file_timings = timings
+                    st.success(f"{len(multi_files)} statements merged: {len(st.session_state.data):,} transactions.")
+                    st.dataframe(pd.DataFrame(st.session_state.multi_file_timings), hide_index=True)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
     if st.session_state.app_mode == "Business":
         st.subheader("Business Data Upload")
         biz_file = st.file_uploader("Upload Business Statement (CSV)", type=['csv'], key="biz_settings_upload")
@@ -1564,7 +1815,7 @@ elif page == "⚙️ Settings":
                 bdf = pd.read_csv(biz_file)
                 bdf.columns = [c.lower().strip() for c in bdf.columns]
                 if 'date' in bdf.columns:
-                    bdf['date'] = pd.to_datetime(bdf['date'])
+                    bdf['date'] = parse_dates(bdf['date'], detect_date_format(bdf['date'].head(500)))
                 bdf = preprocess_data(bdf)
                 bdf = st.session_state.business_categorizer.predict(bdf)
                 if 'gst_rate' not in bdf.columns:
@@ -1601,10 +1852,30 @@ elif page == "⚙️ Settings":
         
     st.markdown("---")
     st.subheader("Advanced:")
+    full_retrain = st.checkbox("Full batch retrain (Random Forest)", value=False,
+                               help="Refits TF-IDF + Random Forest on all data. Slower; the default only learns new labels.")
     if st.button("🧠 Retrain Categorization Model"):
         if st.session_state.data is not None:
-            with st.spinner("Training model on current data..."):
-                st.session_state.categorizer.train(st.session_state.data)
-            st.success("Model retrained and saved! Future transactions will be categorized better.")
+            training_worker.submit(training_key("personal"),
+                                   st.session_state.categorizer,
+                                   'train' if full_retrain else 'train_incremental',
+                                   st.session_state.data)
+            st.success("Retraining started in the background. Future transactions will be categorized better.")
         else:
             st.warning("No data to train on. Upload a CSV first.")
+
+    cache_stats = st.session_state.categorizer.cache.stats()
+    st.caption(
+        f"Prediction cache: {cache_stats['size']:,} merchants cached | "
+        f"{cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+
+    mem = session_memory_report(st.session_state)
+    st.caption(
+        f"Session memory: {(mem['data_bytes'] + mem['business_data_bytes']) / 1024 ** 2:,.1f} MB of data | "
+        f"shared model: {mem['shared_model_bytes'] / 1024 ** 2:,.1f} MB (loaded once per server)"
+    )
+    if st.session_state.data is not None:
+        with st.expander("Memory by column"):
+            st.dataframe(memory_report(st.session_state.data), hide_index=True)
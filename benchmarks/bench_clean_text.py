@@ -0,0 +1,42 @@
+"""
+Benchmark: per-row clean_text apply vs column-wise clean_descriptions.
+
+Run from the repo root (row count is optional, default 100,000):
+    python -m benchmarks.bench_clean_text 100000
+"""
+import sys
+import time
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+from src.data_processor import clean_descriptions, clean_text  # type: ignore
+
+
+def make_descriptions(n, n_merchants=500, seed=0):
+    # Statements repeat a few hundred merchants many times over
+    rng = np.random.default_rng(seed)
+    merchants = np.array([f"POS {i:04d} MERCHANT #{i % 37} *REF" for i in range(n_merchants)], dtype=object)
+    return pd.Series(rng.choice(merchants, n))
+
+
+def main(n=100000):
+    descriptions = make_descriptions(n)
+
+    start = time.perf_counter()
+    expected = descriptions.apply(clean_text)
+    per_row = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = clean_descriptions(descriptions)
+    vectorized = time.perf_counter() - start
+
+    print(f"Rows:                {n}")
+    print(f"clean_text apply:    {per_row:.3f}s")
+    print(f"clean_descriptions:  {vectorized:.3f}s")
+    print(f"Speedup:             {per_row / vectorized:.1f}x")
+    print(f"Mismatches:          {int((result != expected).sum())}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,74 @@
+"""
+Benchmark: CompactForest.predict_proba vs RandomForestClassifier.predict_proba
+on TF-IDF batches, plus the size of each representation.
+
+Two models are measured: one trained on the synthetic statement (a few dozen
+merchants) and one on many distinct merchants, where sklearn's trees grow
+deep chains of single-token splits.
+
+Run from the repo root (row count is optional, default 100,000):
+    python -m benchmarks.bench_compact_forest 100000
+"""
+import pickle
+import random
+import sys
+import time
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from sklearn.ensemble import RandomForestClassifier  # type: ignore
+from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+
+from benchmarks.bench_predict import make_statement  # type: ignore
+from src.compact_forest import CompactForest  # type: ignore
+from src.data_processor import preprocess_data  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+
+
+def make_merchants(n, n_merchants=1000, seed=42):
+    """Descriptions over `n_merchants` distinct merchant tokens."""
+    rng = random.Random(seed)
+    categories = ExpenseCategorizer.CATEGORIES
+    rows = []
+    for _ in range(n):
+        merchant = rng.randrange(n_merchants)
+        rows.append((f"m{merchant}shop {rng.choice(['pos', 'upi', 'card'])} city{rng.randrange(50)}",
+                     categories[merchant % len(categories)]))
+    return pd.DataFrame(rows, columns=['clean_description', 'category'])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(name, train, descriptions):
+    vectorizer = TfidfVectorizer(stop_words='english')
+    clf = RandomForestClassifier(n_estimators=100, random_state=42)
+    clf.fit(vectorizer.fit_transform(train['clean_description']), train['category'])
+    forest, t_build = timed(CompactForest.from_sklearn, clf)
+
+    X = vectorizer.transform(descriptions)
+    expected, t_sklearn = timed(clf.predict_proba, X)
+    actual, t_compact = timed(forest.predict_proba, X)
+
+    print(f"[{name}]")
+    print(f"  Rows:                  {X.shape[0]}")
+    print(f"  sklearn predict_proba: {t_sklearn:.2f}s")
+    print(f"  compact predict_proba: {t_compact:.2f}s (built in {t_build:.2f}s)")
+    print(f"  Speedup:               {t_sklearn / t_compact:.2f}x")
+    print(f"  Identical:             {np.array_equal(expected, actual)}")
+    print(f"  sklearn pickle:        {len(pickle.dumps(clf)) / 1024 ** 2:.1f} MiB")
+    print(f"  compact arrays:        {forest.nbytes / 1024 ** 2:.1f} MiB")
+
+
+def main(n=100000):
+    compare('statement model', preprocess_data(make_statement(5000, seed=1)),
+            preprocess_data(make_statement(n))['clean_description'])
+    compare('1000 merchants', make_merchants(20000, seed=1),
+            make_merchants(n)['clean_description'])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,80 @@
+"""
+Benchmark: compiled KeywordMatcher vs the old per-keyword re.search loop.
+
+Run from the repo root:
+    python -m benchmarks.bench_keyword_matcher
+"""
+import random
+import re
+import time
+
+import pandas as pd  # type: ignore
+
+from src.model import ExpenseCategorizer  # type: ignore
+
+WORDS = [
+    'uber', 'trip', 'business', 'lunch', 'school', 'bus', 'payment', 'grocery',
+    'store', 'tech', 'corp', 'salary', 'input', 'netflix', 'pos', 'ref', 'upi',
+    'shell', 'petrol', 'electric', 'gas', 'bill', 'swiggy', 'instamart', 'xyz',
+    'transfer', 'neft', 'imps', 'atm', 'withdrawal', 'h&m', 'dr.smith',
+]
+
+
+def legacy_heuristic(keywords, description):
+    """The pre-KeywordMatcher loop, kept here as the reference."""
+    desc_lower = str(description).lower()
+    for key, category in keywords.items():
+        pattern = r'\b' + re.escape(key) + r'\b'
+        if re.search(pattern, desc_lower):
+            return category
+    for cat in ExpenseCategorizer.CATEGORIES:
+        pattern = r'\b' + re.escape(cat.lower()) + r'\b'
+        if re.search(pattern, desc_lower):
+            return cat
+    return "Uncategorized"
+
+
+def make_descriptions(n, seed=42):
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))) + f" {rng.randint(0, 99999)}"
+        for _ in range(n)
+    ]
+
+
+def main(n=50000):
+    cat = ExpenseCategorizer()
+    descs = make_descriptions(n)
+
+    start = time.perf_counter()
+    old = [legacy_heuristic(cat.keywords, d) for d in descs]
+    t_old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [cat._get_heuristic_category(d) for d in descs]
+    t_new = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(old, new))
+    print(f"Rows:            {n}")
+    print(f"Legacy loop:     {t_old:.3f}s")
+    print(f"KeywordMatcher:  {t_new:.3f}s")
+    print(f"Speedup:         {t_old / t_new:.1f}x")
+    print(f"Mismatches:      {mismatches}")
+
+    # Column path: per-row apply vs batch categorize_descriptions
+    series = pd.Series(descs)
+    start = time.perf_counter()
+    per_row = series.apply(cat._get_heuristic_category)
+    t_apply = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = cat.categorize_descriptions(series)
+    t_batch = time.perf_counter() - start
+
+    print(f"Series.apply:    {t_apply:.3f}s")
+    print(f"Batch column:    {t_batch:.3f}s")
+    print(f"Mismatches:      {int((per_row != batch).sum())}")
+
+
+if __name__ == "__main__":
+    main()
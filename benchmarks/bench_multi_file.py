@@ -0,0 +1,56 @@
+"""
+Benchmark: multi-file statement ingestion with 1..N worker processes.
+
+Run from the repo root (file count and rows per file are optional,
+default 24 files of 20,000 rows):
+    python -m benchmarks.bench_multi_file 24 20000
+"""
+import os
+import sys
+import time
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+from src.ingestion import ingest_files  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+
+MERCHANTS = ['SWIGGY ORDER', 'UBER TRIP', 'AMAZON PAY', 'NETFLIX.COM', 'BIG BAZAAR', 'SHELL PETROL',
+             'APOLLO PHARMACY', 'AIRTEL BILL', 'ZOMATO', 'IRCTC TICKET']
+
+
+def make_statements(n_files, rows):
+    rng = np.random.default_rng(0)
+    files = []
+    for i in range(n_files):
+        dates = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 30, rows) + 30 * i, unit='D')
+        df = pd.DataFrame({
+            'Date': dates.strftime('%d/%m/%Y'),
+            'Narration': [f"UPI-{m}-{r}" for m, r in zip(rng.choice(MERCHANTS, rows), rng.integers(0, 500, rows))],
+            'Withdrawal Amt': rng.gamma(2.0, 300.0, rows).round(2),
+            'Deposit Amt': np.nan
+        })
+        files.append((f"account{i % 3}_{i:02d}.csv", df.to_csv(index=False).encode('utf-8')))
+    return files
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    files = make_statements(n_files, rows)
+    categorizer = ExpenseCategorizer(model_path='bench_multi_file_model.pkl')
+    print(f"{n_files} files x {rows:,} rows, {os.cpu_count()} CPU(s)")
+
+    baseline = None
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        merged, timings = ingest_files(files, categorizer, max_workers=workers)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        slowest = max(t['parse_seconds'] for t in timings)
+        print(f"{workers:2d} worker(s): {seconds:7.3f}s  ({baseline / seconds:.1f}x)  "
+              f"slowest file {slowest:.3f}s  rows {len(merged):,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: predict_proba + predict (two forest passes over the full matrix)
+vs ExpenseCategorizer._predict_labels (one chunked pass).
+
+Run from the repo root (row count is optional, default 1,000,000):
+    python -m benchmarks.bench_predict 1000000
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+from src.data_processor import preprocess_data  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+
+MERCHANTS = {
+    'Food': ['whole foods', 'trader joes', 'local market', 'bigbasket'],
+    'Dining': ['starbucks', 'chipotle', 'local cafe', 'zomato order'],
+    'Transport': ['uber', 'lyft', 'shell gas station', 'metro card'],
+    'Shopping': ['amazon', 'target', 'best buy', 'clothing store'],
+    'Entertainment': ['netflix', 'spotify', 'cinema', 'steam games'],
+    'Utilities': ['electric co', 'water board', 'internet provider', 'mobile bill'],
+    'Housing': ['luxury apartments rent', 'society maintenance'],
+    'Income': ['tech corp salary input', 'interest credit'],
+}
+
+
+def make_statement(n, seed=42):
+    """Synthetic statement where most descriptions are distinct strings."""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        cat = rng.choice(list(MERCHANTS))
+        merchant = rng.choice(MERCHANTS[cat])
+        rows.append((f"{merchant} ref {rng.randint(0, 10**9)} {rng.choice(['pos', 'upi', 'card', 'neft'])}", cat))
+    return pd.DataFrame(rows, columns=['description', 'category'])
+
+
+def legacy_predict(categorizer, descriptions):
+    X = categorizer.vectorizer.transform(descriptions)
+    probs = categorizer.clf.predict_proba(X)
+    return categorizer.clf.predict(X), np.max(probs, axis=1)
+
+
+def measure(fn, *args):
+    """Times an untraced run, then reports peak memory from a traced run."""
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+
+def main(n=1000000):
+    with tempfile.TemporaryDirectory() as tmp:
+        categorizer = ExpenseCategorizer(model_path=os.path.join(tmp, 'model.pkl'))
+        categorizer.train(preprocess_data(make_statement(5000, seed=1)))
+
+        descriptions = preprocess_data(make_statement(n))['clean_description'].to_numpy(dtype=object)
+
+        (old_labels, old_conf), t_old, m_old = measure(legacy_predict, categorizer, descriptions)
+        (new_labels, new_conf), t_new, m_new = measure(categorizer._predict_labels, descriptions)
+
+    print(f"Rows:                      {n}")
+    print(f"predict_proba + predict:   {t_old:.2f}s, peak {m_old:.1f} MiB")
+    print(f"_predict_labels (chunked): {t_new:.2f}s, peak {m_new:.1f} MiB")
+    print(f"Speedup:                   {t_old / t_new:.2f}x")
+    print(f"Label mismatches:          {int((old_labels != new_labels).sum())}")
+    print(f"Max confidence diff:       {float(np.abs(old_conf - new_conf).max()):.2e}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
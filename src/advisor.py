@@ -1,9 +1,12 @@
+import numpy as np  # type: ignore
 import pandas as pd  # type: ignore
 
 class FinancialAdvisor:
-    def __init__(self, df, salary=0):
+    def __init__(self, df, salary=0, merchant_index=None):
         self.df = df
         self.salary = salary
+        # Optional MerchantIndex used to group spelling variants of a merchant
+        self.merchant_index = merchant_index
         self.insights = []
         
     def analyze_50_30_20(self):
@@ -101,8 +104,14 @@ class FinancialAdvisor:
         # 4. Waste Detection (High frequency, low amount)
         expenses = self.df[self.df['category'] != 'Income']
         if 'description' in expenses.columns:
-            # Group by description to find recurring habits
-            habits = expenses.groupby('description').filter(lambda x: len(x) > 4) # More than 4 times
+            # Group by merchant to find recurring habits
+            # Plain strings: counts mapped onto a categorical stay categorical
+            merchants = expenses['description'].astype(object)
+            if self.merchant_index is not None:
+                keys = self.merchant_index.canonicalize(merchants)
+                merchants = pd.Series(np.where(keys == '', merchants, keys), index=expenses.index)
+            visits = merchants.map(merchants.value_counts())
+            habits = expenses.assign(description=merchants)[visits > 4] # More than 4 times
         else:
              habits = pd.DataFrame()
         if not habits.empty:
@@ -0,0 +1,358 @@
+import os
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import joblib  # type: ignore
+from src.atomic_file import atomic_write  # type: ignore
+from src.dedup import add_counts, row_fingerprints, unseen_occurrences  # type: ignore
+from src.merchant_index import normalize_merchant  # type: ignore
+
+
+def _fingerprints(df, amount_col):
+    """
+    row_fingerprints for a frame whose amount column may be named otherwise.
+    Category is left out so re-categorized rows still count as seen.
+    """
+    if amount_col != 'amount':
+        df = df.rename(columns={amount_col: 'amount'})
+    if 'description' not in df.columns and 'clean_description' not in df.columns:
+        df = df.assign(description='')
+    return row_fingerprints(df)
+
+
+class BaselineIndex:
+    """
+    Robust spending baselines per category and per normalized merchant.
+
+    Each key keeps count, median, MAD and quantiles of absolute expense
+    amounts, so a rent payment is judged against rent and a coffee against
+    coffee. State is a bounded sample of recent amounts per key, each with
+    its row fingerprint (see src.dedup), so re-uploading the same statement
+    does not double count and a new month only adds its own rows. Identical
+    rows are counted, so two equal coffees on one day are both absorbed.
+    Only the keys an update touched are recomputed. Persisted with joblib,
+    one file per user.
+    """
+
+    LEVELS = ('merchant', 'category')
+    COLUMNS = ['count', 'median', 'mad', 'q05', 'q25', 'q75', 'q95', 'log_median', 'log_mad', 'log_meanad']
+
+    def __init__(self, path=None, max_samples=200, min_count=5, threshold=3.5, min_spread=0.2,
+                 merchant_index=None):
+        self.path = path
+        # Optional MerchantIndex, so spelling variants share one merchant baseline
+        self.merchant_index = merchant_index
+        # Recent amounts kept per merchant and per category
+        self.max_samples = max_samples
+        # Transactions a key needs before rows are judged against it
+        self.min_count = min_count
+        # Robust z-score above which a spend is unusual for its baseline
+        self.threshold = threshold
+        # Smallest log-scale spread, so fixed-price bills (MAD = 0) tolerate
+        # small changes; 0.2 flags a fixed price only once it roughly doubles
+        self.min_spread = min_spread
+        self.history = pd.DataFrame({
+            'category': pd.Series(dtype=object),
+            'merchant': pd.Series(dtype=object),
+            'date': pd.Series(dtype='datetime64[ns]'),
+            'amount': pd.Series(dtype=float),
+            'fingerprint': pd.Series(dtype=np.uint64)
+        })
+        # Rows per fingerprint in the history; a row that ages out of the
+        # sample is older than everything its keys kept, so it would age out
+        # again if uploaded once more
+        self.counts = {}
+        self.stats = self._compute_stats(self.history)
+
+    def _samples(self, df, amount_col):
+        """
+        Baseline columns for a transactions frame (absolute amounts).
+        """
+        n = len(df)
+        if 'category' in df.columns:
+            category = df['category'].astype(str).str.lower().to_numpy(dtype=object)
+        else:
+            category = np.full(n, '', dtype=object)
+        text_col = 'clean_description' if 'clean_description' in df.columns else 'description'
+        if text_col in df.columns and self.merchant_index is not None:
+            merchant = self.merchant_index.canonicalize(df[text_col])
+        elif text_col in df.columns:
+            merchant = normalize_merchant(df[text_col])
+        else:
+            merchant = np.full(n, '', dtype=object)
+        if 'date' in df.columns:
+            date = pd.to_datetime(df['date'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        else:
+            date = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+        amount = pd.to_numeric(df[amount_col], errors='coerce').fillna(0).abs().to_numpy(dtype=float)
+        return pd.DataFrame({'category': category, 'merchant': merchant, 'date': date, 'amount': amount})
+
+    def _compute_stats(self, samples, keys=None):
+        """
+        One groupby over (level, key) for every baseline at once, or only
+        for `keys` ({level: keys}) when given.
+        """
+        parts = []
+        for level in self.LEVELS:
+            rows = samples if keys is None else samples[samples[level].isin(keys[level])]
+            parts.append(pd.DataFrame({'level': level, 'key': rows[level], 'amount': rows['amount']}))
+        long = pd.concat(parts, ignore_index=True)
+        long = long[long['key'] != ''].copy()
+        if long.empty:
+            return pd.DataFrame(columns=self.COLUMNS, index=pd.MultiIndex.from_tuples([], names=['level', 'key']))
+
+        long['log_amount'] = np.log1p(long['amount'])
+        groups = long.groupby(['level', 'key'], sort=False)
+        medians = groups[['amount', 'log_amount']].transform('median')
+        long['deviation'] = (long['amount'] - medians['amount']).abs()
+        long['log_deviation'] = (long['log_amount'] - medians['log_amount']).abs()
+        stats = groups.agg(
+            count=('amount', 'size'), median=('amount', 'median'), mad=('deviation', 'median'),
+            log_median=('log_amount', 'median'), log_mad=('log_deviation', 'median'),
+            log_meanad=('log_deviation', 'mean')
+        )
+        quantiles = groups['amount'].quantile([0.05, 0.25, 0.75, 0.95]).unstack()
+        stats[['q05', 'q25', 'q75', 'q95']] = quantiles.to_numpy()
+        return stats[self.COLUMNS]
+
+    def update(self, df, amount_col='amount'):
+        """
+        Absorbs transactions not seen before and refreshes the baselines of
+        the merchants and categories they (or the rows they pushed out of
+        the sample) belong to. Only the samples of those merchants and
+        categories are re-sorted and trimmed; the rest of the history is
+        left as it is.
+
+        Returns:
+            Number of new transactions absorbed.
+        """
+        if df.empty:
+            return 0
+        fingerprints = _fingerprints(df, amount_col)
+        is_new = unseen_occurrences(fingerprints, self.counts)
+        if not is_new.any():
+            return 0
+
+        samples = self._samples(df[is_new], amount_col)
+        samples['fingerprint'] = fingerprints[is_new]
+        # Rows sharing a merchant or category with the new ones may be pushed
+        # out; every other row keeps its rank in both of its keys
+        touched = np.zeros(len(self.history), dtype=bool)
+        for level in self.LEVELS:
+            touched |= self.history[level].isin(pd.unique(samples[level])).to_numpy()
+        rest = self.history[~touched]
+        part = pd.concat([self.history[touched], samples], ignore_index=True)
+
+        # Keep a row while it is among the latest for its merchant or its
+        # category, ranked against every row of that key
+        keep = np.zeros(len(part), dtype=bool)
+        for level in self.LEVELS:
+            others = rest[rest[level].isin(pd.unique(part[level]))]
+            pool = pd.concat([others[[level, 'date']], part[[level, 'date']]], ignore_index=True)
+            pool = pool.sort_values('date', na_position='first', kind='stable')
+            rank = pool.groupby(level, sort=False).cumcount(ascending=False).sort_index().to_numpy()
+            keep |= rank[len(others):] < self.max_samples
+        dropped = part[~keep]
+        self.history = pd.concat([rest, part[keep]], ignore_index=True)
+        add_counts(self.counts, samples['fingerprint'].to_numpy())
+        add_counts(self.counts, dropped['fingerprint'].to_numpy(), sign=-1)
+
+        changed = {level: pd.unique(pd.concat([samples[level], dropped[level]])) for level in self.LEVELS}
+        fresh = self._compute_stats(self.history, changed)
+        if self.stats.empty:
+            self.stats = fresh
+        else:
+            stale = pd.MultiIndex.from_tuples(
+                [(level, key) for level in self.LEVELS for key in changed[level]], names=['level', 'key'])
+            self.stats = pd.concat([self.stats[~self.stats.index.isin(stale)], fresh])
+        return int(is_new.sum())
+
+    def score(self, df, amount_col='amount'):
+        """
+        Scores each row against its own baseline: the merchant's when it has
+        at least `min_count` transactions, else the category's.
+
+        Spend amounts are right-skewed, so the one-sided robust z-score is
+        taken on log1p(amount): (log - median) / max(1.4826 * MAD, min_spread).
+        When over half the amounts are identical (MAD = 0), 1.2533 times the
+        mean absolute deviation stands in for the MAD term.
+
+        Returns:
+            DataFrame aligned to df with 'baseline' ('merchant', 'category' or
+            '' when none is established), 'median', 'robust_z' and 'is_unusual'.
+        """
+        samples = self._samples(df, amount_col)
+        n = len(samples)
+        baseline = np.full(n, '', dtype=object)
+        median = np.full(n, np.nan)
+        log_median = np.full(n, np.nan)
+        log_mad = np.full(n, np.nan)
+        log_meanad = np.full(n, np.nan)
+
+        # Category first so an established merchant baseline overrides it
+        for level in reversed(self.LEVELS):
+            if self.stats.empty:
+                break
+            keys = pd.MultiIndex.from_arrays([np.full(n, level, dtype=object), samples[level]])
+            found = self.stats.reindex(keys)
+            established = (found['count'] >= self.min_count).to_numpy()
+            baseline[established] = level
+            median[established] = found['median'].to_numpy(dtype=float)[established]
+            log_median[established] = found['log_median'].to_numpy(dtype=float)[established]
+            log_mad[established] = found['log_mad'].to_numpy(dtype=float)[established]
+            log_meanad[established] = found['log_meanad'].to_numpy(dtype=float)[established]
+
+        spread = np.where(log_mad > 0, 1.4826 * log_mad, 1.2533 * log_meanad)
+        scale = np.maximum(spread, self.min_spread)
+        robust_z = (np.log1p(samples['amount'].to_numpy()) - log_median) / scale
+        robust_z = np.where(baseline != '', robust_z, 0.0)
+
+        return pd.DataFrame({
+            'baseline': baseline,
+            'median': median,
+            'robust_z': robust_z,
+            'is_unusual': robust_z > self.threshold
+        }, index=df.index)
+
+    def save(self):
+        """
+        Persists the baselines atomically (see atomic_write).
+        """
+        if not self.path:
+            return
+        try:
+            atomic_write(self.path, lambda tmp_path: joblib.dump({'history': self.history}, tmp_path))
+            if self.merchant_index is not None:
+                self.merchant_index.save()
+        except Exception as e:
+            print(f"Failed to save anomaly baselines: {e}")
+
+    def load(self):
+        """
+        Restores persisted baselines, if any.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            payload = joblib.load(self.path)
+        except Exception as e:
+            print(f"Failed to load anomaly baselines: {e}")
+            return
+        if 'fingerprint' not in payload['history'].columns:
+            # Saved without per-row fingerprints; rebuilt from the next upload
+            return
+        self.history = payload['history']
+        self.counts = {}
+        add_counts(self.counts, self.history['fingerprint'].to_numpy())
+        self.stats = self._compute_stats(self.history)
+
+
+class RunningStats:
+    """
+    Streaming per-category statistics for scoring appended transactions.
+
+    Keeps Welford's count / mean / M2 of log1p(amount) per category. A batch
+    is summarized with one groupby and merged with Chan's parallel update,
+    so absorbing or scoring new rows costs O(new rows + categories),
+    independent of how much history was seen. Occurrence-counted row
+    fingerprints (see src.dedup) make absorbing the same rows twice a no-op.
+    Persisted with joblib, one file per user.
+    """
+
+    def __init__(self, path=None, min_count=5, min_spread=0.2):
+        self.path = path
+        # Transactions a category needs before its rows are scored
+        self.min_count = min_count
+        # Smallest log-scale standard deviation (see BaselineIndex.min_spread)
+        self.min_spread = min_spread
+        self.state = pd.DataFrame({'count': pd.Series(dtype=float), 'mean': pd.Series(dtype=float),
+                                   'm2': pd.Series(dtype=float)})
+        # Rows absorbed per fingerprint
+        self.counts = {}
+
+    def _keys_and_values(self, df, amount_col):
+        if 'category' in df.columns:
+            keys = df['category'].astype(str).str.lower().to_numpy(dtype=object)
+        else:
+            keys = np.full(len(df), '', dtype=object)
+        amounts = pd.to_numeric(df[amount_col], errors='coerce').fillna(0).abs()
+        return keys, np.log1p(amounts.to_numpy(dtype=float))
+
+    def score(self, df, amount_col='amount'):
+        """
+        Z-scores of each row against its category so far (0 where the
+        category has fewer than `min_count` transactions).
+
+        Returns:
+            DataFrame aligned to df with 'established' and 'z'.
+        """
+        keys, values = self._keys_and_values(df, amount_col)
+        found = self.state.reindex(keys)
+        count = found['count'].fillna(0).to_numpy()
+        established = count >= self.min_count
+        std = np.sqrt(found['m2'].to_numpy() / np.maximum(count - 1, 1))
+        z = (values - found['mean'].to_numpy()) / np.maximum(np.nan_to_num(std), self.min_spread)
+        return pd.DataFrame({'established': established, 'z': np.where(established, z, 0.0)}, index=df.index)
+
+    def update(self, df, amount_col='amount'):
+        """
+        Folds rows not seen before into the running statistics.
+
+        Returns:
+            Number of new transactions absorbed.
+        """
+        if df.empty:
+            return 0
+        fingerprints = _fingerprints(df, amount_col)
+        is_new = unseen_occurrences(fingerprints, self.counts)
+        if not is_new.any():
+            return 0
+
+        keys, values = self._keys_and_values(df[is_new], amount_col)
+        batch = pd.DataFrame({'key': keys, 'value': values})
+        groups = batch.groupby('key', sort=False)['value']
+        batch['sq_dev'] = (batch['value'] - groups.transform('mean')) ** 2
+        summary = batch.groupby('key', sort=False).agg(count=('value', 'size'), mean=('value', 'mean'),
+                                                       m2=('sq_dev', 'sum')).astype(float)
+
+        # Chan et al. merge of (state, batch) per category
+        index = self.state.index.union(summary.index)
+        a = self.state.reindex(index, fill_value=0.0)
+        b = summary.reindex(index, fill_value=0.0)
+        count = a['count'] + b['count']
+        delta = b['mean'] - a['mean']
+        self.state = pd.DataFrame({
+            'count': count,
+            'mean': a['mean'] + delta * b['count'] / count,
+            'm2': a['m2'] + b['m2'] + delta ** 2 * a['count'] * b['count'] / count
+        })
+        add_counts(self.counts, fingerprints[is_new])
+        return int(is_new.sum())
+
+    def save(self):
+        """
+        Persists the statistics atomically (see atomic_write).
+        """
+        if not self.path:
+            return
+        payload = {'state': self.state, 'counts': self.counts}
+        try:
+            atomic_write(self.path, lambda tmp_path: joblib.dump(payload, tmp_path))
+        except Exception as e:
+            print(f"Failed to save running anomaly stats: {e}")
+
+    def load(self):
+        """
+        Restores persisted statistics, if any.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            payload = joblib.load(self.path)
+        except Exception as e:
+            print(f"Failed to load running anomaly stats: {e}")
+            return
+        if 'counts' not in payload:
+            # Saved with the older fingerprints; rebuilt from the next upload
+            return
+        self.state = payload['state']
+        self.counts = payload['counts']
@@ -0,0 +1,25 @@
+"""
+Atomic replacement of per-user state files.
+"""
+
+import os
+import uuid
+
+
+def atomic_write(path, write):
+    """
+    Calls `write(tmp_path)` and renames the result over `path`, so readers
+    see the old file or the new one, never a partial write. The temp name
+    is unique to this writer, so concurrent saves of the same file (two
+    sessions of one user) cannot rename each other's half-written files.
+    The temp file is removed if writing fails and the error is re-raised.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
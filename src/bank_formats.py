@@ -0,0 +1,288 @@
+"""
+Bank statement format adapters.
+
+Statements differ in column names (Narration vs Description), in how money
+moves are encoded (one signed amount, an amount plus a Dr/Cr column, or
+separate debit and credit columns) and in date format. detect_layout looks
+at a small sample once and returns a StatementLayout that parses the whole
+file in one pass with explicit usecols, string dtypes and date `format=`,
+into the canonical date / description / amount frame (expenses negative).
+Pandas' per-element date inference only runs on dates the detected format
+does not fit.
+
+New layouts are added with register_format.
+"""
+
+import io
+import pandas as pd  # type: ignore
+
+# Lowercased header names accepted for each column role
+ROLE_ALIASES = {
+    'date': ['date', 'transaction date', 'txn date', 'tran date', 'posting date', 'value date'],
+    'description': ['description', 'narration', 'particulars', 'details', 'transaction details', 'remarks'],
+    'amount': ['amount', 'transaction amount', 'amount (inr)', 'amt'],
+    'debit': ['debit', 'withdrawal', 'withdrawal amt', 'withdrawal amount', 'debit amount', 'withdrawals'],
+    'credit': ['credit', 'deposit', 'deposit amt', 'deposit amount', 'credit amount', 'deposits'],
+    'type': ['type', 'dr/cr', 'cr/dr', 'transaction type', 'debit/credit']
+}
+
+# Columns carried through unchanged when present (e.g. user-labeled files)
+PASSTHROUGH_COLUMNS = ['category']
+
+# Tried in order; the first one that parses every sampled date wins, so
+# day-first comes before month-first for ambiguous dates like 03/04/2024
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%d.%m.%Y',
+    '%d/%m/%y', '%m/%d/%y', '%d-%m-%y', '%Y/%m/%d', '%d-%b-%Y', '%d %b %Y', '%d-%b-%y', '%b %d, %Y'
+]
+
+# Whole marker values ("DR", "Cr.", "Debit"); "Debit Card" is not a marker
+DEBIT_MARKERS = ['dr', 'debit', 'withdrawal']
+CREDIT_MARKERS = ['cr', 'credit', 'deposit']
+
+
+def _to_amount(values):
+    """
+    Numeric amounts from a column that may hold strings like "1,234.50".
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    return pd.to_numeric(values.astype(str).str.replace(',', '', regex=False).str.strip(), errors='coerce')
+
+
+def _markers(values):
+    return values.astype(str).str.strip().str.lower().str.rstrip('.')
+
+
+class BankFormat:
+    """
+    One family of statement layouts: the column roles it needs and how its
+    money columns become a signed amount.
+    """
+
+    name = 'signed'
+    roles = ('date', 'description', 'amount')
+
+    def match(self, columns):
+        """
+        Maps each required role to a header in `columns` (lowercased).
+
+        Returns:
+            {role: column} or None if a role has no matching header.
+        """
+        mapping = {}
+        for role in self.roles:
+            found = [col for col in ROLE_ALIASES[role] if col in columns]
+            if not found:
+                return None
+            mapping[role] = found[0]
+        return mapping
+
+    def accepts(self, sample, mapping):
+        """
+        Whether the sampled rows fit this format (beyond the headers).
+        """
+        return True
+
+    def amounts(self, df, mapping):
+        return _to_amount(df[mapping['amount']])
+
+
+class TypedAmountFormat(BankFormat):
+    """
+    Unsigned amount plus a Dr/Cr (debit/credit) marker column.
+    """
+
+    name = 'amount_with_type'
+    roles = ('date', 'description', 'amount', 'type')
+
+    def accepts(self, sample, mapping):
+        # A generic "Type" column (e.g. "Online") is not a Dr/Cr marker
+        marker = _markers(sample[mapping['type']].dropna())
+        return bool(len(marker)) and marker.isin(DEBIT_MARKERS + CREDIT_MARKERS).all()
+
+    def amounts(self, df, mapping):
+        amount = _to_amount(df[mapping['amount']]).abs()
+        is_debit = _markers(df[mapping['type']]).isin(DEBIT_MARKERS).to_numpy()
+        return amount.where(~is_debit, -amount)
+
+
+class DebitCreditFormat(BankFormat):
+    """
+    Separate debit (money out) and credit (money in) columns. Debits count
+    as expenses whether the bank writes them positive or negative.
+    """
+
+    name = 'debit_credit'
+    roles = ('date', 'description', 'debit', 'credit')
+
+    def amounts(self, df, mapping):
+        debit = _to_amount(df[mapping['debit']]).fillna(0).abs()
+        credit = _to_amount(df[mapping['credit']]).fillna(0).abs()
+        return credit - debit
+
+
+# Most specific first
+FORMATS = [DebitCreditFormat(), TypedAmountFormat(), BankFormat()]
+
+
+def register_format(bank_format):
+    """
+    Adds an adapter; it is tried before the built-in ones.
+    """
+    FORMATS.insert(0, bank_format)
+
+
+def get_format(name):
+    for bank_format in FORMATS:
+        if bank_format.name == name:
+            return bank_format
+    raise ValueError(f"Unknown bank format: {name}")
+
+
+def detect_date_format(values):
+    """
+    First entry of DATE_FORMATS that parses every non-empty value, or None.
+    """
+    values = pd.Series(values, dtype=object).dropna().astype(str).str.strip()
+    values = values[values != '']
+    if values.empty:
+        return None
+    for date_format in DATE_FORMATS:
+        if pd.to_datetime(values, format=date_format, errors='coerce').notna().all():
+            return date_format
+    return None
+
+
+def parse_dates(values, date_format):
+    """
+    Parses dates with the detected `date_format`. Values written another
+    way (a bank switching formats mid-file) get the first of DATE_FORMATS
+    that fits them, then pandas' inference with the same day-first reading
+    as the detected format.
+
+    Raises:
+        ValueError: if a non-empty value is not a date either way.
+    """
+    values = pd.Series(values, copy=False)
+    values = values.where(values.isna(), values.astype(str).str.strip())
+    dates = pd.to_datetime(values, format=date_format, errors='coerce')
+    missed = dates.isna() & values.notna() & (values != '')
+    for fallback in DATE_FORMATS:
+        if not missed.any():
+            break
+        dates[missed] = pd.to_datetime(values[missed], format=fallback, errors='coerce')
+        missed &= dates.isna()
+    if missed.any():
+        # With dayfirst, pandas reads ISO "2024-04-05" as 4 May; those matched above
+        dayfirst = bool(date_format) and date_format.startswith('%d')
+        dates[missed] = pd.to_datetime(values[missed], format='mixed', dayfirst=dayfirst, errors='coerce')
+        bad = values[missed & dates.isna()]
+        if len(bad):
+            examples = ', '.join(repr(v) for v in bad.unique()[:3])
+            raise ValueError(f"{len(bad)} row(s) have unrecognised dates, e.g. {examples}")
+    return dates
+
+
+class StatementLayout:
+    """
+    A detected layout: adapter, header mapping, date format and dtypes, used
+    to parse the full file (or chunks of it) without further guessing.
+    """
+
+    def __init__(self, bank_format, mapping, headers, date_format=None):
+        self.bank_format = bank_format
+        # role -> lowercased header
+        self.mapping = mapping
+        # lowercased header -> header as written in the file
+        self.headers = headers
+        self.date_format = date_format
+
+    def _columns(self):
+        columns = list(dict.fromkeys(self.mapping.values()))
+        return columns + [col for col in PASSTHROUGH_COLUMNS if col in self.headers and col not in columns]
+
+    def read_kwargs(self):
+        """
+        usecols / dtype arguments for pd.read_csv. Everything is read as
+        text: money columns go through _to_amount, so a "-25,000.00" past
+        the detection sample still parses.
+        """
+        columns = [self.headers[col] for col in self._columns()]
+        return {'usecols': columns, 'dtype': {col: str for col in columns}}
+
+    def to_frame(self, raw):
+        """
+        Canonical frame (date, description, amount, passthrough columns)
+        from rows read with read_kwargs().
+        """
+        raw.columns = [c.lower().strip() for c in raw.columns]
+        dates = raw[self.mapping['date']]
+        if self.date_format:
+            dates = parse_dates(dates, self.date_format)
+        df = pd.DataFrame({
+            'date': dates,
+            'description': raw[self.mapping['description']],
+            'amount': self.bank_format.amounts(raw, self.mapping).to_numpy(dtype=float)
+        }, index=raw.index)
+        for col in PASSTHROUGH_COLUMNS:
+            if col in raw.columns:
+                df[col] = raw[col]
+        return df
+
+    def read(self, file, chunksize=None):
+        """
+        Parses the file in one pass, or yields chunks if `chunksize` is set.
+        """
+        reader = pd.read_csv(file, chunksize=chunksize, **self.read_kwargs())
+        if chunksize is None:
+            return self.to_frame(reader)
+        return (self.to_frame(chunk) for chunk in reader)
+
+
+def _rewind(file):
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+
+def detect_layout(file, format=None, sample_rows=500):
+    """
+    Detects the statement layout from the first `sample_rows` rows.
+
+    Args:
+        format: name of a registered adapter to use instead of detecting one.
+
+    Returns:
+        StatementLayout, or None if no adapter matches the headers.
+    """
+    _rewind(file)
+    sample = pd.read_csv(file, nrows=sample_rows, dtype=str)
+    _rewind(file)
+    headers = {c.lower().strip(): c for c in sample.columns}
+    sample.columns = list(headers)
+
+    candidates = [get_format(format)] if format else FORMATS
+    for bank_format in candidates:
+        mapping = bank_format.match(headers)
+        if mapping is None or not bank_format.accepts(sample, mapping):
+            continue
+        date_format = detect_date_format(sample[mapping['date']])
+        return StatementLayout(bank_format, mapping, headers, date_format)
+    if format:
+        raise ValueError(f"File does not have the columns of the '{format}' format")
+    return None
+
+
+def read_statement(file, format=None):
+    """
+    Reads a statement CSV into the canonical frame. Files no adapter
+    recognises are read as-is with lowercased headers.
+    """
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    layout = detect_layout(file, format)
+    if layout is None:
+        df = pd.read_csv(file)
+        df.columns = [c.lower().strip() for c in df.columns]
+        return df
+    return layout.read(file)
@@ -2,12 +2,15 @@ import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 import numpy as np
+import threading
 
 class BusinessExpenseCategorizer:
     def __init__(self):
         self.vectorizer = TfidfVectorizer(stop_words='english')
         self.clf = RandomForestClassifier(n_estimators=100, random_state=42)
         self.is_trained = False
+        # Guards swapping the (vectorizer, clf) pair while predictions run
+        self._lock = threading.RLock()
         
         # Business-specific Keywords
         self.keywords = {
@@ -51,6 +54,24 @@ class BusinessExpenseCategorizer:
         self.clf.fit(X, y)
         self.is_trained = True
 
+    def clone(self):
+        """
+        Fresh instance to train off to the side (train refits from scratch).
+        """
+        other = BusinessExpenseCategorizer()
+        other.keywords = self.keywords
+        return other
+
+    def adopt(self, other):
+        """
+        Atomically swaps in the model trained on `other`.
+        """
+        if not other.is_trained:
+            return
+        with self._lock:
+            self.vectorizer, self.clf = other.vectorizer, other.clf
+            self.is_trained = other.is_trained
+
     def predict(self, df):
         """
         Predicts categories for the dataframe.
@@ -67,8 +88,10 @@ class BusinessExpenseCategorizer:
             return self._heuristic_categorize(df)
         
         try:
-            X = self.vectorizer.transform(df['clean_description'].fillna(''))
-            predicted_categories = self.clf.predict(X)
+            with self._lock:
+                vectorizer, clf = self.vectorizer, self.clf
+            X = vectorizer.transform(df['clean_description'].astype(object).fillna(''))
+            predicted_categories = clf.predict(X)
             df['category'] = predicted_categories
         except Exception as e:
             print(f"Prediction failed, falling back to heuristic: {e}")
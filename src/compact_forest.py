@@ -0,0 +1,240 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import scipy.sparse as sp  # type: ignore
+
+
+class CompactForest:
+    """
+    Serving-only copy of a fitted RandomForestClassifier as flat NumPy arrays.
+
+    All trees share one set of node arrays and only leaves keep class
+    probabilities. Evaluation is built for sparse TF-IDF rows:
+
+    - Following the branch a zero value takes from every node splits each
+      tree into disjoint chains (a node has only one parent). A row leaves
+      its chain only at a node that tests one of its few nonzero features
+      and sends that value the other way (an "exit").
+    - Split nodes are indexed by (feature, position in chain order), so the
+      next exit for a row is found with one `searchsorted` per nonzero
+      feature. Walks jump from exit to exit for all (row, tree) pairs at
+      once, so cost follows the number of exits rather than tree depth.
+
+    Probabilities are identical to sklearn's (same float32 inputs, same leaf
+    proportions, same summation order).
+    """
+
+    ARRAYS = ('roots', 'chain', 'seq', 'chain_nodes', 'exit_child', 'chain_leaf',
+              'threshold', 'split_keys', 'split_nodes', 'leaf_index', 'leaf_values',
+              'used_features', 'classes')
+
+    def __init__(self, roots, chain, seq, chain_nodes, exit_child, chain_leaf,
+                 threshold, split_keys, split_nodes, leaf_index, leaf_values,
+                 used_features, classes):
+        self.roots = roots
+        # Chain id and position in global chain order of every node
+        self.chain = chain
+        self.seq = seq
+        self.chain_nodes = chain_nodes
+        # Child taken by a value that does not follow the zero branch
+        self.exit_child = exit_child
+        # Leaf at the end of each chain
+        self.chain_leaf = chain_leaf
+        self.threshold = threshold
+        # Split nodes sorted by (remapped feature * n_nodes + seq)
+        self.split_keys = split_keys
+        self.split_nodes = split_nodes
+        self.leaf_index = leaf_index
+        self.leaf_values = leaf_values
+        self.used_features = used_features
+        self.classes_ = classes
+
+    @classmethod
+    def from_sklearn(cls, clf):
+        """
+        Flattens a fitted single-output RandomForestClassifier.
+        """
+        trees = [est.tree_ for est in clf.estimators_]
+        n_classes = len(clf.classes_)
+
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+        n_nodes = int(offsets[-1])
+        feature = np.concatenate([t.feature for t in trees]).astype(np.int64)
+        threshold = np.concatenate([t.threshold for t in trees]).astype(np.float64)
+        left = np.concatenate([np.where(t.children_left < 0, -1, t.children_left + o)
+                               for t, o in zip(trees, offsets)]).astype(np.int64)
+        right = np.concatenate([np.where(t.children_right < 0, -1, t.children_right + o)
+                                for t, o in zip(trees, offsets)]).astype(np.int64)
+        roots = offsets[:-1].astype(np.int64)
+        is_leaf = left < 0
+        split = np.flatnonzero(~is_leaf)
+
+        # A zero value goes left when 0 <= threshold (always true for TF-IDF)
+        zero_left = 0.0 <= threshold
+        zero_child = np.where(zero_left, left, right)
+        exit_child = np.where(is_leaf, -1, np.where(zero_left, right, left))
+
+        # Chains start at roots and exit children; walk them level by level
+        tops = np.concatenate([roots, exit_child[split]])
+        chain = np.empty(n_nodes, dtype=np.int64)
+        pos = np.empty(n_nodes, dtype=np.int64)
+        chain_ids = np.arange(len(tops))
+        frontier, step = tops, 0
+        while frontier.size:
+            chain[frontier] = chain_ids
+            pos[frontier] = step
+            more = ~is_leaf[frontier]
+            frontier, chain_ids, step = zero_child[frontier[more]], chain_ids[more], step + 1
+        chain_leaf = np.empty(len(tops), dtype=np.int64)
+        chain_leaf[chain[is_leaf]] = np.flatnonzero(is_leaf)
+        chain_nodes = np.lexsort((pos, chain))
+        seq = np.empty(n_nodes, dtype=np.int64)
+        seq[chain_nodes] = np.arange(n_nodes)
+
+        used_features, local = np.unique(feature[split], return_inverse=True)
+        split_keys = local * n_nodes + seq[split]
+        order = np.argsort(split_keys)
+
+        # Classifier trees store class proportions; predict_proba returns them as-is
+        leaf_values = np.concatenate([t.value[t.children_left < 0, 0, :n_classes] for t in trees])
+        leaf_index = np.full(n_nodes, -1, dtype=np.int64)
+        leaf_index[is_leaf] = np.arange(int(is_leaf.sum()))
+
+        return cls(
+            roots=roots.astype(np.int32),
+            chain=chain.astype(np.int32),
+            seq=seq.astype(np.int32),
+            chain_nodes=chain_nodes.astype(np.int32),
+            exit_child=exit_child.astype(np.int32),
+            chain_leaf=chain_leaf.astype(np.int32),
+            threshold=threshold,
+            split_keys=split_keys[order],
+            split_nodes=split[order].astype(np.int32),
+            leaf_index=leaf_index.astype(np.int32),
+            leaf_values=leaf_values.astype(np.float64),
+            used_features=used_features.astype(np.int64),
+            classes=np.asarray(clf.classes_)
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Rebuilds from `to_arrays()` output (arrays may be memory-mapped).
+        """
+        return cls(**{name: arrays[f"forest_{name}"] for name in cls.ARRAYS})
+
+    def to_arrays(self):
+        """
+        Named arrays for storage in a model artifact.
+        """
+        arrays = {f"forest_{name}": getattr(self, name) for name in self.ARRAYS if name != 'classes'}
+        arrays['forest_classes'] = np.asarray(self.classes_, dtype=str)
+        return arrays
+
+    @property
+    def nbytes(self):
+        return int(sum(np.asarray(getattr(self, name)).nbytes
+                       for name in self.ARRAYS if name != 'classes'))
+
+    def _project(self, X):
+        """
+        Restricts X to the split features as float32 CSR (sklearn compares
+        float32 inputs against float64 thresholds) and collapses rows that
+        are identical there, since those land in the same leaves.
+
+        Returns:
+            (distinct_rows, inverse) with X row i == distinct_rows[inverse[i]].
+        """
+        X = sp.csr_matrix(X, dtype=np.float32)[:, self.used_features]
+        X.sum_duplicates()
+        X.eliminate_zeros()
+        n = X.shape[0]
+        if n < 2:
+            return X, np.arange(n)
+
+        # Hash each row's (column, value) pairs, group with a hash table, then
+        # verify the grouping so a collision can never change a prediction
+        mix = (X.indices.astype(np.uint64) + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+        mix ^= X.data.view(np.uint32).astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+        mix *= np.uint64(0x165667B19E3779F9)
+        row_of = np.repeat(np.arange(n), np.diff(X.indptr))
+        hashes = np.bincount(row_of, minlength=n).astype(np.uint64)
+        np.add.at(hashes, row_of, mix)
+
+        inverse, uniques = pd.factorize(hashes)
+        first = np.empty(len(uniques), dtype=np.int64)
+        first[inverse[::-1]] = np.arange(n - 1, -1, -1)
+        distinct = X[first]
+        if (distinct[inverse] != X).nnz:
+            return X, np.arange(n)
+        return distinct, inverse
+
+    def _next_exits(self, X, row, current):
+        """
+        For each (row, current node) pair, the chain-order position of the
+        first exit at or below `current` on its chain, or -1 if the row
+        stays on the chain down to the leaf.
+        """
+        n_nodes = len(self.seq)
+        none = np.iinfo(np.int64).max
+        counts = np.diff(X.indptr)[row]
+        starts = np.cumsum(counts) - counts
+
+        # One query per (pair, nonzero feature of the pair's row)
+        pair = np.repeat(np.arange(len(row)), counts)
+        entry = np.repeat(X.indptr[row], counts) + np.arange(len(pair)) - np.repeat(starts, counts)
+        feature = X.indices[entry].astype(np.int64)
+        value = X.data[entry]
+        chain = self.chain[current][pair]
+        hit = np.searchsorted(self.split_keys, feature * n_nodes + self.seq[current][pair])
+
+        best = np.full(len(pair), none, dtype=np.int64)
+        todo = np.arange(len(pair))
+        while todo.size:
+            # Nodes testing this feature further down the same chain
+            h = np.minimum(hit[todo], len(self.split_keys) - 1)
+            nodes = self.split_nodes[h]
+            same = (hit[todo] < len(self.split_keys)) & \
+                (self.split_keys[h] // n_nodes == feature[todo]) & (self.chain[nodes] == chain[todo])
+            todo, h, nodes = todo[same], h[same], nodes[same]
+
+            threshold = self.threshold[nodes]
+            is_exit = (value[todo] <= threshold) != (0.0 <= threshold)
+            best[todo[is_exit]] = self.seq[nodes[is_exit]]
+            hit[todo[~is_exit]] = h[~is_exit] + 1
+            todo = todo[~is_exit]
+
+        nearest = np.full(len(row), none, dtype=np.int64)
+        has_features = counts > 0
+        nearest[has_features] = np.minimum.reduceat(best, starts[has_features])
+        return np.where(nearest == none, -1, nearest)
+
+    def _walk(self, X):
+        n, n_trees = X.shape[0], len(self.roots)
+        node = np.tile(np.asarray(self.roots, dtype=np.int64), n)
+        active = np.flatnonzero(np.repeat(np.diff(X.indptr), n_trees) > 0)
+        while active.size:
+            exits = self._next_exits(X, active // n_trees, node[active])
+            active, exits = active[exits >= 0], exits[exits >= 0]
+            node[active] = self.exit_child[self.chain_nodes[exits]]
+
+        return self.chain_leaf[self.chain[node]].reshape(n, n_trees)
+
+    def apply(self, X):
+        """
+        Returns global leaf node ids, shape (n_samples, n_trees).
+        """
+        distinct, inverse = self._project(X)
+        return self._walk(distinct)[inverse]
+
+    def predict_proba(self, X):
+        distinct, inverse = self._project(X)
+        leaves = self.leaf_index[self._walk(distinct)]
+        proba = np.zeros((leaves.shape[0], len(self.classes_)), dtype=np.float64)
+        # Accumulate tree by tree in order, like sklearn, for identical sums
+        for t in range(leaves.shape[1]):
+            proba += self.leaf_values[leaves[:, t]]
+        proba /= leaves.shape[1]
+        return proba[inverse]
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
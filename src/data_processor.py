@@ -1,16 +1,16 @@
 import pandas as pd  # type: ignore
 import streamlit as st  # type: ignore
+from src.bank_formats import read_statement  # type: ignore
 
-def load_data(file):
+def load_data(file, format=None):
     """
     Loads data from a CSV file.
-    Assumes standard bank statement columns like Date, Description, Amount.
+    The bank layout (debit/credit columns, Dr/Cr markers, date format) is
+    detected from a sample, or taken from `format`, and the file is parsed
+    into date, description, amount columns (see bank_formats).
     """
     try:
-        df = pd.read_csv(file)
-        # Normalize headers
-        df.columns = [c.lower().strip() for c in df.columns]
-        return df
+        return read_statement(file, format)
     except Exception as e:
         raise ValueError(f"Failed to read CSV: {e}")
 
@@ -22,9 +22,36 @@ def preprocess_data(df):
     Cleans the description column.
     """
     if 'description' in df.columns:
-        df['clean_description'] = df['description'].apply(clean_text)
+        df['clean_description'] = clean_descriptions(df['description'])
     return df
 
+def clean_descriptions(descriptions):
+    """
+    Column-level clean_text: each distinct string is cleaned once with
+    pandas string methods and the result is broadcast back to every row.
+    Non-string values keep clean_text's str(value) behaviour.
+    """
+    descriptions = pd.Series(descriptions, copy=False)
+    values = descriptions.to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values)
+    # Object dtype on purpose: the pyarrow string dtype runs these regexes
+    # with RE2, whose \s does not match non-ASCII spaces (e.g. NBSP) the way
+    # clean_text's re does
+    uniques = pd.Series(uniques, dtype=object)
+    is_text = (uniques.map(type) == str).to_numpy()
+    cleaned = (uniques[is_text].str.lower()
+               .str.replace(r'[^a-zA-Z\s]', '', regex=True)
+               .str.replace(r'\s+', ' ', regex=True)
+               .str.strip())
+    lookup = uniques.copy()
+    lookup[is_text] = cleaned
+
+    result = lookup.to_numpy()[codes]
+    # Missing values and non-strings (1, 1.0 and True share a code) go row by row
+    other = (codes == -1) | ~is_text[codes]
+    result[other] = [str(value) for value in values[other]]
+    return pd.Series(result, index=descriptions.index, name=descriptions.name)
+
 def clean_text(text):
     """
     Cleans text by converting to lowercase and removing special characters.
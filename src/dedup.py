@@ -0,0 +1,150 @@
+import os
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from src.atomic_file import atomic_write  # type: ignore
+from src.data_processor import clean_descriptions  # type: ignore
+
+
+def row_fingerprints(df):
+    """
+    Stable uint64 fingerprint per row from (day, normalized description,
+    amount in cents, account). Vectorized with hash_pandas_object, so it
+    does not depend on how the statement spelled the date or cased the
+    description.
+    """
+    dates = pd.to_datetime(df['date'], errors='coerce') if 'date' in df.columns else pd.Series(pd.NaT, index=df.index)
+    days = dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    if 'clean_description' in df.columns:
+        description = df['clean_description'].astype(str)
+    else:
+        description = clean_descriptions(df['description'])
+    amount = pd.to_numeric(df['amount'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    account = df['account'].astype(str) if 'account' in df.columns else ''
+    keys = pd.DataFrame({
+        'day': days,
+        # Dates that did not parse are compared as written
+        'raw_date': df['date'].astype(str).where(dates.isna(), '') if 'date' in df.columns else '',
+        'description': description.to_numpy(dtype=object),
+        'cents': np.rint(amount * 100).astype(np.int64),
+        'account': account
+    })
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def unseen_occurrences(fingerprints, counts):
+    """
+    Marks the occurrences of each fingerprint beyond the `counts` already
+    recorded for it, so the k-th identical row is new only when fewer than
+    k were recorded.
+
+    Returns:
+        Boolean mask aligned to fingerprints.
+    """
+    codes, uniques = pd.factorize(fingerprints)
+    known = np.array([counts.get(fp, 0) for fp in uniques.tolist()], dtype=np.int64)
+    occurrence = pd.Series(codes).groupby(codes).cumcount().to_numpy() + 1
+    return occurrence > known[codes]
+
+
+def add_counts(counts, fingerprints, sign=1):
+    """
+    Adds (or with sign=-1 removes) one occurrence per fingerprint to the
+    `counts` dict, dropping fingerprints that reach zero.
+    """
+    added = pd.Series(fingerprints).value_counts(sort=False)
+    for fp, n in zip(added.index.tolist(), added.tolist()):
+        count = counts.get(fp, 0) + sign * n
+        if count > 0:
+            counts[fp] = count
+        else:
+            counts.pop(fp, None)
+
+
+class FingerprintIndex:
+    """
+    Persisted index of the rows already ingested for a user, used to drop
+    rows that reappear when statements overlap.
+
+    Identical rows inside one statement are real (two coffees of the same
+    price on one day), so the index keeps, per fingerprint, the most times
+    it occurred in any single statement. A new statement keeps only the
+    occurrences beyond that count. Lookups touch only the upload's distinct
+    fingerprints and new counts are appended to the index file, so an
+    upload costs O(rows in the upload) whatever the history size.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.counts = {}
+        # Entries not yet written to disk
+        self._pending = {}
+        self._rewrite = False
+
+    def __len__(self):
+        return len(self.counts)
+
+    def reset(self):
+        """
+        Forgets all rows (the user's data is being replaced).
+        """
+        self.counts = {}
+        self._pending = {}
+        self._rewrite = True
+
+    def dedupe(self, df):
+        """
+        Drops rows of one statement that are already in the index and
+        records the rest.
+
+        Returns:
+            (kept rows, number of rows dropped)
+        """
+        if df.empty or not {'description', 'amount'} <= set(df.columns):
+            return df, 0
+        fingerprints = row_fingerprints(df)
+        keep = unseen_occurrences(fingerprints, self.counts)
+        added = pd.Series(fingerprints[keep]).value_counts(sort=False)
+        for fp, new in zip(added.index.tolist(), added.tolist()):
+            count = self.counts.get(fp, 0) + new
+            self.counts[fp] = count
+            self._pending[fp] = count
+        dropped = int((~keep).sum())
+        return (df[keep].reset_index(drop=True) if dropped else df), dropped
+
+    def save(self):
+        """
+        Appends new counts to the index file (rewrites it after a reset).
+        """
+        if not self.path or not (self._pending or self._rewrite):
+            return
+        entries = self.counts if self._rewrite else self._pending
+        records = np.empty((len(entries), 2), dtype=np.uint64)
+        records[:, 0] = np.fromiter(entries.keys(), dtype=np.uint64, count=len(entries))
+        records[:, 1] = np.fromiter(entries.values(), dtype=np.uint64, count=len(entries))
+        try:
+            if self._rewrite:
+                atomic_write(self.path, records.tofile)
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, 'ab') as f:
+                    records.tofile(f)
+            self._pending = {}
+            self._rewrite = False
+        except Exception as e:
+            print(f"Failed to save fingerprint index: {e}")
+
+    def load(self):
+        """
+        Restores the index, if any. Later records for a fingerprint win
+        (counts only grow).
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            records = np.fromfile(self.path, dtype=np.uint64).reshape(-1, 2)
+        except Exception as e:
+            print(f"Failed to load fingerprint index: {e}")
+            return
+        self.counts = dict(zip(records[:, 0].tolist(), records[:, 1].tolist()))
+        self._pending = {}
+        self._rewrite = False
@@ -0,0 +1,393 @@
+"""
+Chunked streaming ingestion of statement CSVs.
+
+    read_chunks -> process_chunks -> ChunkStore.append   (pass 1)
+    ChunkStore chunks -> AnomalyDetector -> flag columns (pass 2)
+
+Each stage is a generator over DataFrame chunks, so peak memory follows the
+chunk size rather than the file size. The only state carried across chunks
+is what the anomaly stage needs globally: running count / mean / M2 of the
+expense amounts and a bounded uniform sample to fit the IsolationForest on.
+
+The store keeps one directory per chunk with one .npy file per column;
+text columns are saved as int32 codes plus their distinct values, so no
+pickles are involved (pyarrow is not a dependency, so Parquet is not used).
+"""
+
+import io
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from src.bank_formats import detect_layout  # type: ignore
+from src.data_processor import load_data, preprocess_data  # type: ignore
+
+SCHEMA = 'columns.json'
+
+MONTH_NAMES = {'jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+               'january', 'february', 'march', 'april', 'june', 'july', 'august', 'september', 'october',
+               'november', 'december'}
+
+# File-name words that describe the statement period, not the account
+PERIOD_TOKENS = MONTH_NAMES | {'statement', 'stmt', 'to', 'from', 'period', 'q1', 'q2', 'q3', 'q4'}
+
+# All-digit date parts of file names ("2024", "032024", "20240301"), by length
+DIGIT_DATE_FORMATS = {4: ['%Y'], 6: ['%Y%m', '%m%Y', '%d%m%y', '%y%m%d'], 8: ['%Y%m%d', '%d%m%Y']}
+
+
+def read_chunks(file, chunksize=50000, format=None):
+    """
+    Yields the CSV in chunks of `chunksize` rows, parsed with the layout
+    detected from its first rows (same handling as load_data).
+    """
+    try:
+        layout = detect_layout(file, format)
+        if layout is not None:
+            yield from layout.read(file, chunksize)
+            return
+        for chunk in pd.read_csv(file, chunksize=chunksize):
+            chunk.columns = [c.lower().strip() for c in chunk.columns]
+            yield chunk
+    except Exception as e:
+        raise ValueError(f"Failed to read CSV: {e}")
+
+
+def process_chunks(chunks, categorizer):
+    """
+    Cleans and categorizes each chunk.
+    """
+    for chunk in chunks:
+        yield categorizer.predict(preprocess_data(chunk))
+
+
+class ChunkStore:
+    """
+    On-disk columnar store of processed transactions, appended chunk by
+    chunk and read back one chunk (or column) at a time.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def reset(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _parts(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(p for p in os.listdir(self.root) if p.startswith('part-'))
+
+    def __len__(self):
+        return len(self._parts())
+
+    def _part_dir(self, number):
+        return os.path.join(self.root, f"part-{number:05d}")
+
+    @staticmethod
+    def _read_schema(part_dir):
+        with open(os.path.join(part_dir, SCHEMA), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_columns(part_dir, df, start=0):
+        """
+        Saves each column of df as c<start>, c<start + 1>, ... and returns
+        their schema entries.
+        """
+        schema = []
+        for i, col in enumerate(df.columns, start):
+            values, path = df[col], os.path.join(part_dir, f"c{i}")
+            if pd.api.types.is_datetime64_dtype(values):
+                np.save(f"{path}.npy", values.to_numpy())
+                kind = 'datetime'
+            elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                np.save(f"{path}.npy", values.to_numpy())
+                kind = 'numeric'
+            else:
+                codes, uniques = pd.factorize(values.astype(object))
+                np.save(f"{path}.codes.npy", codes.astype(np.int32))
+                np.save(f"{path}.values.npy", np.asarray(uniques, dtype=str))
+                kind = 'text'
+            schema.append({'name': col, 'file': f"c{i}", 'kind': kind})
+        return schema
+
+    @staticmethod
+    def _write_schema(part_dir, schema):
+        with open(os.path.join(part_dir, SCHEMA), 'w', encoding='utf-8') as f:
+            json.dump(schema, f)
+
+    def append(self, df):
+        """
+        Writes df as the next chunk (atomically, via a temp directory).
+
+        Returns:
+            The chunk number.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        number = len(self)
+        tmp_dir = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            self._write_schema(tmp_dir, self._write_columns(tmp_dir, df))
+            os.rename(tmp_dir, self._part_dir(number))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return number
+
+    def add_columns(self, number, df):
+        """
+        Adds (or replaces) columns of an existing chunk.
+        """
+        part_dir = self._part_dir(number)
+        schema = self._read_schema(part_dir)
+        start = 1 + max(int(col['file'][1:]) for col in schema)
+        added = self._write_columns(part_dir, df, start)
+        self._write_schema(part_dir, [col for col in schema if col['name'] not in df.columns] + added)
+
+    def read(self, number, columns=None):
+        part_dir = self._part_dir(number)
+        data = {}
+        for col in self._read_schema(part_dir):
+            if columns is not None and col['name'] not in columns:
+                continue
+            path = os.path.join(part_dir, col['file'])
+            if col['kind'] == 'text':
+                codes = np.load(f"{path}.codes.npy")
+                uniques = np.load(f"{path}.values.npy").astype(object)
+                values = np.full(len(codes), np.nan, dtype=object)
+                values[codes >= 0] = uniques[codes[codes >= 0]]
+                data[col['name']] = values
+            else:
+                data[col['name']] = np.load(f"{path}.npy")
+        return pd.DataFrame(data)
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self.read(number)
+
+    def load(self, columns=None):
+        """
+        All chunks as one DataFrame.
+        """
+        frames = [self.read(number, columns) for number in range(len(self))]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    @property
+    def nbytes(self):
+        total = 0
+        for part in self._parts():
+            part_dir = os.path.join(self.root, part)
+            total += sum(os.path.getsize(os.path.join(part_dir, f)) for f in os.listdir(part_dir))
+        return total
+
+
+class ExpenseReducer:
+    """
+    Global expense statistics reduced across chunks: running count / mean /
+    M2 (Chan's merge) for the z-scores and a uniform sample of at most
+    `sample_size` amounts (smallest random keys win) to fit the forest.
+    """
+
+    def __init__(self, sample_size=50000, seed=42):
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sample = np.empty(0)
+        self.keys = np.empty(0)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        count = self.count + len(values)
+        batch_mean = values.mean()
+        delta = batch_mean - self.mean
+        self.m2 += ((values - batch_mean) ** 2).sum() + delta ** 2 * self.count * len(values) / count
+        self.mean += delta * len(values) / count
+        self.count = count
+
+        keys = np.concatenate([self.keys, self.rng.random(len(values))])
+        sample = np.concatenate([self.sample, values])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, sample = keys[keep], sample[keep]
+        self.keys, self.sample = keys, sample
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+def ingest_csv(file, categorizer, detector, store, chunksize=50000, format=None):
+    """
+    Streams a statement CSV into `store` (replacing its contents): cleans,
+    categorizes and flags anomalies chunk by chunk.
+
+    Returns:
+        Dict with rows, chunks, expense mean/std and per-pass seconds.
+    """
+    store.reset()
+    reducer = ExpenseReducer(sample_size=detector.forest.max_fit_rows)
+
+    start = time.perf_counter()
+    rows = 0
+    for chunk in process_chunks(read_chunks(file, chunksize, format), categorizer):
+        store.append(chunk)
+        rows += len(chunk)
+        amount_col = detector._amount_column(chunk)
+        if amount_col:
+            amounts = pd.to_numeric(chunk[amount_col], errors='coerce').fillna(0).abs().to_numpy()
+            reducer.update(amounts[detector._categories(chunk) != 'income'])
+    categorizer.cache.save()
+    process_seconds = time.perf_counter() - start
+
+    # The forest sees a uniform sample of every expense; z-scores use the global stats
+    start = time.perf_counter()
+    if reducer.count and detector.forest.needs_refit(reducer.count):
+        detector.forest.fit(reducer.sample)
+        detector.forest.save()
+    for number in range(len(store)):
+        chunk = detector.detect_anomalies(store.read(number), global_stats=(reducer.mean, reducer.std), save=False)
+        store.add_columns(number, chunk[['is_anomaly', 'anomaly_reason']])
+    detector.save()
+
+    return {
+        'rows': rows,
+        'chunks': len(store),
+        'expense_mean': reducer.mean,
+        'expense_std': reducer.std,
+        'process_seconds': round(process_seconds, 3),
+        'anomaly_seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def account_name(file_name):
+    """
+    Suggested account label for a statement file, without the period part,
+    so overlapping exports of one account share it ("HDFC_Mar-2024.csv" ->
+    "hdfc") while numbered accounts stay apart ("card_4321_2024-03.csv" ->
+    "card_4321"). Only a default: the uploader lets the user confirm or
+    change the account, which is what duplicate detection keys on.
+    """
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    # Browsers save repeated downloads as "statement (1).csv"
+    stem = re.sub(r'\s*\(\d+\)$', '', stem)
+    tokens = [t for t in re.split(r'[\W_]+', stem.lower()) if t]
+    period = [_is_period_token(t) for t in tokens]
+    # Four digits look like a year; when another token already dates the
+    # file ("mar2024", "20240301"), they are a card or account number
+    dated = any(p and _has_year(t) for t, p in zip(tokens, period))
+    kept = [t for t, p in zip(tokens, period) if not p or (dated and t.isdigit() and len(t) == 4)]
+    return '_'.join(kept) or '_'.join(tokens) or stem
+
+
+def _is_date_digits(digits):
+    if len(digits) <= 2:
+        # Day, month or two-digit year
+        return True
+    for date_format in DIGIT_DATE_FORMATS.get(len(digits), []):
+        try:
+            parsed = datetime.strptime(digits, date_format)
+        except ValueError:
+            continue
+        if 1990 <= parsed.year <= 2099:
+            return True
+    return False
+
+
+def _has_year(token):
+    # "mar2024", "032024", "20240301"; a bare "2024" is ambiguous
+    digits = re.sub(r'[a-z]', '', token)
+    return len(digits) >= 6 or (len(digits) == 4 and digits != token)
+
+
+def _is_period_token(token):
+    if token in PERIOD_TOKENS:
+        return True
+    # "2024", "mar2024", "2024mar"
+    match = re.fullmatch(r'([a-z]*)(\d+)([a-z]*)', token)
+    if match is None or (match.group(1) and match.group(3)):
+        return False
+    letters = match.group(1) or match.group(3)
+    return (not letters or letters in MONTH_NAMES) and _is_date_digits(match.group(2))
+
+
+def parse_statement(name, data, format=None, account=None):
+    """
+    Reads and cleans one uploaded statement. Runs in a worker process, so
+    it takes and returns only picklable values. Rows get `account`, or the
+    file name's account_name when it is not given.
+
+    Returns:
+        (name, DataFrame, seconds)
+    """
+    start = time.perf_counter()
+    df = preprocess_data(load_data(io.BytesIO(data), format))
+    df['account'] = account or account_name(name)
+    return name, df, time.perf_counter() - start
+
+
+def ingest_files(files, categorizer, max_workers=None, format=None, index=None, accounts=None):
+    """
+    Parses and cleans several statements in parallel, then categorizes the
+    merged frame once with the (already loaded) categorizer.
+
+    Each row gets an 'account' column: its file's entry in `accounts`, or
+    account_name of the file name. Parsing fans
+    out over a process pool; categorizing stays in this process so the
+    model is not copied into every worker, and merchants repeated across
+    months are predicted once.
+
+    Args:
+        files: iterable of (file name, bytes).
+        max_workers: worker processes (default: one per CPU); 1 parses serially.
+        index: optional FingerprintIndex; each file's rows already in it
+            (e.g. from an overlapping statement earlier in the list) are dropped.
+        accounts: optional account label per file, as chosen by the user.
+
+    Returns:
+        (DataFrame sorted by date, list of per-file timing dicts)
+    """
+    files = list(files)
+    if not files:
+        return pd.DataFrame(), []
+    workers = min(max_workers or os.cpu_count() or 1, len(files))
+    names = [name for name, _ in files]
+    payloads = [data for _, data in files]
+    formats = [format] * len(files)
+    accounts = list(accounts) if accounts is not None else [None] * len(files)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(parse_statement, names, payloads, formats, accounts))
+    else:
+        parsed = list(map(parse_statement, names, payloads, formats, accounts))
+
+    duplicates = [0] * len(parsed)
+    if index is not None:
+        for i, (name, frame, seconds) in enumerate(parsed):
+            frame, duplicates[i] = index.dedupe(frame)
+            parsed[i] = (name, frame, seconds)
+    df = pd.concat([frame for _, frame, _ in parsed], ignore_index=True)
+    df = categorizer.predict(df)
+    categorizer.cache.save()
+    if 'date' in df.columns:
+        # Files whose dates did not parse keep strings; sort those as dates too
+        df = df.sort_values('date', kind='stable', ignore_index=True,
+                            key=lambda dates: pd.to_datetime(dates, errors='coerce'))
+
+    timings = [{'file': name, 'rows': len(frame), 'duplicates': dropped, 'parse_seconds': round(seconds, 3)}
+               for (name, frame, seconds), dropped in zip(parsed, duplicates)]
+    return df, timings
@@ -0,0 +1,105 @@
+import re
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+
+class KeywordMatcher:
+    """
+    Compiled keyword -> category matcher used by the heuristic categorizer.
+
+    All keywords are folded into a single alternation regex that is compiled
+    once, so each description is scanned in one pass instead of running one
+    `re.search` per keyword. Matching keeps the old loop semantics:
+    - every keyword must sit on word boundaries ("bus" matches "school bus"
+      but not "business")
+    - when several keywords match, the one listed first wins, regardless of
+      where it appears in the description
+    """
+
+    def __init__(self, keywords, fallback_labels=None, default="Uncategorized"):
+        """
+        Args:
+            keywords: Ordered dict of keyword -> category (earlier wins).
+            fallback_labels: Category names that are matched by their own name
+                if no keyword hits (e.g. "Department of Transport").
+            default: Returned when nothing matches.
+        """
+        self.default = default
+
+        # Ordered table of (term, category); the position is the precedence
+        self.terms = []
+        self.categories = []
+        seen = set()
+        for key, category in keywords.items():
+            term = str(key).lower()
+            if term and term not in seen:
+                seen.add(term)
+                self.terms.append(term)
+                self.categories.append(category)
+
+        for label in fallback_labels or []:
+            term = str(label).lower()
+            if term and term not in seen:
+                seen.add(term)
+                self.terms.append(term)
+                self.categories.append(label)
+
+        self.rank = {term: i for i, term in enumerate(self.terms)}
+
+        # The lookahead makes every match zero-width, so overlapping terms
+        # ("gas" / "gas bill") are all visited. At each position the
+        # alternation tries terms in precedence order.
+        if self.terms:
+            alternation = '|'.join(re.escape(t) for t in self.terms)
+            self.pattern = re.compile(r'\b(?=(' + alternation + r')\b)')
+        else:
+            self.pattern = None
+
+    def match_rank(self, text):
+        """
+        Returns the precedence index of the best matching term, or None.
+        """
+        if self.pattern is None:
+            return None
+
+        best = None
+        for m in self.pattern.finditer(str(text).lower()):
+            r = self.rank[m.group(1)]
+            if best is None or r < best:
+                best = r
+                if best == 0:
+                    break
+        return best
+
+    def match(self, text):
+        """
+        Returns the category for a single description.
+        """
+        r = self.match_rank(text)
+        if r is None:
+            return self.default
+        return self.categories[r]
+
+    def match_series(self, texts):
+        """
+        Vectorized version of `match` for a whole description column.
+
+        Runs one regex pass per row via `str.findall`, then resolves
+        precedence with column operations (explode -> rank -> groupby min)
+        instead of a Python loop per row.
+
+        Returns:
+            Series of categories aligned to the input index.
+        """
+        texts = pd.Series(texts, copy=False)
+        out = np.full(len(texts), self.default, dtype=object)
+
+        if self.pattern is not None and len(texts):
+            lowered = texts.astype(str).str.lower().reset_index(drop=True)
+            hits = lowered.str.findall(self.pattern).explode().dropna()
+            if not hits.empty:
+                best = hits.map(self.rank).groupby(level=0).min().astype(int)
+                categories = np.asarray(self.categories, dtype=object)
+                out[best.index.to_numpy()] = categories[best.to_numpy()]
+
+        return pd.Series(out, index=texts.index, dtype=object)
@@ -0,0 +1,225 @@
+import os
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import joblib  # type: ignore
+from scipy.sparse import coo_matrix  # type: ignore
+from scipy.sparse.csgraph import connected_components  # type: ignore
+from src.atomic_file import atomic_write  # type: ignore
+
+# Payment-channel words that are not part of a merchant's name
+NOISE_TOKENS = {
+    'pos', 'upi', 'neft', 'imps', 'rtgs', 'ach', 'ecs', 'nach', 'card', 'debit', 'credit',
+    'ref', 'txn', 'trf', 'transfer', 'payment', 'purchase', 'online', 'to', 'from', 'via', 'at'
+}
+
+def normalize_merchant(descriptions, max_tokens=2):
+    """
+    Vectorized merchant key: lowercase letters only, payment-channel words
+    dropped, first `max_tokens` words kept ("UBER *TRIP 8812 POS" -> "uber trip").
+    Each distinct description is normalized once.
+    """
+    # Object first: a categorical column cannot take '' as a new value
+    codes, uniques = pd.factorize(pd.Series(descriptions, copy=False).astype(object).fillna('').astype(str))
+    tokens = pd.Series(uniques, dtype=object).str.lower().str.replace(r'[^a-z\s]', ' ', regex=True).str.split()
+    # A per-group string join in pandas is far slower than a plain comprehension
+    keys = np.array([' '.join([t for t in words if t not in NOISE_TOKENS][:max_tokens]) for words in tokens],
+                    dtype=object)
+    return keys[codes] if len(keys) else np.empty(0, dtype=object)
+
+def _shingles(name):
+    padded = f" {name} "
+    # Every name, even '', gets at least one shingle
+    return {padded[i:i + 3] for i in range(max(len(padded) - 2, 1))}
+
+def _jaccard(a, b):
+    sa, sb = _shingles(a), _shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+class MerchantIndex:
+    """
+    Maps raw transaction descriptions to canonical merchant keys.
+
+    Descriptions are first token-normalized ("NETFLIX.COM 8231" ->
+    "netflix com"), then near-duplicate names are grouped: each name gets a
+    MinHash signature over character 3-grams, signatures are split into LSH
+    bands, and only names sharing a band bucket are compared (Jaccard of the
+    3-grams >= `threshold`). Matches are merged with connected components,
+    so the cost grows with the number of names, not with pairs of names.
+
+    The index is incremental: known descriptions are a dict lookup, and new
+    ones are hashed and bucketed against the existing names. Persisted with
+    joblib, one file per user.
+    """
+
+    def __init__(self, path=None, threshold=0.6, num_perm=32, bands=8, max_tokens=3, seed=42):
+        self.path = path
+        # Minimum 3-gram Jaccard similarity for two names to be one merchant
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_tokens = max_tokens
+        rng = np.random.default_rng(seed)
+        self.perm_a = rng.integers(1, 1 << 61, num_perm, dtype=np.uint64) | np.uint64(1)
+        self.perm_b = rng.integers(0, 1 << 61, num_perm, dtype=np.uint64)
+
+        # One entry per distinct normalized name
+        self.names = np.empty(0, dtype=object)
+        self.weights = np.empty(0, dtype=np.int64)
+        self.labels = np.empty(0, dtype=np.int64)
+        self.band_keys = np.empty((0, bands), dtype=np.uint64)
+        self.positions = {}
+        # Raw description -> name position
+        self.lookup = {}
+        self._saved_entries = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def version(self):
+        """
+        Changes whenever canonical names may have changed (labels are only
+        reassigned when new names are added).
+        """
+        return len(self.names)
+
+    def _band_keys(self, names):
+        """
+        MinHash signatures of the names, folded into one key per LSH band.
+        """
+        shingle_sets = [sorted(_shingles(name)) for name in names]
+        sizes = np.array([len(s) for s in shingle_sets], dtype=np.int64)
+        flat = np.array([g for s in shingle_sets for g in s], dtype=object)
+        hashes = pd.util.hash_array(flat) if len(flat) else np.empty(0, dtype=np.uint64)
+        starts = np.cumsum(sizes) - sizes
+
+        signatures = np.empty((len(names), self.num_perm), dtype=np.uint64)
+        # Bounded chunks of names keep the (shingles x permutations) matrix small
+        step = 20000
+        for lo in range(0, len(names), step):
+            hi = min(lo + step, len(names))
+            block = hashes[starts[lo]:starts[hi - 1] + sizes[hi - 1]]
+            permuted = block[:, None] * self.perm_a + self.perm_b
+            signatures[lo:hi] = np.minimum.reduceat(permuted, starts[lo:hi] - starts[lo], axis=0)
+
+        rows = self.num_perm // self.bands
+        bands = signatures[:, :rows * self.bands].reshape(len(names), self.bands, rows)
+        keys = np.full((len(names), self.bands), np.uint64(0xCBF29CE484222325))
+        for r in range(rows):
+            keys = (keys ^ bands[:, :, r]) * np.uint64(0x100000001B3)
+        return keys
+
+    def add(self, descriptions):
+        """
+        Indexes descriptions not seen before.
+
+        Returns:
+            Number of new normalized names.
+        """
+        raws = pd.unique(pd.Series(descriptions, copy=False).astype(object).fillna('').astype(str))
+        raws = [raw for raw in raws if raw not in self.lookup]
+        if not raws:
+            return 0
+        normalized = normalize_merchant(raws, self.max_tokens)
+
+        new_names = []
+        for raw, name in zip(raws, normalized):
+            if name not in self.positions:
+                self.positions[name] = len(self.names) + len(new_names)
+                new_names.append(name)
+            self.lookup[raw] = self.positions[name]
+        added = np.bincount([self.lookup[raw] for raw in raws], minlength=len(self.names) + len(new_names))
+
+        n_old = len(self.names)
+        weights = np.concatenate([self.weights, np.zeros(len(new_names), dtype=np.int64)]) + added
+        if not new_names:
+            self.weights = weights
+            return 0
+        names = np.concatenate([self.names, np.array(new_names, dtype=object)])
+        band_keys = np.concatenate([self.band_keys, self._band_keys(new_names)])
+
+        # Candidate pairs: every bucket member against the bucket's first name.
+        # Names come in insertion order, so an old name leads a mixed bucket.
+        nodes = np.arange(len(names))
+        members = nodes[names != '']
+        sources, targets = [], []
+        for b in range(self.bands if len(members) else 0):
+            bucket = pd.factorize(band_keys[members, b])[0]
+            first = np.full(bucket.max() + 1, len(names), dtype=np.int64)
+            np.minimum.at(first, bucket, members)
+            leader = first[bucket]
+            pair = (members != leader) & (members >= n_old)
+            sources.append(leader[pair])
+            targets.append(members[pair])
+        pairs = pd.DataFrame({'a': np.concatenate(sources or [nodes[:0]]),
+                              'b': np.concatenate(targets or [nodes[:0]])}).drop_duplicates()
+        similar = np.array([_jaccard(names[a], names[b]) >= self.threshold
+                            for a, b in zip(pairs['a'], pairs['b'])], dtype=bool)
+
+        # Existing clusters stay connected through their canonical name
+        edge_a = np.concatenate([pairs['a'].to_numpy()[similar], nodes[:n_old]])
+        edge_b = np.concatenate([pairs['b'].to_numpy()[similar], self.labels])
+        graph = coo_matrix((np.ones(len(edge_a)), (edge_a, edge_b)), shape=(len(names), len(names)))
+        _, component = connected_components(graph, directed=False)
+
+        # Canonical name per component: keep the largest existing cluster's,
+        # otherwise the name most descriptions map to
+        old_cluster_weight = np.zeros(len(names))
+        if n_old:
+            per_label = np.bincount(self.labels, weights=self.weights, minlength=n_old)
+            old_cluster_weight[:n_old] = np.where(self.labels == nodes[:n_old], per_label, 0)
+        ranking = pd.DataFrame({
+            'component': component, 'old': old_cluster_weight, 'weight': weights, 'node': -nodes
+        }).sort_values(['component', 'old', 'weight', 'node'])
+        canonical = ranking.groupby('component')['node'].last().to_numpy() * -1
+
+        self.names = names
+        self.weights = weights
+        self.band_keys = band_keys
+        self.labels = canonical[component]
+        return len(new_names)
+
+    def canonicalize(self, descriptions):
+        """
+        Canonical merchant key for every description (indexing new ones).
+        Descriptions without any merchant words map to ''.
+        """
+        codes, uniques = pd.factorize(pd.Series(descriptions, copy=False).astype(object).fillna('').astype(str))
+        self.add(uniques)
+        positions = np.array([self.lookup[raw] for raw in uniques], dtype=np.int64)
+        return self.names[self.labels[positions]][codes] if len(uniques) else np.empty(0, dtype=object)
+
+    def save(self):
+        """
+        Persists the index atomically (see atomic_write).
+        Skipped when nothing was added since the last save or load.
+        """
+        if not self.path or len(self.lookup) == self._saved_entries:
+            return
+        payload = {'names': self.names, 'weights': self.weights, 'labels': self.labels,
+                   'band_keys': self.band_keys, 'lookup': self.lookup}
+        try:
+            atomic_write(self.path, lambda tmp_path: joblib.dump(payload, tmp_path))
+            self._saved_entries = len(self.lookup)
+        except Exception as e:
+            print(f"Failed to save merchant index: {e}")
+
+    def load(self):
+        """
+        Restores a persisted index, if any.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            payload = joblib.load(self.path)
+        except Exception as e:
+            print(f"Failed to load merchant index: {e}")
+            return
+        self.names = payload['names']
+        self.weights = payload['weights']
+        self.labels = payload['labels']
+        self.band_keys = payload['band_keys']
+        self.lookup = payload['lookup']
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self._saved_entries = len(self.lookup)
@@ -1,19 +1,67 @@
 import pandas as pd  # type: ignore
 from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
-from sklearn.ensemble import RandomForestClassifier  # type: ignore
-from sklearn.ensemble import IsolationForest  # type: ignore
+from sklearn.feature_extraction.text import HashingVectorizer  # type: ignore
+from sklearn.ensemble import IsolationForest, RandomForestClassifier  # type: ignore
+from sklearn.linear_model import SGDClassifier  # type: ignore
 import numpy as np  # type: ignore
 import joblib  # type: ignore
 import os
-import re
+import copy
+import threading
+import time
+import uuid
+import sklearn  # type: ignore
+from src.keyword_matcher import KeywordMatcher  # type: ignore
+from src.prediction_cache import PredictionCache  # type: ignore
+from src.model_registry import get_model_registry  # type: ignore
+from src.model_artifact import artifact_exists, save_artifact  # type: ignore
+from src.compact_forest import CompactForest  # type: ignore
+from src.atomic_file import atomic_write  # type: ignore
+
+def _factorize(values):
+    """
+    Returns (codes, uniques) so per-row results can be computed once per
+    unique value and broadcast back with `results[codes]`.
+    Missing values are kept as their own unique instead of a -1 code.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, copy=False), use_na_sentinel=False)
+    return codes, np.asarray(uniques, dtype=object)
 
 class ExpenseCategorizer:
+    CATEGORIES = ['Utilities', 'Health', 'Housing', 'Shopping', 'Food', 'Dining', 'Transport', 'Travel', 'Services', 'Entertainment', 'Income']
+
     def __init__(self, model_path='expense_model.pkl'):
         self.vectorizer = TfidfVectorizer(stop_words='english')
         self.clf = RandomForestClassifier(n_estimators=100, random_state=42)
         self.is_trained = False
         self.model_path = model_path
+        # Versioned, memory-mappable artifact directory (see model_artifact);
+        # model_path itself is only read as a legacy single-file pickle
+        self.artifact_dir = os.path.splitext(model_path)[0]
+        self.manifest = {}
         self.confidence_threshold = 0.4
+        # Rows per forest pass; bounds the dense (rows x classes) probability matrix
+        self.predict_chunk_size = 10000
+        self.model_version = None
+        # 'batch' = TF-IDF + RandomForest refit, 'incremental' = hashing + partial_fit
+        self.mode = 'batch'
+        self.incremental_epochs = 5
+        # Fingerprints of (clean_description, category) pairs already learned online
+        self.learned = np.empty(0, dtype=np.uint64)
+        # Guards swapping the (vectorizer, clf) pair while predictions run
+        self._lock = threading.RLock()
+        # True while vectorizer/clf are the read-only objects shared via ModelRegistry
+        self._shared_model = False
+        # Array-backed copy of a batch forest used for serving (see CompactForest);
+        # the sklearn forest is persisted next to it as the fallback
+        self.forest = None
+        # Serve batch models from the compact forest when it passes the parity check
+        self.use_compact_forest = True
+        # Training rows used to check the compact forest against sklearn
+        self.forest_check_rows = 2000
+
+        # Persistent clean_description -> (category, confidence) cache
+        self.cache = PredictionCache(os.path.splitext(model_path)[0] + '_cache.pkl')
         
         # Simple rule-based fallback for the MVP to show immediate value
         self.keywords = {
@@ -90,34 +138,13 @@ class ExpenseCategorizer:
             'upi received': 'Income', 'credit': 'Income', 'reimbursement': 'Income'
         }
 
-    # ... (train/predict methods remain same) ...
-
-    def _get_heuristic_category(self, description):
-        desc_lower = str(description).lower()
-        
-        # 1. Exact/Partial Keyword Match using Regex (Word Boundaries)
-        for key, category in self.keywords.items():
-            # Use regex to match whole words and prevent partial matches
-            # e.g. "bus" matches "school bus" but not "business"
-            # Escape key to handle special chars if any
-            pattern = r'\b' + re.escape(key) + r'\b'
-            if re.search(pattern, desc_lower):
-                return category
-                
-        # 2. Check if category name itself is in description
-        # e.g. "Department of Transport" -> Transport
-        possible_cats = ['Utilities', 'Health', 'Housing', 'Shopping', 'Food', 'Dining', 'Transport', 'Travel', 'Services', 'Entertainment', 'Income']
-        for cat in possible_cats:
-             # Also use boundaries for categories 
-            pattern = r'\b' + re.escape(cat.lower()) + r'\b'
-            if re.search(pattern, desc_lower):
-                return cat
-                
-        return "Uncategorized"
+        # Compile keywords (and category names as a last resort) once
+        self.matcher = KeywordMatcher(self.keywords, fallback_labels=self.CATEGORIES)
 
-    def train(self, df):
+    def _training_rows(self, df):
         """
-        Trains the model on the provided dataframe.
+        Validates the dataframe and returns the labeled rows to learn from,
+        or None if there are none.
         """
         # Ensure clean description
         if 'clean_description' not in df.columns:
@@ -137,16 +164,156 @@ class ExpenseCategorizer:
         
         if df_train.empty:
             print("No training data available.")
+            return None
+        return df_train
+
+    def train(self, df):
+        """
+        Trains the model on the provided dataframe (full batch refit).
+        """
+        df_train = self._training_rows(df)
+        if df_train is None:
             return
 
+        # Never refit objects that other sessions share
+        if self.mode != 'batch' or self._shared_model:
+            self.vectorizer = TfidfVectorizer(stop_words='english')
+            self.clf = RandomForestClassifier(n_estimators=100, random_state=42)
+            self.mode = 'batch'
+            self._shared_model = False
+        self.learned = np.empty(0, dtype=np.uint64)
+
         print(f"Training on {len(df_train)} records...")
+        start = time.perf_counter()
         X = self.vectorizer.fit_transform(df_train['clean_description'])
         y = df_train['category']
         
         self.clf.fit(X, y)
+        self.forest = self._build_forest(X)
+        self._finish_training(len(df_train), time.perf_counter() - start)
+        print("Model trained and saved.")
+
+    def _build_forest(self, X):
+        """
+        Flattens the fitted forest for serving. It is kept only if, on a
+        sample of the training matrix, it reproduces sklearn's probabilities
+        exactly, so the engine depends on the data alone; otherwise (or with
+        use_compact_forest off) returns None and sklearn serves.
+        """
+        if not self.use_compact_forest:
+            return None
+        try:
+            forest = CompactForest.from_sklearn(self.clf)
+            sample = X[:self.forest_check_rows]
+            if not np.array_equal(forest.predict_proba(sample), self.clf.predict_proba(sample)):
+                print("Compact forest does not match sklearn; serving with sklearn.")
+                return None
+        except Exception as e:
+            print(f"Compact forest unavailable: {e}")
+            return None
+        return forest
+
+    def train_incremental(self, df):
+        """
+        Online update from only the rows the model has not learned yet.
+
+        Uses a stateless HashingVectorizer and an SGDClassifier updated with
+        partial_fit, so cost grows with the size of the edit rather than the
+        history. Rows are matched on a (clean_description, category)
+        fingerprint, so re-submitting the whole frame is cheap.
+
+        Bootstraps from all given rows when switching from batch mode or when
+        a category appears that the model has no class for (partial_fit needs
+        the full class list upfront).
+        """
+        df_train = self._training_rows(df)
+        if df_train is None:
+            return
+
+        descriptions = df_train['clean_description'].astype(str)
+        labels = df_train['category'].astype(str)
+        fingerprints = pd.util.hash_pandas_object(
+            pd.DataFrame({'d': descriptions, 'c': labels}), index=False
+        ).to_numpy()
+
+        new_labels = set(labels.unique())
+        bootstrap = self.mode != 'incremental' or not new_labels.issubset(set(self.clf.classes_))
+        if bootstrap:
+            classes = np.array(sorted(set(self.CATEGORIES) | new_labels), dtype=object)
+            self.vectorizer = HashingVectorizer(stop_words='english', n_features=2 ** 18, alternate_sign=False)
+            self.clf = SGDClassifier(loss='log_loss', random_state=42)
+            self.learned = np.empty(0, dtype=np.uint64)
+            self.forest = None
+            self._shared_model = False
+            is_new = np.ones(len(df_train), dtype=bool)
+        else:
+            classes = self.clf.classes_
+            is_new = ~np.isin(fingerprints, self.learned)
+
+        if not is_new.any():
+            print("No new labels to learn.")
+            return
+
+        print(f"Updating on {int(is_new.sum())} new records...")
+        start = time.perf_counter()
+        # partial_fit mutates in place, so copy a shared model first
+        if self._shared_model:
+            self.clf = copy.deepcopy(self.clf)
+            self._shared_model = False
+        X = self.vectorizer.transform(descriptions[is_new])
+        y = labels[is_new].to_numpy()
+        for _ in range(self.incremental_epochs):
+            self.clf.partial_fit(X, y, classes=classes)
+
+        self.learned = np.union1d(self.learned, fingerprints[is_new])
+        self.mode = 'incremental'
+        self._finish_training(int(is_new.sum()), time.perf_counter() - start)
+        print("Model updated and saved.")
+
+    def clone(self):
+        """
+        Copy of the current model state that can be trained off to the side
+        (see TrainingWorker) without blocking predictions on this instance.
+        """
+        with self._lock:
+            other = ExpenseCategorizer(model_path=self.model_path)
+            other.vectorizer = copy.deepcopy(self.vectorizer)
+            other.clf = copy.deepcopy(self.clf)
+            # Forest arrays are never modified, so the copy can share them
+            for attr in ('is_trained', 'model_version', 'mode', 'learned', 'forest', 'confidence_threshold',
+                         'predict_chunk_size', 'incremental_epochs', 'use_compact_forest',
+                         'forest_check_rows'):
+                setattr(other, attr, getattr(self, attr))
+        return other
+
+    def adopt(self, other):
+        """
+        Atomically swaps in the model trained on `other`.
+        """
+        with self._lock:
+            self.vectorizer, self.clf = other.vectorizer, other.clf
+            self.forest = other.forest
+            self.is_trained = other.is_trained
+            self.model_version = other.model_version
+            self.mode = other.mode
+            self.learned = other.learned
+            self._shared_model = other._shared_model
+            self.cache.reset(self._cache_version())
+
+    def _finish_training(self, rows, seconds):
         self.is_trained = True
+        # New version invalidates every cached prediction
+        self.model_version = uuid.uuid4().hex
+        self.cache.reset(self._cache_version())
+        self.manifest = {
+            'mode': self.mode,
+            'train_rows': rows,
+            'train_seconds': round(seconds, 4),
+            'learned_rows': int(len(self.learned)),
+            'engine': 'compact_forest' if self.forest is not None else 'sklearn',
+            'sklearn_version': sklearn.__version__
+        }
         self.save_model()
-        print("Model trained and saved.")
 
     def predict(self, df):
         """
@@ -167,37 +334,32 @@ class ExpenseCategorizer:
             return self._heuristic_categorize(df)
         
         try:
-            # Transform
-            X = self.vectorizer.transform(df['clean_description'].fillna(''))
-            
-            # Predict Probabilities
-            probs = self.clf.predict_proba(X)
-            max_probs = np.max(probs, axis=1)
-            predictions = self.clf.predict(X)
-            
-            # Update category column based on threshold
-            # We want to keep existing categories if they are strong? 
-            # Or overwrite? Users might have manually edited.
-            # Ideally, we only predict for 'Unknown' or overwrite all if 'Retrain' is called.
-            # But the requirement implies using ML to categorize.
-            # Let's apply to all, but fallback to heuristic if confidence is low.
-            
-            final_cats = []
-            for pred, prob, desc in zip(predictions, max_probs, df['clean_description']):
-                if prob >= self.confidence_threshold:
-                    final_cats.append(pred)
-                else:
-                    # Fallback to heuristic for this item
-                    heur_cat = self._get_heuristic_category(desc)
-                    # If heuristic is "Uncategorized", maybe keep the weak ML prediction or just say Unknown?
-                    # Let's use the weak prediction if heuristic fails, or heuristic if it succeeds.
-                    if heur_cat != "Uncategorized":
-                        final_cats.append(heur_cat)
-                    else:
-                        final_cats.append(pred) # Trust the weak ML over nothing? Or set "Unknown"?
-                        # Let's trust weak ML over nothing, it's a "best guess"
-                        
-            df['category'] = final_cats
+            # Statements repeat the same merchants, so run the vectorizer and
+            # forest once per unique description and broadcast back by code
+            codes, uniques = _factorize(df['clean_description'].astype(object).fillna(''))
+
+            # Serve previously seen descriptions from the cache
+            if self.cache.version != self._cache_version():
+                self.cache.reset(self._cache_version())
+            found, unique_cats, _ = self.cache.lookup(uniques)
+            missing = ~found
+
+            if missing.any():
+                new_descs = uniques[missing]
+
+                # One forest pass per chunk; labels come from the same probabilities
+                predictions, max_probs = self._predict_labels(new_descs)
+
+                # Confident ML first, heuristic for the rest, weak ML as last resort
+                new_cats = self.categorize_descriptions(
+                    new_descs, predictions=predictions, confidences=max_probs
+                ).to_numpy()
+
+                unique_cats[missing] = new_cats
+                self.cache.update(new_descs, new_cats, max_probs)
+                self.cache.save_if_due()
+
+            df['category'] = unique_cats[codes]
             
         except Exception as e:
             print(f"Prediction failed, falling back to heuristic: {e}")
@@ -205,155 +367,436 @@ class ExpenseCategorizer:
             
         return df
 
+    def _predict_labels(self, descriptions):
+        """
+        Returns (labels, confidences) for an array of clean descriptions.
+
+        Walks the forest once via predict_proba (the compact forest when
+        available) and derives labels with argmax over classes_ (what
+        clf.predict does internally), processing fixed-size chunks so only a
+        chunk-sized probability matrix is alive.
+        """
+        # Snapshot the pair so a concurrent adopt() cannot mix models
+        with self._lock:
+            vectorizer = self.vectorizer
+            clf = self.forest if self.forest is not None else self.clf
+
+        n = len(descriptions)
+        classes = clf.classes_
+        labels = np.empty(n, dtype=classes.dtype)
+        confidences = np.empty(n, dtype=float)
+
+        for start in range(0, n, self.predict_chunk_size):
+            stop = min(start + self.predict_chunk_size, n)
+            X = vectorizer.transform(descriptions[start:stop])
+            probs = clf.predict_proba(X)
+            best = np.argmax(probs, axis=1)
+            labels[start:stop] = classes[best]
+            confidences[start:stop] = probs[np.arange(len(best)), best]
+
+        return labels, confidences
+
+    def categorize_descriptions(self, descriptions, predictions=None, confidences=None):
+        """
+        Batch categorization for a whole description column.
+
+        Rules are applied in order with boolean masks, and each rule only
+        sees the rows left unresolved by the previous one:
+        1. Confident ML prediction (confidence >= threshold)
+        2. Keyword heuristic
+        3. Weak ML prediction as a best guess, else "Uncategorized"
+
+        Args:
+            descriptions: Series/array of descriptions.
+            predictions: Optional ML labels per row.
+            confidences: Optional ML max probability per row.
+
+        Returns:
+            Series of categories aligned to `descriptions`.
+        """
+        descriptions = pd.Series(descriptions, copy=False)
+        n = len(descriptions)
+
+        if predictions is None:
+            predictions = np.full(n, "Uncategorized", dtype=object)
+            confident = np.zeros(n, dtype=bool)
+        else:
+            predictions = np.asarray(predictions, dtype=object)
+            confident = np.asarray(confidences) >= self.confidence_threshold
+
+        heuristic = np.full(n, "Uncategorized", dtype=object)
+        unresolved = ~confident
+        if unresolved.any():
+            heuristic[unresolved] = self.matcher.match_series(descriptions[unresolved]).to_numpy()
+
+        final = np.select(
+            [confident, heuristic != "Uncategorized"],
+            [predictions, heuristic],
+            default=predictions
+        )
+        return pd.Series(final, index=descriptions.index, dtype=object)
+
+    @property
+    def artifact_path(self):
+        """
+        Path the model is loaded from: the artifact directory, or the legacy
+        pickle if only that exists.
+        """
+        if artifact_exists(self.artifact_dir) or not os.path.exists(self.model_path):
+            return self.artifact_dir
+        return self.model_path
+
     def save_model(self):
         try:
-            joblib.dump({'vect': self.vectorizer, 'clf': self.clf}, self.model_path)
+            # The compact forest is memory-mapped on load; the sklearn forest
+            # is always kept as the fallback engine
+            objects = {'vect': self.vectorizer, 'clf': self.clf, 'mode': self.mode}
+            arrays = {'learned': self.learned}
+            if self.forest is not None:
+                arrays.update(self.forest.to_arrays())
+            manifest = save_artifact(
+                self.artifact_dir, self.model_version or uuid.uuid4().hex, objects,
+                arrays=arrays, metadata=self.manifest
+            )
+            bundle = dict(objects, **arrays, version=manifest['version'], manifest=manifest)
+            self.manifest = manifest
+            # Other sessions pick this up from the registry without loading it
+            get_model_registry().put(self.artifact_dir, bundle)
+            self._shared_model = True
         except Exception as e:
             print(f"Failed to save model: {e}")
 
     def load_model(self):
-        if os.path.exists(self.model_path):
+        path = self.artifact_path
+        if os.path.exists(path):
             try:
-                data = joblib.load(self.model_path)
-                self.vectorizer = data['vect']
-                self.clf = data['clf']
-                self.is_trained = True
+                # Loaded once per process and shared read-only across sessions
+                self._apply_bundle(get_model_registry().get(path))
                 print("Model loaded.")
             except Exception as e:
                 print(f"Failed to load model: {e}")
         else:
             print("No saved model found.")
 
+    def sync_shared_model(self):
+        """
+        Picks up a model saved since this instance loaded (e.g. retrained in
+        another session). A stat() call when nothing changed.
+        """
+        path = self.artifact_path
+        if not os.path.exists(path):
+            return
+        try:
+            data = get_model_registry().get(path)
+        except Exception as e:
+            print(f"Failed to load model: {e}")
+            return
+        if self._bundle_version(data) != self.model_version:
+            self._apply_bundle(data)
+
+    def _bundle_version(self, data):
+        # Legacy pickles may have no version; fall back to the file mtime
+        return data.get('version') or f"mtime-{os.path.getmtime(self.model_path)}"
+
+    def _apply_bundle(self, data):
+        with self._lock:
+            self.vectorizer = data['vect']
+            self.clf = data['clf']
+            self.mode = data.get('mode', 'batch')
+            self.learned = data.get('learned', np.empty(0, dtype=np.uint64))
+            self.forest = CompactForest.from_arrays(data) if 'forest_roots' in data else None
+            self.model_version = self._bundle_version(data)
+            self.manifest = data.get('manifest', {})
+            self.is_trained = True
+            self._shared_model = True
+        self.cache.load(self._cache_version())
+
+    def _cache_version(self):
+        """
+        Cached categories depend on the model and the fallback threshold.
+        """
+        return f"{self.model_version}@{self.confidence_threshold}"
+
     def _get_heuristic_category(self, description):
-        desc_lower = str(description).lower()
-        
-        # 1. Exact/Partial Keyword Match using Regex (Word Boundaries)
-        for key, category in self.keywords.items():
-            # Use regex to match whole words and prevent partial matches
-            # e.g. "bus" matches "school bus" but not "business"
-            # Escape key to handle special chars if any
-            pattern = r'\b' + re.escape(key) + r'\b'
-            if re.search(pattern, desc_lower):
-                return category
-                
-        # 2. Check if category name itself is in description
-        # e.g. "Department of Transport" -> Transport
-        possible_cats = ['Utilities', 'Health', 'Housing', 'Shopping', 'Food', 'Dining', 'Transport', 'Travel', 'Services', 'Entertainment', 'Income']
-        for cat in possible_cats:
-             # Also use boundaries for categories 
-            pattern = r'\b' + re.escape(cat.lower()) + r'\b'
-            if re.search(pattern, desc_lower):
-                return cat
-                
-        return "Uncategorized"
+        """
+        Keyword heuristic for a single description.
+        1. Keyword match on word boundaries (first listed keyword wins)
+           e.g. "bus" matches "school bus" but not "business"
+        2. Category name itself in description
+           e.g. "Department of Transport" -> Transport
+        """
+        return self.matcher.match(description)
 
     def _heuristic_categorize(self, df):
         """
         Simple keyword matching for initial categorization.
         """
         if 'description' in df.columns:
-            df['category'] = df['description'].apply(self._get_heuristic_category)
+            codes, uniques = _factorize(df['description'])
+            df['category'] = self.categorize_descriptions(uniques).to_numpy()[codes]
         else:
             df['category'] = "Unknown"
         return df
 
+class AmountForest:
+    """
+    IsolationForest over expense amounts that is fitted once and reused.
+
+    Fitting builds each tree on `max_samples` amounts and the contamination
+    threshold on at most `max_fit_rows` of them, so the cost is bounded on
+    very large histories. New data is scored with decision_function
+    (negative = anomaly). The forest is only refitted when the history grew
+    by `refit_growth` since the last fit or the fit is older than
+    `max_age_days`, not on every page load. Persisted with joblib, one file
+    per user.
+    """
+
+    def __init__(self, path=None, contamination=0.05, max_samples=256, max_fit_rows=50000,
+                 refit_growth=0.5, max_age_days=30, random_state=42):
+        self.path = path
+        self.contamination = contamination
+        self.max_samples = max_samples
+        self.max_fit_rows = max_fit_rows
+        # Relative growth in rows (0.5 = 50% more) that triggers a refit
+        self.refit_growth = refit_growth
+        self.max_age_days = max_age_days
+        self.random_state = random_state
+        self.model = None
+        self.fitted_rows = 0
+        self.fitted_at = None
+
+    def needs_refit(self, n_rows, now=None):
+        if self.model is None:
+            return True
+        if n_rows >= self.fitted_rows * (1 + self.refit_growth):
+            return True
+        now = time.time() if now is None else now
+        return now - self.fitted_at > self.max_age_days * 86400
+
+    def fit(self, values):
+        """
+        Fits on absolute amounts (a random subset when above max_fit_rows).
+        """
+        values = np.abs(np.asarray(values, dtype=float))
+        # The refit policy compares against the history size, not the subset
+        n_rows = len(values)
+        if len(values) > self.max_fit_rows:
+            rng = np.random.default_rng(self.random_state)
+            values = rng.choice(values, self.max_fit_rows, replace=False)
+        self.model = IsolationForest(
+            contamination=self.contamination,
+            max_samples=min(self.max_samples, len(values)),
+            random_state=self.random_state
+        )
+        self.model.fit(values.reshape(-1, 1))
+        self.fitted_rows = n_rows
+        self.fitted_at = time.time()
+        return self
+
+    def fit_if_needed(self, values):
+        """
+        Refits only when the refit policy asks for it.
+
+        Returns:
+            True if the forest was (re)fitted.
+        """
+        if not self.needs_refit(len(values)):
+            return False
+        self.fit(values)
+        self.save()
+        return True
+
+    def decision_function(self, values):
+        """
+        Anomaly scores of absolute amounts (negative = anomaly). Each
+        distinct amount is scored once.
+        """
+        codes, unique_amounts = pd.factorize(np.abs(np.asarray(values, dtype=float)))
+        return self.model.decision_function(np.asarray(unique_amounts).reshape(-1, 1))[codes]
+
+    def save(self):
+        """
+        Persists the fitted forest atomically (see atomic_write).
+        """
+        if not self.path or self.model is None:
+            return
+        payload = {'model': self.model, 'fitted_rows': self.fitted_rows, 'fitted_at': self.fitted_at}
+        try:
+            atomic_write(self.path, lambda tmp_path: joblib.dump(payload, tmp_path))
+        except Exception as e:
+            print(f"Failed to save anomaly forest: {e}")
+
+    def load(self):
+        """
+        Restores a persisted forest, if any.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            payload = joblib.load(self.path)
+        except Exception as e:
+            print(f"Failed to load anomaly forest: {e}")
+            return
+        self.model = payload['model']
+        self.fitted_rows = payload['fitted_rows']
+        self.fitted_at = payload['fitted_at']
+
 class AnomalyDetector:
-    def __init__(self):
-        self.model = IsolationForest(contamination=0.05, random_state=42)
+    # Fixed-cost categories that are never flagged (substring match)
+    RECURRING_CATEGORIES = ['housing', 'rent', 'utilities', 'mortgage', 'insurance']
+
+    def __init__(self, baselines=None, running=None, forest=None):
+        # Fitted once and reused until its refit policy triggers
+        self.forest = forest if forest is not None else AmountForest()
+        # Optional BaselineIndex of per-merchant/category history
+        self.baselines = baselines
+        # Optional RunningStats for scoring appended rows (see detect_new)
+        self.running = running
+
+    @staticmethod
+    def _amount_column(df):
+        if 'amount' in df.columns:
+            return 'amount'
+        for col in df.columns:
+            if 'amount' in col.lower() or 'debit' in col.lower() or 'credit' in col.lower():
+                return col
+        return None
 
-    def detect_anomalies(self, df):
+    @staticmethod
+    def _categories(df):
+        if 'category' in df.columns:
+            return df['category'].astype(str).str.lower().to_numpy()
+        return np.full(len(df), "", dtype=object)
+
+    def _is_recurring(self, categories):
+        return pd.Series(categories).str.contains('|'.join(self.RECURRING_CATEGORIES), regex=True).to_numpy()
+
+    @staticmethod
+    def _join_reasons(n, rules):
+        """
+        Appends each rule's label to the rows its mask selects, in order.
+        """
+        reasons = np.full(n, "", dtype=object)
+        for mask, label in rules:
+            current = reasons[mask]
+            reasons[mask] = current + np.where(current == "", "", " & ") + label
+        return reasons
+
+    def save(self):
+        """
+        Persists the running statistics and baselines.
+        """
+        if self.running is not None:
+            self.running.save()
+        if self.baselines is not None:
+            self.baselines.save()
+
+    def detect_anomalies(self, df, global_stats=None, save=True):
         """
         Detects anomalies based on 'amount' using ML and statistical rules.
+
+        Args:
+            global_stats: Optional (mean, std) of expense amounts over a
+                larger dataset that df is one chunk of (see src.ingestion).
+                The z-scores then use it, and the forest, fitted by the
+                caller, is not refitted per chunk.
+            save: Persist the updated running statistics and baselines.
+                Callers scoring chunk by chunk pass False and call save()
+                once at the end.
+
+        Every rule is a boolean mask over the expense rows, and reasons are
+        built by appending each rule's label to the rows it flags.
+
+        With baselines, the expenses are first absorbed into them, and rows
+        whose merchant or category has an established baseline are judged
+        only against it; the global rules (and the recurring-category skip
+        list) remain for rows without enough history.
         """
         if df.empty:
+            df['is_anomaly'] = pd.Series(dtype=int)
+            df['anomaly_reason'] = pd.Series(dtype=object)
             return df
             
         # Ensure 'amount' column exists
-        amount_col = None
-        for col in df.columns:
-            if 'amount' in col.lower() or 'debit' in col.lower() or 'credit' in col.lower():
-                amount_col = col
-                break
+        amount_col = self._amount_column(df)
         
         if amount_col:
             try:
                 # Prepare numeric data ensuring it's absolute for stats
                 df[amount_col] = pd.to_numeric(df[amount_col], errors='coerce').fillna(0)
-                
+                n = len(df)
+                flags = np.ones(n, dtype=int)
+                reasons = np.full(n, "", dtype=object)
+
                 # We ONLY detect anomalies in expenses (ignore Income category)
                 # This prevents salary from skewing the mean and being flagged.
-                expense_mask = (df['category'].astype(str).str.lower() != 'income')
-                df_expenses = df[expense_mask].copy()
-                
-                if df_expenses.empty:
-                    df['is_anomaly'] = 1
-                    df['anomaly_reason'] = ""
+                categories = self._categories(df)
+                expense_mask = categories != 'income'
+
+                if not expense_mask.any():
+                    df['is_anomaly'] = flags
+                    df['anomaly_reason'] = reasons
                     return df
 
                 # Prepare detection data (use absolute values of expenses)
-                data_stats = df_expenses[[amount_col]].abs()
+                values = df[amount_col].to_numpy(dtype=float)[expense_mask]
+                values = np.abs(values)
                 
                 # 1. ML Detection (Isolation Forest) on expenses only
-                df_expenses['ml_anomaly'] = self.model.fit_predict(data_stats)
+                if global_stats is None:
+                    self.forest.fit_if_needed(values)
+                ml_anomaly = self.forest.decision_function(values) < 0
                 
                 # 2. Rule-Based Statistical Detection (Z-Score)
-                mean_val = data_stats[amount_col].mean()
-                std_val = data_stats[amount_col].std()
-                
-                # 3. Reason Logic
-                reasons = []
-                final_flags = []
-                
-                # We loop through original DF but only flag if it's an expense
-                # Map expense flags back
-                exp_idx = 0
-                for idx, row in df.iterrows():
-                    if not expense_mask.iloc[idx]:  # type: ignore
-                        final_flags.append(1)
-                        reasons.append("")
-                        continue
-                    
-                    # It's an expense
-                    val = abs(row[amount_col])
-                    reason = []
-                    is_anomaly = False
-                    
-                    # Skip anomaly detection for recurring fixed-cost categories
-                    row_cat = str(row.get('category', '')).lower()
-                    recurring_cats = ['housing', 'rent', 'utilities', 'mortgage', 'insurance']
-                    is_recurring = any(rc in row_cat for rc in recurring_cats)
-                    
-                    if not is_recurring:
-                        # ML Flag
-                        if df_expenses.iloc[exp_idx]['ml_anomaly'] == -1:
-                            is_anomaly = True
-                            reason.append("Unusual Pattern")
-                        
-                        # Statistical Flag (Z-Score) - based on expense mean/std
-                        if std_val > 0:
-                            z_score = abs(val - mean_val) / std_val
-                            if z_score > 5:
-                                is_anomaly = True
-                                reason.append("Absurdly High (Z > 5)")
-                            elif z_score > 3:
-                                is_anomaly = True
-                                reason.append("High Expense (Z > 3)")
-                                
-                        # Fixed threshold flag
-                        if val > 10000:
-                            is_anomaly = True
-                            reason.append("Massive Transaction (>10k)")
-                        
-                    if is_anomaly:
-                        final_flags.append(-1)
-                        reasons.append(" & ".join(reason))
-                    else:
-                        final_flags.append(1)
-                        reasons.append("")
-                    
-                    exp_idx += 1
+                if global_stats is None:
+                    mean_val = values.mean()
+                    std_val = values.std(ddof=1) if len(values) > 1 else np.nan
+                else:
+                    mean_val, std_val = global_stats
+                if std_val > 0:
+                    z_scores = np.abs(values - mean_val) / std_val
+                else:
+                    z_scores = np.zeros(len(values))
+
+                # Skip anomaly detection for recurring fixed-cost categories
+                recurring = self._is_recurring(categories[expense_mask])
+
+                # Robust per-merchant/category baselines, persisted across uploads
+                established = np.zeros(len(values), dtype=bool)
+                baseline_rules = []
+                if self.running is not None:
+                    # Seed the streaming statistics used by detect_new
+                    self.running.update(df[expense_mask], amount_col)
+                if self.baselines is not None:
+                    expenses = df[expense_mask]
+                    self.baselines.update(expenses, amount_col)
+                    scores = self.baselines.score(expenses, amount_col)
+                    level = scores['baseline'].to_numpy()
+                    unusual = scores['is_unusual'].to_numpy()
+                    established = level != ''
+                    label = f"(Robust Z > {self.baselines.threshold:g})"
+                    baseline_rules = [
+                        (unusual & (level == 'merchant'), f"Unusual for Merchant {label}"),
+                        (unusual & (level == 'category'), f"Unusual for Category {label}"),
+                    ]
+                if save:
+                    self.save()
+                checked = ~recurring & ~established
+
+                # 3. Reason Logic, in the order the reasons are reported
+                rules = [
+                    (checked & ml_anomaly, "Unusual Pattern"),
+                    (checked & (z_scores > 5), "Absurdly High (Z > 5)"),
+                    (checked & (z_scores > 3) & (z_scores <= 5), "High Expense (Z > 3)"),
+                    (checked & (values > 10000), "Massive Transaction (>10k)"),
+                ] + baseline_rules
+                expense_reasons = self._join_reasons(len(values), rules)
+
+                is_anomaly = expense_reasons != ""
+                flags[np.flatnonzero(expense_mask)[is_anomaly]] = -1
+                reasons[expense_mask] = expense_reasons
                 
-                df['is_anomaly'] = final_flags
+                df['is_anomaly'] = flags
                 df['anomaly_reason'] = reasons
                 
             except Exception as e:
@@ -365,3 +808,61 @@ class AnomalyDetector:
              df['anomaly_reason'] = ""
              
         return df
+
+    def detect_new(self, df):
+        """
+        Streaming mode: scores only rows without an is_anomaly flag yet
+        (e.g. rows appended to an already scored frame) against the running
+        per-category statistics, then folds them in. Cost is O(new rows), so
+        a daily statement drop does not refit over the whole history.
+
+        Falls back to detect_anomalies when the frame was never scored or no
+        RunningStats is configured.
+        """
+        amount_col = self._amount_column(df)
+        if self.running is None or 'is_anomaly' not in df.columns or amount_col is None:
+            return self.detect_anomalies(df)
+
+        new_mask = df['is_anomaly'].isna().to_numpy()
+        if not new_mask.any():
+            return df
+
+        try:
+            new_rows = df[new_mask].copy()
+            new_rows[amount_col] = pd.to_numeric(new_rows[amount_col], errors='coerce').fillna(0)
+            categories = self._categories(new_rows)
+            expense_mask = categories != 'income'
+            expenses = new_rows[expense_mask]
+
+            # Score against history first, then absorb
+            scores = self.running.score(expenses, amount_col)
+            self.running.update(expenses, amount_col)
+            self.running.save()
+
+            established = scores['established'].to_numpy()
+            z_scores = scores['z'].to_numpy()
+            values = expenses[amount_col].abs().to_numpy(dtype=float)
+            # Categories without enough history keep the fixed threshold and skip list
+            fallback = ~established & ~self._is_recurring(categories[expense_mask])
+            rules = [
+                (established & (z_scores > 5), "Absurdly High for Category (Z > 5)"),
+                (established & (z_scores > 3) & (z_scores <= 5), "High for Category (Z > 3)"),
+                (fallback & (values > 10000), "Massive Transaction (>10k)"),
+            ]
+            expense_reasons = self._join_reasons(len(expenses), rules)
+
+            reasons = np.full(len(new_rows), "", dtype=object)
+            reasons[expense_mask] = expense_reasons
+            flags = np.where(reasons != "", -1, 1)
+        except Exception as e:
+            print(f"Anomaly detection failed: {e}")
+            flags = np.ones(int(new_mask.sum()), dtype=int)
+            reasons = np.full(int(new_mask.sum()), "", dtype=object)
+
+        if 'anomaly_reason' in df.columns:
+            # A categorical column cannot take reasons outside its categories
+            df['anomaly_reason'] = df['anomaly_reason'].astype(object)
+        df.loc[new_mask, 'is_anomaly'] = flags
+        df.loc[new_mask, 'anomaly_reason'] = reasons
+        df['is_anomaly'] = df['is_anomaly'].astype(int)
+        return df
@@ -0,0 +1,188 @@
+"""
+Versioned, memory-mappable model artifact.
+
+Layout:
+    <root>/
+        CURRENT                 # name of the active version directory
+        v-<version>/
+            manifest.json       # format, version, sha256, rows, timings, files
+            objects.joblib      # uncompressed pickle of sklearn objects
+            <name>.npy          # large numeric arrays, one file each
+
+Arrays are loaded with mmap_mode='r', so loads are near-instant and every
+process that maps the same version shares the OS page cache. A save writes
+a new version directory and then swaps CURRENT with os.replace, so readers
+never see a half-written model; an existing version directory is never
+overwritten, since other processes may be reading it. The manifest's sha256
+is taken from the files as they are written; loads trust it and only hash
+the files again when asked to (verify_artifact), since hashing reads every
+byte a memory-mapped load would otherwise leave on disk.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import numpy as np  # type: ignore
+import joblib  # type: ignore
+
+FORMAT_VERSION = 1
+POINTER = 'CURRENT'
+MANIFEST = 'manifest.json'
+OBJECTS = 'objects.joblib'
+
+
+def artifact_exists(root):
+    return os.path.exists(os.path.join(root, POINTER))
+
+
+def artifact_stamp(root):
+    """
+    Changes whenever a new version is published (used for reload checks).
+    """
+    stat = os.stat(os.path.join(root, POINTER))
+    with open(os.path.join(root, POINTER), 'r', encoding='utf-8') as f:
+        current = f.read().strip()
+    return (current, stat.st_mtime_ns)
+
+
+def _sha256(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def save_artifact(root, version, objects, arrays=None, metadata=None, keep=2):
+    """
+    Publishes a new artifact version under `root`.
+
+    Args:
+        version: Model version string (used in the directory name).
+        objects: Dict of picklable objects (e.g. vectorizer, classifier).
+        arrays: Dict of name -> numpy array stored as memory-mappable .npy.
+        metadata: Extra manifest fields (training rows, timings, ...).
+        keep: Number of most recent versions to keep on disk.
+
+    Returns:
+        The manifest dict.
+    """
+    arrays = arrays or {}
+    os.makedirs(root, exist_ok=True)
+    name = f"v-{version}"
+    # Re-saving a version publishes a fresh directory; readers keep the old one
+    while os.path.exists(os.path.join(root, name)):
+        name = f"v-{version}-{uuid.uuid4().hex[:8]}"
+    final_dir = os.path.join(root, name)
+    tmp_dir = os.path.join(root, f".tmp-{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir)
+
+    try:
+        start = time.perf_counter()
+        files = [OBJECTS]
+        joblib.dump(objects, os.path.join(tmp_dir, OBJECTS))
+        for key, arr in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{key}.npy"), np.ascontiguousarray(arr))
+            files.append(f"{key}.npy")
+
+        paths = [os.path.join(tmp_dir, f) for f in files]
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'version': version,
+            'created_at': time.time(),
+            'files': files,
+            'arrays': sorted(arrays),
+            'nbytes': int(sum(os.path.getsize(p) for p in paths)),
+            'sha256': _sha256(paths),
+            'write_seconds': round(time.perf_counter() - start, 4),
+        }
+        manifest.update(metadata or {})
+        with open(os.path.join(tmp_dir, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+        os.rename(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # Atomic publish
+    pointer_tmp = os.path.join(root, f"{POINTER}.{uuid.uuid4().hex}.tmp")
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(root, POINTER))
+
+    _prune(root, keep, current=name)
+    return manifest
+
+
+def _current_dir(root):
+    with open(os.path.join(root, POINTER), 'r', encoding='utf-8') as f:
+        return os.path.join(root, f.read().strip())
+
+
+def verify_artifact(root):
+    """
+    Hashes the active version's files and raises a ValueError if they do
+    not match the manifest's sha256.
+    """
+    version_dir = _current_dir(root)
+    with open(os.path.join(version_dir, MANIFEST), 'r', encoding='utf-8') as f:
+        _check(version_dir, json.load(f))
+
+
+def _check(version_dir, manifest):
+    if 'sha256' in manifest:
+        paths = [os.path.join(version_dir, f) for f in manifest['files']]
+        if _sha256(paths) != manifest['sha256']:
+            raise ValueError(f"Model artifact {version_dir} does not match its manifest checksum")
+
+
+def load_artifact(root, mmap=True, verify=False):
+    """
+    Loads the active version. With `verify`, the files are hashed first
+    (see verify_artifact).
+
+    Returns:
+        Dict with the pickled objects, the arrays (memory-mapped when
+        `mmap`), 'version' and 'manifest'.
+    """
+    version_dir = _current_dir(root)
+    with open(os.path.join(version_dir, MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version', 0) > FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format {manifest['format_version']}")
+    if verify:
+        _check(version_dir, manifest)
+
+    mmap_mode = 'r' if mmap else None
+    bundle = dict(joblib.load(os.path.join(version_dir, OBJECTS), mmap_mode=mmap_mode))
+    for key in manifest.get('arrays', []):
+        bundle[key] = np.load(os.path.join(version_dir, f"{key}.npy"), mmap_mode=mmap_mode)
+    bundle['version'] = manifest['version']
+    bundle['manifest'] = manifest
+    return bundle
+
+
+def read_manifest(root):
+    """
+    Manifest of the active version without loading the model.
+    """
+    with open(os.path.join(_current_dir(root), MANIFEST), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _prune(root, keep, current):
+    versions = []
+    for entry in os.listdir(root):
+        path = os.path.join(root, entry)
+        if entry.startswith('v-') and entry != current and os.path.isdir(path):
+            versions.append((os.path.getmtime(path), path))
+    versions.sort(reverse=True)
+    for _, path in versions[max(keep - 1, 0):]:
+        # Another process may still have it mapped (e.g. on Windows); skip then
+        shutil.rmtree(path, ignore_errors=True)
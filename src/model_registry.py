@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+import joblib  # type: ignore
+from src.model_artifact import artifact_stamp, load_artifact  # type: ignore
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded model artifacts.
+
+    Handles both versioned artifact directories (see model_artifact) and
+    legacy single-file pickles. Each artifact is loaded once and the same
+    objects are handed to every session, which must treat them as read-only
+    (categorizers copy before training). An entry is reloaded when its
+    published version, or a legacy file's mtime or size, changes, e.g.
+    after another session retrains and saves.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _stamp(self, path):
+        if os.path.isdir(path):
+            return artifact_stamp(path)
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, path):
+        if os.path.isdir(path):
+            return load_artifact(path, verify=False)
+        return joblib.load(path)
+
+    def _nbytes(self, path, bundle):
+        if isinstance(bundle, dict) and 'manifest' in bundle:
+            return bundle['manifest'].get('nbytes', 0)
+        return os.path.getsize(path)
+
+    def get(self, path):
+        """
+        Returns the shared bundle stored at `path`, loading it if needed.
+        Raises FileNotFoundError if the artifact does not exist.
+        """
+        key = os.path.abspath(path)
+        stamp = self._stamp(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['stamp'] == stamp:
+                entry['hits'] += 1
+                return entry['bundle']
+
+            bundle = self._load(path)
+            self._entries[key] = {
+                'bundle': bundle,
+                'stamp': stamp,
+                'nbytes': self._nbytes(path, bundle),
+                'loads': (entry['loads'] + 1) if entry else 1,
+                'hits': 0,
+                'loaded_at': time.time()
+            }
+            return bundle
+
+    def put(self, path, bundle):
+        """
+        Registers a bundle that was just written to `path`, so the session
+        that saved it does not pay for an unpickle of its own model.
+        """
+        key = os.path.abspath(path)
+        stamp = self._stamp(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            self._entries[key] = {
+                'bundle': bundle,
+                'stamp': stamp,
+                'nbytes': self._nbytes(path, bundle),
+                'loads': entry['loads'] if entry else 0,
+                'hits': 0,
+                'loaded_at': time.time()
+            }
+
+    def stats(self):
+        """
+        Returns {path: {'nbytes', 'loads', 'hits', 'loaded_at'}}.
+        """
+        with self._lock:
+            return {
+                key: {k: entry[k] for k in ('nbytes', 'loads', 'hits', 'loaded_at')}
+                for key, entry in self._entries.items()
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """
+    Process-wide registry shared by all sessions.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def frame_nbytes(df):
+    """
+    Deep memory usage of a DataFrame in bytes (0 for None).
+    """
+    if df is None:
+        return 0
+    return int(df.memory_usage(deep=True).sum())
+
+
+def session_memory_report(session_state):
+    """
+    Approximate memory held privately by one session vs. shared models.
+    """
+    categorizer = session_state.get('categorizer')
+    shared = 0
+    if categorizer is not None:
+        entry = get_model_registry().stats().get(os.path.abspath(categorizer.artifact_path))
+        if entry is not None and getattr(categorizer, '_shared_model', False):
+            shared = entry['nbytes']
+
+    return {
+        'data_bytes': frame_nbytes(session_state.get('data')),
+        'business_data_bytes': frame_nbytes(session_state.get('business_data')),
+        'cache_entries': len(categorizer.cache.entries) if categorizer is not None else 0,
+        'shared_model_bytes': shared
+    }
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np  # type: ignore
+import joblib  # type: ignore
+from src.atomic_file import atomic_write  # type: ignore
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of clean_description -> (category, confidence).
+
+    The cache is tied to a model version: loading or resetting with a
+    different version drops every entry, so a retrained model never serves
+    stale predictions. It is persisted with joblib next to the model file;
+    predict() saves at most once every `save_interval` seconds and ingestion
+    paths save once when they finish.
+    """
+
+    def __init__(self, path, max_size=50000, save_interval=30.0):
+        self.path = path
+        self.max_size = max_size
+        self.save_interval = save_interval
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = float('-inf')
+
+    def reset(self, version=None):
+        """
+        Drops all entries and binds the cache to `version`.
+        """
+        with self._lock:
+            self.entries = OrderedDict()
+            self.version = version
+
+    def lookup(self, keys):
+        """
+        Looks up many keys at once.
+
+        Returns:
+            (found, categories, confidences) arrays aligned to `keys`, where
+            `found` is a boolean mask of cache hits.
+        """
+        n = len(keys)
+        found = np.zeros(n, dtype=bool)
+        categories = np.empty(n, dtype=object)
+        confidences = np.zeros(n, dtype=float)
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.entries.move_to_end(key)
+                    found[i] = True
+                    categories[i], confidences[i] = entry
+            hit_count = int(found.sum())
+            self.hits += hit_count
+            self.misses += n - hit_count
+
+        return found, categories, confidences
+
+    def update(self, keys, categories, confidences):
+        """
+        Inserts results, evicting the least recently used entries past max_size.
+        """
+        with self._lock:
+            for key, cat, conf in zip(keys, categories, confidences):
+                self.entries[key] = (cat, float(conf))
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self._dirty = True
+
+    def stats(self):
+        """
+        Returns hit/miss counters for monitoring.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total else 0.0,
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'version': self.version
+        }
+
+    def save(self):
+        """
+        Persists the cache atomically (see atomic_write), if anything
+        changed since the last save.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {'version': self.version, 'entries': list(self.entries.items())}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            atomic_write(self.path, lambda tmp_path: joblib.dump(payload, tmp_path))
+        except Exception as e:
+            print(f"Failed to save prediction cache: {e}")
+
+    def save_if_due(self):
+        """
+        Saves unless the last save was less than `save_interval` seconds ago.
+        """
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def load(self, version):
+        """
+        Loads persisted entries if they were produced by `version`,
+        otherwise starts empty for that version.
+        """
+        self.reset(version)
+        if not os.path.exists(self.path):
+            return
+        try:
+            payload = joblib.load(self.path)
+        except Exception as e:
+            print(f"Failed to load prediction cache: {e}")
+            return
+        if payload.get('version') != version:
+            return
+        with self._lock:
+            self.entries = OrderedDict(payload.get('entries', [])[-self.max_size:])
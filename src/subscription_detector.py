@@ -1,9 +1,66 @@
+import numpy as np  # type: ignore
 import pandas as pd  # type: ignore
-from datetime import timedelta
+
+# Cadences found by detect_recurring: (name, shortest gap, longest gap in days, min charges)
+PERIODS = [
+    ('Weekly', 6, 8, 4),
+    ('Biweekly', 12, 16, 3),
+    ('Monthly', 25, 35, 2),
+    ('Quarterly', 85, 98, 2),
+    ('Annual', 355, 375, 2),
+]
+
+def _autocorrelation(rows, days, n_rows, size, max_lag):
+    """
+    Autocorrelation of daily 0/1 charge grids for many merchants at once
+    (one FFT per row of `size` days), i.e. for each lag the number of
+    charge-day pairs that far apart. `size` must be at least twice the
+    longest history so the circular correlation is linear.
+
+    Returns:
+        Integer array (n_rows, max_lag + 1).
+    """
+    grid = np.zeros((n_rows, size))
+    grid[rows, days] = 1.0
+    spectrum = np.fft.rfft(grid, axis=1)
+    acf = np.fft.irfft(spectrum * spectrum.conj(), n=size, axis=1)[:, :max_lag + 1]
+    return np.rint(acf).astype(np.int64)
+
+def phase_labels(frequency, last_date):
+    """
+    Where in its cycle a charge lands: weekday for weekly cadences, day of
+    month for monthly ones, calendar date otherwise.
+    """
+    last_date = pd.Series(last_date).reset_index(drop=True)
+    return np.where(np.isin(frequency, ['Weekly', 'Biweekly']), last_date.dt.day_name().to_numpy(),
+                    np.where(frequency == 'Monthly', 'Day ' + last_date.dt.day.astype(str).to_numpy(),
+                             last_date.dt.strftime('%b %d').to_numpy()))
+
+def _group_sums(values, starts, counts):
+    """
+    Sums of contiguous groups, computed like NumPy's sum of each group on
+    its own (groups of equal length are summed as rows of one matrix), so
+    rounded averages match Series.mean per group exactly.
+    """
+    sums = np.empty(len(starts))
+    for length in np.unique(counts):
+        groups = np.flatnonzero(counts == length)
+        sums[groups] = values[starts[groups, None] + np.arange(length)].sum(axis=1)
+    return sums
 
 class SubscriptionDetector:
-    def __init__(self):
-        pass
+    def __init__(self, merchant_index=None):
+        # Optional MerchantIndex: group spelling variants ("NETFLIX.COM 8231",
+        # "NETFLIX.COM 9912") as one merchant instead of by raw description
+        self.merchant_index = merchant_index
+
+    def _merchants(self, df):
+        descriptions = df['description'].to_numpy()
+        if self.merchant_index is None:
+            return descriptions
+        keys = self.merchant_index.canonicalize(descriptions)
+        # Descriptions without merchant words keep their own group
+        return np.where(keys == '', descriptions, keys)
 
     def detect_subscriptions(self, df):
         """
@@ -17,59 +74,168 @@ class SubscriptionDetector:
         
         Returns:
             DataFrame of detected subscriptions with average amount, frequency, and next expected date.
+
+        All merchants are handled at once: one sort by (description, date),
+        a grouped diff for the intervals and one grouped aggregation.
         """
         if df.empty or 'date' not in df.columns or 'description' not in df.columns or 'amount' not in df.columns:
             return pd.DataFrame()
 
-        # Ensure date is datetime
-        df = df.copy()
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Filter for expenses only (negative amounts)
-        expenses = df[df['amount'] < 0].copy()
-        
-        subscription_candidates = []
-        
-        # Group by description
-        grouped = expenses.groupby('description')
-        
-        for name, group in grouped:
-            if len(group) < 2:
-                continue
-                
-            # Verify amount consistency (std dev of amount should be low relative to mean)
-            amounts = group['amount'].abs()
-            mean_amount = amounts.mean()
-            std_amount = amounts.std()
-            
-            # Allow some fluctuation (e.g., utility bills vary, but Netflix is exact)
-            # Coefficient of variation < 0.1 for strict, < 0.2 for looser
-            # Let's say if std_dev is less than 10% of mean, it's consistent enough for a "Fixed" sub.
-            # If it varies more, it might be a "Variable" recurring bill (like utilities).
-            is_fixed_amount = True
-            if std_amount > 0 and (std_amount / mean_amount) > 0.1:
-                is_fixed_amount = False
-                
-            # Check Date Intervals
-            group = group.sort_values('date')
-            dates = group['date'].dt.date.tolist()
-            intervals = [(dates[i+1] - dates[i]).days for i in range(len(dates)-1)]
-            
-            avg_interval = sum(intervals) / len(intervals)
-            
-            # Monthly definition: 25 to 35 days
-            is_monthly = 25 <= avg_interval <= 35
-            
-            if is_monthly:
-                next_date = group['date'].max() + timedelta(days=int(avg_interval))
-                
-                subscription_candidates.append({
-                    'Description': name,
-                    'Avg Amount': round(mean_amount, 2),
-                    'Frequency': 'Monthly',
-                    'Type': 'Fixed' if is_fixed_amount else 'Variable',
-                    'Next Expected': next_date.strftime('%Y-%m-%d'),
-                    'Confidence': 'High' if is_fixed_amount else 'Medium'
-                })
-                
-        return pd.DataFrame(subscription_candidates)
+        # Filter for expenses only (negative amounts), one sort by merchant then date
+        is_expense = (df['amount'] < 0).to_numpy()
+        expenses = pd.DataFrame({
+            'description': self._merchants(df)[is_expense],
+            'date': pd.to_datetime(df['date']).to_numpy()[is_expense],
+            'amount': df['amount'].abs().to_numpy()[is_expense]
+        })
+        expenses = expenses.dropna(subset=['description'])
+        if expenses.empty:
+            return pd.DataFrame()
+        expenses = expenses.sort_values(['description', 'date'], kind='stable', ignore_index=True)
+
+        # Day gaps between consecutive charges of the same merchant
+        days = expenses['date'].dt.normalize()
+        expenses['interval'] = days.groupby(expenses['description'], sort=False).diff().dt.days
+
+        stats = expenses.groupby('description', sort=False).agg(
+            count=('amount', 'size'),
+            std_amount=('amount', 'std'),
+            avg_interval=('interval', 'mean'),
+            last_date=('date', 'max')
+        )
+        descriptions = expenses['description'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, descriptions[1:] != descriptions[:-1]])
+        counts = stats['count'].to_numpy()
+        stats['mean_amount'] = _group_sums(expenses['amount'].to_numpy(), starts, counts) / counts
+
+        # Allow some fluctuation (e.g., utility bills vary, but Netflix is exact):
+        # if std dev is within 10% of the mean it is a "Fixed" sub, otherwise
+        # a "Variable" recurring bill (like utilities).
+        cv = stats['std_amount'] / stats['mean_amount']
+        is_fixed_amount = ~((stats['std_amount'] > 0) & (cv > 0.1))
+
+        # Monthly definition: 25 to 35 days
+        is_monthly = (stats['count'] >= 2) & stats['avg_interval'].between(25, 35)
+        if not is_monthly.any():
+            return pd.DataFrame()
+
+        subs = stats[is_monthly]
+        is_fixed_amount = is_fixed_amount[is_monthly]
+        next_date = subs['last_date'] + pd.to_timedelta(subs['avg_interval'].astype(int), unit='D')
+
+        return pd.DataFrame({
+            'Description': subs.index.to_numpy(),
+            'Avg Amount': subs['mean_amount'].round(2).to_numpy(),
+            'Frequency': 'Monthly',
+            'Type': np.where(is_fixed_amount, 'Fixed', 'Variable'),
+            'Next Expected': next_date.dt.strftime('%Y-%m-%d').to_numpy(),
+            'Confidence': np.where(is_fixed_amount, 'High', 'Medium')
+        })
+
+    def detect_recurring(self, df, min_score=0.6, max_days=730, chunk_cells=4_000_000):
+        """
+        Finds weekly, biweekly, monthly, quarterly and annual charges.
+
+        Each merchant's charge days over the last `max_days` are binned onto a
+        daily 0/1 grid, and the autocorrelation of all grids is computed in
+        batches with NumPy's FFT. For every cadence in PERIODS the score is
+        the share of charge pairs whose gap falls in its window, less the
+        share with shorter gaps; a merchant gets the shortest cadence
+        scoring at least `min_score`.
+        Merchants are batched by history length so padding stays small and
+        each batch holds about `chunk_cells` grid cells.
+
+        Returns:
+            DataFrame with Description, Avg Amount, Frequency, Period (Days),
+            Phase, Type, Next Expected and Confidence.
+        """
+        columns = ['Description', 'Avg Amount', 'Frequency', 'Period (Days)', 'Phase', 'Type',
+                   'Next Expected', 'Confidence']
+        if df.empty or 'date' not in df.columns or 'description' not in df.columns or 'amount' not in df.columns:
+            return pd.DataFrame(columns=columns)
+
+        is_expense = (df['amount'] < 0).to_numpy()
+        charges = pd.DataFrame({
+            'description': self._merchants(df)[is_expense],
+            'date': pd.to_datetime(df['date']).to_numpy()[is_expense],
+            'amount': df['amount'].abs().to_numpy()[is_expense]
+        }).dropna()
+        charges['day'] = charges['date'].dt.normalize()
+        last_day = charges.groupby('description')['day'].transform('max')
+        charges = charges[(last_day - charges['day']).dt.days <= max_days]
+        if charges.empty:
+            return pd.DataFrame(columns=columns)
+
+        codes, names = pd.factorize(charges['description'], sort=True)
+        first_day = charges.groupby(codes)['day'].min().to_numpy()
+        offsets = (charges['day'].to_numpy() - first_day[codes]) // np.timedelta64(1, 'D')
+        # Several charges on one day count once
+        grid_days = pd.DataFrame({'code': codes, 'offset': offsets}).drop_duplicates()
+        n_days = np.bincount(grid_days['code'], minlength=len(names))
+        span = np.zeros(len(names), dtype=np.int64)
+        np.maximum.at(span, grid_days['code'].to_numpy(), grid_days['offset'].to_numpy())
+
+        max_lag = max(high for _, _, high, _ in PERIODS)
+        n_periods = len(PERIODS)
+        scores = np.zeros((len(names), n_periods))
+        periods = np.zeros((len(names), n_periods))
+        lags = np.arange(max_lag + 1)
+        candidates = np.flatnonzero(n_days >= 2)
+        candidates = candidates[np.argsort(span[candidates], kind='stable')]
+        row_of = np.full(len(names), -1, dtype=np.int64)
+
+        start = 0
+        while start < len(candidates):
+            # Zero padding to >= 2 * span keeps the circular correlation linear
+            size = 1 << int(np.ceil(np.log2(2 * max(span[candidates[start]] + 1, max_lag + 1))))
+            stop = start + 1
+            while stop < len(candidates) and (stop - start + 1) * size <= chunk_cells and \
+                    span[candidates[stop]] + 1 <= size // 2:
+                stop += 1
+            batch = candidates[start:stop]
+            row_of[batch] = np.arange(len(batch))
+            in_batch = row_of[grid_days['code'].to_numpy()] >= 0
+            acf = _autocorrelation(row_of[grid_days['code'].to_numpy()[in_batch]],
+                                   grid_days['offset'].to_numpy()[in_batch], len(batch), size, max_lag)
+            pairs = np.maximum(n_days[batch] - 1, 1)
+            shorter = np.cumsum(acf, axis=1)
+            for p, (_, low, high, _) in enumerate(PERIODS):
+                window = acf[:, low:high + 1]
+                hits = window.sum(axis=1)
+                # Gaps shorter than the cadence count against it, so frequent
+                # irregular spending does not look periodic
+                early = shorter[:, low - 1] - acf[:, 0]
+                scores[batch, p] = np.clip((np.minimum(hits, pairs) - early) / pairs, 0, None)
+                periods[batch, p] = np.where(hits > 0, window @ lags[low:high + 1] / np.maximum(hits, 1), 0)
+            row_of[batch] = -1
+            start = stop
+
+        min_charges = np.array([need for _, _, _, need in PERIODS])
+        qualifies = (scores >= min_score) & (n_days[:, None] >= min_charges)
+        found = np.flatnonzero(qualifies.any(axis=1))
+        if not found.size:
+            return pd.DataFrame(columns=columns)
+        choice = qualifies[found].argmax(axis=1)
+
+        stats = charges.groupby(codes).agg(mean_amount=('amount', 'mean'), std_amount=('amount', 'std'),
+                                           last_date=('date', 'max')).iloc[found]
+        cv = stats['std_amount'] / stats['mean_amount']
+        is_fixed_amount = (~((stats['std_amount'] > 0) & (cv > 0.1))).to_numpy()
+        period = periods[found, choice]
+        frequency = np.array([name for name, _, _, _ in PERIODS], dtype=object)[choice]
+        last_date = stats['last_date'].dt.normalize()
+        next_date = last_date + pd.to_timedelta(np.rint(period), unit='D')
+
+        phase = phase_labels(frequency, last_date)
+        confident = is_fixed_amount & (scores[found, choice] >= 0.8)
+
+        return pd.DataFrame({
+            'Description': names[found],
+            'Avg Amount': stats['mean_amount'].round(2).to_numpy(),
+            'Frequency': frequency,
+            'Period (Days)': period.round(1),
+            'Phase': phase,
+            'Type': np.where(is_fixed_amount, 'Fixed', 'Variable'),
+            'Next Expected': next_date.dt.strftime('%Y-%m-%d').to_numpy(),
+            'Confidence': np.where(confident, 'High', 'Medium')
+        }, columns=columns)
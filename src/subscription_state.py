@@ -0,0 +1,238 @@
+import os
+import weakref
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import joblib  # type: ignore
+from src.atomic_file import atomic_write  # type: ignore
+from src.dedup import add_counts, row_fingerprints, unseen_occurrences  # type: ignore
+from src.subscription_detector import SubscriptionDetector  # type: ignore
+
+
+class SubscriptionState:
+    """
+    Persisted recurring-charge state, updated only from new rows.
+
+    Keeps every merchant's expense charges from the last `max_days` days
+    (the window detect_recurring looks at), each with its row fingerprint,
+    running interval and amount statistics per merchant, and the
+    detect_recurring result per merchant. An update absorbs the rows not
+    seen before and refreshes only the merchants that gained charges or
+    whose canonical name changed; charges are re-keyed only when the
+    merchant index's version moved. Updating again with the frame already
+    absorbed returns at once, so reruns of the Dashboard and Recurring tabs
+    cost nothing until the data changes. A charge that ages out of the
+    window is older than everything its merchant kept, so it would age out
+    again if uploaded once more. Persisted with joblib, one file per user.
+    """
+
+    COLUMNS = ['Description', 'Avg Amount', 'Frequency', 'Period (Days)', 'Phase', 'Type',
+               'Next Expected', 'Confidence']
+    STATS = ['charges', 'first_date', 'last_date', 'amount_mean', 'amount_std', 'gap_mean', 'gap_std']
+
+    def __init__(self, path=None, merchant_index=None, max_days=730):
+        self.path = path
+        self.merchant_index = merchant_index
+        # History per merchant that cadences are detected on
+        self.max_days = max_days
+        self.charges = pd.DataFrame({
+            'description': pd.Series(dtype=object),
+            'merchant': pd.Series(dtype=object),
+            'date': pd.Series(dtype='datetime64[ns]'),
+            'amount': pd.Series(dtype=float),
+            'fingerprint': pd.Series(dtype=np.uint64)
+        })
+        # Charges per fingerprint in self.charges
+        self.counts = {}
+        # Running statistics per merchant, indexed by merchant
+        self.merchants = self._merchant_stats(self.charges)
+        self.results = pd.DataFrame(columns=self.COLUMNS)
+        # Merchant index version the charges were keyed with
+        self.index_version = None
+        # Last frame absorbed and its length, so reruns skip the hashing
+        self._absorbed = (None, 0)
+
+    def _merchant_stats(self, charges):
+        """
+        Count, date range, amount mean/std and gap mean/std (days) for every
+        merchant in `charges`.
+        """
+        if charges.empty:
+            return pd.DataFrame(columns=self.STATS, index=pd.Index([], name='merchant'))
+        rows = charges.sort_values(['merchant', 'date'], kind='stable')
+        gaps = rows.groupby('merchant', sort=False)['date'].diff().dt.days
+        stats = rows.assign(gap=gaps).groupby('merchant').agg(
+            charges=('amount', 'size'), first_date=('date', 'min'), last_date=('date', 'max'),
+            amount_mean=('amount', 'mean'), amount_std=('amount', 'std'),
+            gap_mean=('gap', 'mean'), gap_std=('gap', 'std')
+        )
+        return stats[self.STATS]
+
+    def _merchants(self, descriptions):
+        frame = pd.DataFrame({'description': descriptions})
+        return SubscriptionDetector(self.merchant_index)._merchants(frame)
+
+    def _rekey(self):
+        """
+        Moves charges whose description now maps to another canonical
+        merchant under the new name.
+
+        Returns:
+            Set of merchant names (old and new) that changed.
+        """
+        if self.merchant_index is None:
+            return set()
+        version = self.merchant_index.version
+        if version == self.index_version:
+            return set()
+        self.index_version = version
+        if self.charges.empty:
+            return set()
+        merchants = self._merchants(self.charges['description'].to_numpy())
+        moved = merchants != self.charges['merchant'].to_numpy()
+        if not moved.any():
+            return set()
+        touched = set(self.charges['merchant'].to_numpy()[moved]) | set(merchants[moved])
+        self.charges['merchant'] = merchants
+        return touched
+
+    def update(self, df):
+        """
+        Folds expense rows not seen before into the state and refreshes the
+        recurring charges of the merchants they touch.
+
+        Returns:
+            Number of new charges absorbed.
+        """
+        source, n_rows = self._absorbed
+        if source is not None and source() is df and n_rows == len(df):
+            return 0
+        if df.empty or not {'date', 'description', 'amount'} <= set(df.columns):
+            return 0
+        self._absorbed = (weakref.ref(df), len(df))
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        amounts = pd.to_numeric(df['amount'], errors='coerce')
+        valid = ((amounts < 0) & dates.notna() & df['description'].notna()).to_numpy()
+        expenses = df[valid]
+        fingerprints = row_fingerprints(expenses)
+        is_new = unseen_occurrences(fingerprints, self.counts)
+        descriptions = expenses['description'][is_new].astype(str).to_numpy(dtype=object)
+        # Keying the new charges may grow the index, so re-key afterwards
+        merchants = self._merchants(descriptions)
+        touched = self._rekey()
+        if not is_new.any() and not touched:
+            return 0
+
+        charges = pd.DataFrame({
+            'description': descriptions,
+            'merchant': merchants,
+            'date': dates[valid][is_new].dt.normalize().to_numpy(dtype='datetime64[ns]'),
+            'amount': amounts[valid][is_new].abs().to_numpy(dtype=float),
+            'fingerprint': fingerprints[is_new]
+        })
+        touched |= set(charges['merchant'])
+        self.charges = pd.concat([self.charges, charges], ignore_index=True)
+        add_counts(self.counts, charges['fingerprint'].to_numpy())
+
+        # Drop charges of touched merchants that fell out of the window
+        rows = self.charges[self.charges['merchant'].isin(touched)]
+        last = rows.groupby('merchant', sort=False)['date'].transform('max')
+        old = rows.index[(last - rows['date']).dt.days > self.max_days]
+        add_counts(self.counts, self.charges.loc[old, 'fingerprint'].to_numpy(), sign=-1)
+        self.charges = self.charges.drop(old).reset_index(drop=True)
+
+        rows = self.charges[self.charges['merchant'].isin(touched)]
+        stats = [part for part in (self.merchants[~self.merchants.index.isin(touched)],
+                                   self._merchant_stats(rows)) if not part.empty]
+        self.merchants = pd.concat(stats).sort_index() if stats else self.merchants.iloc[:0]
+        found = SubscriptionDetector().detect_recurring(pd.DataFrame({
+            'date': rows['date'], 'description': rows['merchant'], 'amount': -rows['amount']
+        }), max_days=self.max_days)
+        kept = self.results[~self.results['Description'].isin(touched)]
+        parts = [part for part in (kept, found) if not part.empty]
+        results = pd.concat(parts, ignore_index=True) if parts else self.results.iloc[:0]
+        self.results = results.sort_values('Description', ignore_index=True)
+        return int(is_new.sum())
+
+    def subscriptions(self):
+        """
+        Recurring charges in the same layout as detect_recurring.
+        """
+        return self.results.copy()
+
+    def upcoming(self, days=30, today=None):
+        """
+        Expected charges in the next `days` days, projected from each
+        recurring merchant's last charge by its detected period. Merchants
+        that skipped more than one cycle are treated as cancelled.
+
+        Returns:
+            DataFrame of Date, Description, Amount, Frequency sorted by date.
+        """
+        columns = ['Date', 'Description', 'Amount', 'Frequency']
+        subs = self.results
+        today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+        if subs.empty:
+            return pd.DataFrame(columns=columns)
+
+        period = subs['Period (Days)'].to_numpy(dtype=float)
+        last = self.merchants['last_date'].reindex(subs['Description']).to_numpy(dtype='datetime64[ns]')
+        elapsed = (today.to_datetime64() - last) / np.timedelta64(1, 'D')
+        active = (elapsed <= 2 * period) & (period > 0)
+        period, last, elapsed = period[active], last[active], elapsed[active]
+        if not active.any():
+            return pd.DataFrame(columns=columns)
+
+        # Occurrence numbers from the first one due today or later
+        first_step = np.maximum(np.ceil(elapsed / period), 1).astype(np.int64)
+        steps = int(np.ceil(days / period.min())) + 1
+        merchant = np.repeat(np.arange(len(period)), steps)
+        step = np.repeat(first_step, steps) + np.tile(np.arange(steps), len(period))
+        offset = np.rint(step * period[merchant]).astype('timedelta64[D]')
+        dates = last[merchant] + offset
+        horizon = (today + pd.Timedelta(days=days)).to_datetime64()
+        keep = (dates >= today.to_datetime64()) & (dates <= horizon)
+
+        rows = subs[active]
+        calendar = pd.DataFrame({
+            'Date': dates[keep],
+            'Description': rows['Description'].to_numpy()[merchant[keep]],
+            'Amount': rows['Avg Amount'].to_numpy(dtype=float)[merchant[keep]],
+            'Frequency': rows['Frequency'].to_numpy()[merchant[keep]]
+        }, columns=columns)
+        return calendar.sort_values(['Date', 'Description'], ignore_index=True)
+
+    def save(self):
+        """
+        Persists the state atomically (see atomic_write).
+        """
+        if not self.path:
+            return
+        payload = {'charges': self.charges, 'merchants': self.merchants, 'results': self.results,
+                   'index_version': self.index_version}
+        try:
+            atomic_write(self.path, lambda tmp_path: joblib.dump(payload, tmp_path))
+        except Exception as e:
+            print(f"Failed to save subscription state: {e}")
+
+    def load(self):
+        """
+        Restores persisted state, if any.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            payload = joblib.load(self.path)
+        except Exception as e:
+            print(f"Failed to load subscription state: {e}")
+            return
+        if 'charges' not in payload:
+            # Saved as running gap statistics; rebuilt from the next visit
+            return
+        self.charges = payload['charges']
+        self.results = payload['results']
+        self.index_version = payload.get('index_version')
+        self.merchants = payload.get('merchants')
+        if self.merchants is None:
+            self.merchants = self._merchant_stats(self.charges)
+        self.counts = {}
+        add_counts(self.counts, self.charges['fingerprint'].to_numpy())
@@ -0,0 +1,125 @@
+import threading
+import time
+
+
+class TrainingWorker:
+    """
+    Background thread that runs categorizer training off the Streamlit
+    request, so pages stay interactive while a model fits.
+
+    - Jobs are keyed (e.g. "personal", "business"); submitting again for a
+      key that is still queued replaces the pending data and restarts the
+      debounce window, so a burst of edits trains once on the latest frame.
+    - Training runs on `target.clone()`; the fitted clone is swapped into
+      the shared categorizer with `target.adopt(trained)` only on success.
+    - `status(key)` returns a plain dict that pages can poll.
+    """
+
+    def __init__(self, debounce_seconds=2.0):
+        self.debounce_seconds = debounce_seconds
+        self._pending = {}
+        self._status = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, key, target, method, df):
+        """
+        Queues `target.<method>(df)` (e.g. method='train_incremental').
+        """
+        now = time.time()
+        with self._cond:
+            previous = self._pending.get(key)
+            self._pending[key] = {
+                'target': target,
+                'method': method,
+                'df': df.copy(),
+                'due': now + self.debounce_seconds,
+                'submitted_at': previous['submitted_at'] if previous else now,
+                'coalesced': previous['coalesced'] + 1 if previous else 0
+            }
+            self._set_status(key, state='queued', rows=len(df), error=None)
+            self._ensure_thread()
+            # wait() callers share the condition with the worker; wake them all
+            self._cond.notify_all()
+
+    def status(self, key):
+        """
+        Returns {'state': 'idle'|'queued'|'running'|'done'|'failed', ...}.
+        """
+        with self._cond:
+            return dict(self._status.get(key, {'state': 'idle'}))
+
+    def wait(self, key, timeout=None):
+        """
+        Blocks until the job for `key` is no longer queued or running.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._status.get(key, {}).get('state') in ('queued', 'running'):
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _set_status(self, key, **fields):
+        status = self._status.setdefault(key, {})
+        status.update(fields)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="training-worker", daemon=True)
+            self._thread.start()
+
+    def _next_job(self):
+        """
+        Waits for the earliest job whose debounce window has passed.
+        """
+        with self._cond:
+            while True:
+                now = time.time()
+                due = [(job['due'], key) for key, job in self._pending.items()]
+                if due:
+                    when, key = min(due)
+                    if when <= now:
+                        job = self._pending.pop(key)
+                        self._set_status(key, state='running', started_at=now,
+                                         coalesced=job['coalesced'])
+                        return key, job
+                    self._cond.wait(when - now)
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            key, job = self._next_job()
+            error = None
+            try:
+                trained = job['target'].clone()
+                getattr(trained, job['method'])(job['df'])
+                job['target'].adopt(trained)
+            except Exception as e:
+                error = str(e)
+                print(f"Background training failed for {key}: {e}")
+
+            with self._cond:
+                # A newer submit may have re-queued this key while we trained
+                if key not in self._pending:
+                    self._set_status(key, state='failed' if error else 'done',
+                                     finished_at=time.time(), error=error)
+                self._cond.notify_all()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_training_worker():
+    """
+    Process-wide worker shared by all sessions.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TrainingWorker()
+        return _worker
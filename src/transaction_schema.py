@@ -0,0 +1,72 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+# Canonical in-memory dtypes of a processed transaction frame. Text columns
+# repeat a few hundred distinct values across thousands of rows, so they are
+# stored as categoricals (int codes + one copy of each string). Amounts stay
+# float64: float32 cannot hold large rupee amounts to the paisa.
+TRANSACTION_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'description': 'category',
+    'clean_description': 'category',
+    'category': 'category',
+    'anomaly_reason': 'category',
+    'account': 'category',
+    'amount': 'float64',
+    'is_anomaly': 'int8'
+}
+
+
+def apply_schema(df):
+    """
+    Converts the schema columns present in df to their canonical dtypes.
+    Idempotent; conversions that would lose data are skipped (dates that do
+    not all parse stay as they are, non-numeric amounts and is_anomaly with
+    gaps are left alone).
+    """
+    if df is None:
+        return df
+    for col, dtype in TRANSACTION_SCHEMA.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        values = df[col]
+        if dtype == 'category':
+            df[col] = values.astype('category')
+        elif dtype.startswith('datetime'):
+            parsed = pd.to_datetime(values, errors='coerce')
+            if parsed.notna().sum() == values.notna().sum():
+                df[col] = parsed.astype(dtype)
+        elif dtype == 'int8':
+            if values.notna().all():
+                df[col] = values.astype(np.int8)
+        elif pd.api.types.is_numeric_dtype(values):
+            df[col] = values.astype(dtype)
+    return df
+
+
+def unapply_schema(df):
+    """
+    Copy of df with categorical columns as plain strings, for widgets that
+    would otherwise restrict edits to the existing categories.
+    """
+    categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    return df.astype({col: object for col in categorical})
+
+
+def memory_report(df):
+    """
+    Per-column deep memory usage of df.
+
+    Returns:
+        DataFrame of column, dtype and bytes, largest first, with a 'total' row.
+    """
+    if df is None:
+        return pd.DataFrame(columns=['column', 'dtype', 'bytes'])
+    usage = df.memory_usage(deep=True)
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[col].dtype) if col in df.columns else str(df.index.dtype) for col in usage.index],
+        'bytes': usage.to_numpy(dtype=np.int64)
+    }).sort_values('bytes', ascending=False, ignore_index=True)
+    total = pd.DataFrame({'column': ['total'], 'dtype': [''], 'bytes': [int(report['bytes'].sum())]})
+    return pd.concat([report, total], ignore_index=True)
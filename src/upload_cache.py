@@ -0,0 +1,135 @@
+import hashlib
+import os
+import shutil
+import uuid
+from src.ingestion import ChunkStore  # type: ignore
+
+
+class UploadCache:
+    """
+    Content-addressed cache of processed uploads.
+
+    An entry is keyed by a hash of the uploaded bytes and the versions of
+    everything that shaped the result (categorizer model, anomaly forest),
+    so re-uploading a statement, or a rerun after a session reset, loads the
+    processed frame instead of running clean -> categorize -> anomalies
+    again. A retrained model changes the key, so stale results are never
+    served. Entries are ChunkStore directories (one .npy per column); the
+    directory is kept under `max_bytes` by evicting the least recently used
+    entries, with recency tracked through each entry's mtime.
+    """
+
+    def __init__(self, root, max_bytes=200 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(data, *versions):
+        """
+        Cache key for the uploaded bytes under the given model versions.
+        """
+        digest = hashlib.sha256(data)
+        for version in versions:
+            digest.update(b'\0' + str(version).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """
+        Returns the cached frame for `key` (marking it recently used), or
+        None on a miss.
+        """
+        path = self._entry(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            df = ChunkStore(path).load()
+            os.utime(path)
+            return df
+        except Exception as e:
+            print(f"Failed to load cached upload: {e}")
+            return None
+
+    def store(self, key):
+        """
+        Staging ChunkStore for an entry that is written chunk by chunk;
+        publish it with commit().
+        """
+        return ChunkStore(os.path.join(self.root, f".tmp-{key}-{uuid.uuid4().hex}"))
+
+    def commit(self, key, store):
+        """
+        Publishes a staged store under `key`, then evicts old entries.
+        """
+        path = self._entry(key)
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(store.root, ignore_errors=True)
+            else:
+                os.rename(store.root, path)
+            self.evict(keep=key)
+        except Exception as e:
+            shutil.rmtree(store.root, ignore_errors=True)
+            print(f"Failed to cache upload: {e}")
+
+    def put(self, key, df):
+        """
+        Caches a processed frame under `key`.
+        """
+        store = self.store(key)
+        try:
+            store.reset()
+            store.append(df)
+        except Exception as e:
+            shutil.rmtree(store.root, ignore_errors=True)
+            print(f"Failed to cache upload: {e}")
+            return
+        self.commit(key, store)
+
+    def entries(self):
+        """
+        Returns [(key, nbytes, last_used)] for every published entry.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for key in os.listdir(self.root):
+            path = self._entry(key)
+            if key.startswith('.') or not os.path.isdir(path):
+                continue
+            entries.append((key, ChunkStore(path).nbytes, os.path.getmtime(path)))
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Removes least recently used entries until the cache fits in
+        max_bytes. The entry `keep` (the one just written) is never evicted.
+
+        Returns:
+            Number of entries removed.
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(nbytes for _, nbytes, _ in entries)
+        removed = 0
+        for key, nbytes, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= nbytes
+            removed += 1
+        return removed
+
+    def stats(self):
+        """
+        Returns entry count and size for monitoring.
+        """
+        entries = self.entries()
+        return {
+            'entries': len(entries),
+            'nbytes': sum(nbytes for _, nbytes, _ in entries),
+            'max_bytes': self.max_bytes
+        }
@@ -4,6 +4,16 @@ import pandas as pd  # type: ignore
 import json
 import random
 import os
+import re
+
+USER_DATA_DIR = "user_data"
+
+def user_data_path(username, filename):
+    """
+    Path of a per-user state file, e.g. user_data/<username>/anomaly_baselines.pkl.
+    """
+    safe_name = re.sub(r'[^A-Za-z0-9_-]', '_', str(username or 'anonymous'))
+    return os.path.join(USER_DATA_DIR, safe_name, filename)
 
 def get_random_quote():
     """
@@ -30,3 +30,17 @@ def test_anomaly_detection_empty():
     df = pd.DataFrame({'amount': []})
     df = detector.detect_anomalies(df)
     assert 'is_anomaly' in df.columns
+
+def test_anomaly_reasons_and_exemptions():
+    detector = AnomalyDetector()
+    amounts = [50, 55, 60, 45, 100, 50, 60, 55, 40] * 10 + [25000, 25000, 90000]
+    categories = ['Food'] * 90 + ['Shopping', 'Housing', 'Income']
+    df = pd.DataFrame({'amount': amounts, 'category': categories}, index=range(100, 193))
+    df = detector.detect_anomalies(df)
+
+    shopping, housing, income = df.iloc[-3], df.iloc[-2], df.iloc[-1]
+    assert shopping['is_anomaly'] == -1
+    assert shopping['anomaly_reason'].endswith("Absurdly High (Z > 5) & Massive Transaction (>10k)")
+    # Recurring categories and income are never flagged
+    assert housing['is_anomaly'] == 1 and housing['anomaly_reason'] == ""
+    assert income['is_anomaly'] == 1 and income['anomaly_reason'] == ""
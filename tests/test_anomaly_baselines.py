@@ -0,0 +1,130 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from src.anomaly_baselines import BaselineIndex, RunningStats, normalize_merchant  # type: ignore
+from src.model import AmountForest, AnomalyDetector  # type: ignore
+
+def month(start, coffee, rent=-25000.0):
+    days = pd.date_range(start, periods=len(coffee), freq='D')
+    return pd.DataFrame({
+        'date': list(days) + [days[0]],
+        'description': ['STARBUCKS COFFEE POS'] * len(coffee) + ['RENT TO LANDLORD'],
+        'amount': [-a for a in coffee] + [rent],
+        'category': ['Dining'] * len(coffee) + ['Housing']
+    })
+
+def test_normalize_merchant():
+    keys = normalize_merchant(['UBER *TRIP 8812 POS', 'upi-swiggy-order', None, 'POS 1234'])
+    assert list(keys) == ['uber trip', 'swiggy order', '', '']
+
+def test_baselines_persist_and_ignore_reuploads(tmp_path):
+    path = str(tmp_path / 'user' / 'baselines.pkl')
+    index = BaselineIndex(path)
+    january = month('2024-01-01', [50, 55, 60, 45, 52, 58])
+    assert index.update(january) == 7
+    assert index.update(january) == 0
+    index.save()
+
+    restored = BaselineIndex(path)
+    restored.load()
+    stats = restored.stats.loc[('merchant', 'starbucks coffee')]
+    assert stats['count'] == 6 and stats['median'] == 53.5
+    assert restored.update(month('2024-02-01', [51, 49])) == 3
+    assert restored.stats.loc[('merchant', 'starbucks coffee'), 'count'] == 8
+
+def test_baselines_count_identical_rows_and_refresh_changed_keys(tmp_path):
+    index = BaselineIndex(str(tmp_path / 'baselines.pkl'), max_samples=4)
+    two_coffees = month('2024-01-01', [50, 50]).iloc[[0, 0, 2]]
+    assert index.update(two_coffees) == 3
+    assert index.update(two_coffees) == 0
+    # A statement with a third identical coffee adds only that one
+    assert index.update(two_coffees.iloc[[0, 0, 0]]) == 1
+    assert index.stats.loc[('merchant', 'starbucks coffee'), 'count'] == 3
+
+    for start in ('2024-02-01', '2024-03-01'):
+        index.update(month(start, [60, 45, 52]))
+    index.save()
+    restored = BaselineIndex(str(tmp_path / 'baselines.pkl'), max_samples=4)
+    restored.load()
+    assert restored.update(month('2024-03-01', [60, 45, 52])) == 0
+    # The January coffees were pushed out of the sample (and the index)
+    assert len(index.history) == len(index.counts) == 7
+    assert index.stats.loc[('merchant', 'starbucks coffee'), 'median'] == 52
+    # Stats merged key by key match a full recompute
+    full = index._compute_stats(index.history)
+    pd.testing.assert_frame_equal(index.stats.sort_index(), full.sort_index(), check_dtype=False)
+
+def test_detector_scores_rows_against_their_own_baseline(tmp_path):
+    baselines = BaselineIndex(str(tmp_path / 'baselines.pkl'), min_count=5)
+    detector = AnomalyDetector(baselines=baselines)
+    detector.detect_anomalies(month('2024-01-01', [50, 55, 60, 45, 52, 58]))
+
+    # Next month: usual rent, one coffee ten times the norm
+    result = detector.detect_anomalies(month('2024-02-01', [50, 500, 55, 52, 48]))
+    flagged = result[result['is_anomaly'] == -1]
+    assert list(flagged['amount']) == [-500]
+    assert flagged['anomaly_reason'].iloc[0] == "Unusual for Merchant (Robust Z > 3.5)"
+
+    # Two rent payments are not a baseline yet; the global rules still apply
+    scores = baselines.score(result)
+    assert scores['baseline'].iloc[-1] == ''
+    assert scores['baseline'].iloc[0] == 'merchant'
+    assert not np.isnan(scores['robust_z']).any()
+
+def test_running_stats_match_full_history(tmp_path):
+    history = pd.concat([month('2024-01-01', [50, 55, 60, 45]), month('2024-02-01', [52, 58, 61, 40])],
+                        ignore_index=True)
+    running = RunningStats(str(tmp_path / 'running.pkl'))
+    for chunk in (history.iloc[:3], history.iloc[3:7], history.iloc[7:]):
+        running.update(chunk)
+    assert running.update(history) == 0
+    running.save()
+
+    restored = RunningStats(str(tmp_path / 'running.pkl'))
+    restored.load()
+    logs = np.log1p(history['amount'].abs())
+    for category, values in logs.groupby(history['category'].str.lower()):
+        row = restored.state.loc[category]
+        assert row['count'] == len(values)
+        assert np.isclose(row['mean'], values.mean())
+        assert np.isclose(row['m2'], ((values - values.mean()) ** 2).sum())
+
+def test_detect_new_scores_only_appended_rows(tmp_path):
+    detector = AnomalyDetector(running=RunningStats(str(tmp_path / 'running.pkl')))
+    scored = detector.detect_anomalies(month('2024-01-01', [50, 55, 60, 45, 52, 58]))
+    scored.loc[0, ['is_anomaly', 'anomaly_reason']] = [-1, 'Reviewed']
+
+    appended = pd.concat([scored, month('2024-02-01', [54, 900])], ignore_index=True)
+    result = detector.detect_new(appended)
+    assert result.loc[0, 'anomaly_reason'] == 'Reviewed'
+    assert list(result.loc[:len(scored) - 1, 'is_anomaly']) == list(scored['is_anomaly'].astype(int))
+
+    new = result.iloc[len(scored):]
+    assert list(new['is_anomaly']) == [1, -1, 1]
+    assert new['anomaly_reason'].iloc[1] == "Absurdly High for Category (Z > 5)"
+    # The appended rows are now part of the running history
+    assert detector.running.state.loc['dining', 'count'] == 8
+
+def test_amount_forest_refit_policy(tmp_path):
+    path = str(tmp_path / 'forest.joblib')
+    values = np.abs(month('2024-01-01', [50, 55, 60, 45, 52, 58] * 20)['amount'].to_numpy())
+    forest = AmountForest(path, max_samples=64, refit_growth=0.5, max_age_days=30)
+    assert forest.fit_if_needed(values)
+    assert forest.model.max_samples == 64
+    assert not forest.fit_if_needed(values[:-10])
+
+    restored = AmountForest(path, refit_growth=0.5, max_age_days=30)
+    restored.load()
+    assert np.array_equal(restored.decision_function(values), forest.decision_function(values))
+    assert restored.decision_function([25000])[0] < 0 < restored.decision_function([52])[0]
+    assert restored.needs_refit(len(values) * 2)
+    assert restored.needs_refit(len(values), now=restored.fitted_at + 31 * 86400)
+    assert not restored.needs_refit(len(values))
+
+def test_amount_forest_does_not_refit_large_histories_every_call():
+    values = np.random.default_rng(0).lognormal(4, 1, 100000)
+    forest = AmountForest(max_samples=64, max_fit_rows=1000)
+    assert forest.fit_if_needed(values)
+    fitted_at = forest.fitted_at
+    assert forest.fitted_rows == len(values)
+    assert not forest.fit_if_needed(values)
+    assert forest.fitted_at == fitted_at
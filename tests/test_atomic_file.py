@@ -0,0 +1,38 @@
+import os
+import pytest  # type: ignore
+from src.atomic_file import atomic_write  # type: ignore
+
+def write_text(text):
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return write
+
+def test_replaces_file_and_cleans_up_failed_writes(tmp_path):
+    path = str(tmp_path / 'state' / 'data.txt')
+    atomic_write(path, write_text('first'))
+    atomic_write(path, write_text('second'))
+
+    def broken(tmp_path):
+        write_text('partial')(tmp_path)
+        raise OSError('disk full')
+    with pytest.raises(OSError):
+        atomic_write(path, broken)
+
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'second'
+    assert os.listdir(os.path.dirname(path)) == ['data.txt']
+
+def test_concurrent_writers_use_their_own_temp_files(tmp_path):
+    path = str(tmp_path / 'data.txt')
+    seen = []
+
+    def outer(tmp):
+        seen.append(tmp)
+        # A second save of the same file starts before the first renames
+        atomic_write(path, lambda inner: seen.append(inner) or write_text('inner')(inner))
+        write_text('outer')(tmp)
+    atomic_write(path, outer)
+    assert seen[0] != seen[1]
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'outer'
@@ -0,0 +1,61 @@
+from io import StringIO
+import pandas as pd  # type: ignore
+import pytest  # type: ignore
+from src.bank_formats import detect_date_format, detect_layout, read_statement  # type: ignore
+from src.data_processor import load_data  # type: ignore
+
+DEBIT_CREDIT = """Txn Date,Narration,Withdrawal Amt,Deposit Amt,Closing Balance
+03/04/2024,UPI-SWIGGY-ORDER,"1,250.00",,"48,750.00"
+05/04/2024,SALARY APRIL,,"50,000.00","98,750.00"
+13/04/2024,NETFLIX.COM,649.00,,"98,101.00"
+"""
+
+def test_debit_credit_columns_and_day_first_dates():
+    df = read_statement(StringIO(DEBIT_CREDIT))
+    assert list(df.columns) == ['date', 'description', 'amount']
+    assert df['amount'].tolist() == [-1250.0, 50000.0, -649.0]
+    assert df['date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-04-03', '2024-04-05', '2024-04-13']
+
+def test_dr_cr_marker_and_generic_type_column():
+    typed = "Date,Description,Amount,Dr/Cr\n2024-01-02,Rent,25000,DR\n2024-01-03,Refund,300,CR\n"
+    assert load_data(StringIO(typed))['amount'].tolist() == [-25000.0, 300.0]
+
+    # "Type" here is a payment channel, not a sign marker
+    generic = "Date,Description,Amount,Type\n2024-01-02,Rent,-25000,Online\n"
+    layout = detect_layout(StringIO(generic))
+    assert layout.bank_format.name == 'signed'
+    assert read_statement(StringIO(generic))['amount'].tolist() == [-25000.0]
+
+    # Markers are whole values: a card type is not a debit or credit marker
+    cards = "Date,Description,Amount,Type\n2024-01-02,Rent,-25000,Debit Card\n2024-01-03,Fuel,-900,Credit Card\n"
+    assert detect_layout(StringIO(cards)).bank_format.name == 'signed'
+    assert read_statement(StringIO(cards))['amount'].tolist() == [-25000.0, -900.0]
+    dotted = "Date,Description,Amount,Type\n2024-01-02,Rent,25000,Dr.\n2024-01-03,Refund,300,Cr.\n"
+    assert read_statement(StringIO(dotted))['amount'].tolist() == [-25000.0, 300.0]
+
+def test_rows_past_the_sample_keep_parsing():
+    # The sample sees plain numbers and day-first dates only
+    rows = ["Date,Description,Amount"] + [f"0{d}/04/2024,Coffee,-120" for d in range(1, 4)]
+    rows += ['"04/04/2024",Rent,"-25,000.00"', '2024-04-05,Refund,300']
+    layout = detect_layout(StringIO("\n".join(rows)), sample_rows=3)
+    df = layout.read(StringIO("\n".join(rows)))
+    assert df['amount'].tolist() == [-120.0, -120.0, -120.0, -25000.0, 300.0]
+    assert df['date'].dt.strftime('%Y-%m-%d').tolist()[-2:] == ['2024-04-04', '2024-04-05']
+
+    with pytest.raises(ValueError, match="unrecognised dates"):
+        layout.read(StringIO("\n".join(rows + ['Closing balance,,'])))
+
+def test_explicit_format_and_chunked_read_match():
+    layout = detect_layout(StringIO(DEBIT_CREDIT), format='debit_credit')
+    assert layout.date_format == '%d/%m/%Y'
+    chunks = list(layout.read(StringIO(DEBIT_CREDIT), chunksize=2))
+    assert len(chunks) == 2
+    assert pd.concat(chunks).equals(read_statement(StringIO(DEBIT_CREDIT)))
+    with pytest.raises(ValueError):
+        load_data(StringIO(DEBIT_CREDIT), format='amount_with_type')
+
+def test_detect_date_format():
+    assert detect_date_format(['2024-01-31', None]) == '%Y-%m-%d'
+    assert detect_date_format(['12/31/2024', '01/02/2024']) == '%m/%d/%Y'
+    assert detect_date_format(['31-Jan-2024']) == '%d-%b-%Y'
+    assert detect_date_format(['someday']) is None
@@ -0,0 +1,70 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from sklearn.ensemble import RandomForestClassifier  # type: ignore
+from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+from src.compact_forest import CompactForest  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+from src.model_artifact import load_artifact  # type: ignore
+
+DESCRIPTIONS = [
+    'uber trip pos', 'lyft ride upi', 'shell gas station card', 'netflix subscription',
+    'spotify premium upi', 'whole foods market pos', 'trader joes card', 'starbucks coffee pos',
+    'chipotle upi', 'electric co bill', 'water board bill upi', 'amazon order card',
+    'target store pos', 'salary credit', 'interest credit', 'uber eats upi'
+]
+CATEGORIES = [
+    'Transport', 'Transport', 'Transport', 'Entertainment', 'Entertainment', 'Food', 'Food',
+    'Dining', 'Dining', 'Utilities', 'Utilities', 'Shopping', 'Shopping', 'Income', 'Income', 'Dining'
+]
+
+def test_matches_sklearn_on_sparse_tfidf():
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(DESCRIPTIONS * 3)
+    clf = RandomForestClassifier(n_estimators=25, random_state=0).fit(X, CATEGORIES * 3)
+    forest = CompactForest.from_sklearn(clf)
+
+    queries = vectorizer.transform(DESCRIPTIONS + ['uber pos card', 'unknown merchant', '', 'bill bill upi'])
+    assert np.array_equal(forest.predict_proba(queries), clf.predict_proba(queries))
+    assert np.array_equal(forest.predict(queries), clf.predict(queries))
+    assert np.array_equal(forest.apply(queries) - forest.roots, clf.apply(queries))
+
+def test_matches_sklearn_with_negative_features():
+    # Negative thresholds send zeros right, exercising the other chain direction
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6)) * (rng.random((300, 6)) < 0.4)
+    y = (X[:, 0] - X[:, 3] > 0).astype(int) + (X[:, 1] < -0.5)
+    clf = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+    forest = CompactForest.from_sklearn(clf)
+
+    queries = rng.normal(size=(200, 6)) * (rng.random((200, 6)) < 0.4)
+    assert np.array_equal(forest.predict_proba(queries), clf.predict_proba(queries))
+
+def test_roundtrip_through_arrays_and_categorizer(tmp_path):
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(DESCRIPTIONS)
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, CATEGORIES)
+    forest = CompactForest.from_arrays(CompactForest.from_sklearn(clf).to_arrays())
+    assert np.array_equal(forest.predict_proba(X), clf.predict_proba(X))
+    assert list(forest.classes_) == list(clf.classes_)
+
+    # Training picks the compact forest from the parity check alone, and the
+    # artifact keeps the sklearn forest as the fallback
+    model_path = str(tmp_path / 'model.pkl')
+    categorizer = ExpenseCategorizer(model_path=model_path)
+    categorizer.train(pd.DataFrame({'clean_description': DESCRIPTIONS, 'category': CATEGORIES}))
+    expected = categorizer.clf.predict_proba(categorizer.vectorizer.transform(DESCRIPTIONS))
+    assert categorizer.forest is not None
+    assert categorizer.manifest['engine'] == 'compact_forest'
+
+    loaded = ExpenseCategorizer(model_path=model_path)
+    loaded._apply_bundle(load_artifact(loaded.artifact_dir))
+    assert isinstance(loaded.clf, RandomForestClassifier)
+    assert isinstance(loaded.forest.leaf_values, np.memmap)
+    labels, confidences = loaded._predict_labels(np.array(DESCRIPTIONS, dtype=object))
+    assert list(labels) == list(categorizer.clf.classes_[expected.argmax(axis=1)])
+    assert np.array_equal(confidences, expected.max(axis=1))
+
+    sklearn_only = ExpenseCategorizer(model_path=str(tmp_path / 'sklearn.pkl'))
+    sklearn_only.use_compact_forest = False
+    sklearn_only.train(pd.DataFrame({'clean_description': DESCRIPTIONS, 'category': CATEGORIES}))
+    assert sklearn_only.forest is None and sklearn_only.manifest['engine'] == 'sklearn'
@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 from io import StringIO
-from src.data_processor import load_data
+from src.data_processor import load_data, clean_text, clean_descriptions
 
 def test_load_data_valid_csv():
     csv_data = """Date,Description,Amount
@@ -25,3 +26,18 @@ def test_preprocess_data():
     assert 'clean_description' in df.columns
     assert df.iloc[0]['clean_description'] == 'uber ride'
     assert df.iloc[1]['clean_description'] == 'grocery store'
+
+def test_clean_descriptions_matches_clean_text():
+    descriptions = pd.Series(['UBER *RIDE 123', '  Caf\u00e9\u00a0No. 5 ', None, float('nan'), 123, 1.0, True,
+                              'UBER *RIDE 123', '', '\t'], dtype=object)
+    pd.testing.assert_series_equal(clean_descriptions(descriptions), descriptions.apply(clean_text))
+    strings = pd.Series(['Grocery Store #4', float('nan')])
+    pd.testing.assert_series_equal(clean_descriptions(strings), strings.apply(clean_text))
+
+def test_clean_descriptions_matches_clean_text_on_repeated_merchants():
+    # Statements repeat a few hundred merchants many times over; timing is
+    # in benchmarks/bench_clean_text.py
+    rng = np.random.default_rng(0)
+    merchants = np.array([f"POS {i:04d} MERCHANT #{i % 37} *REF" for i in range(500)], dtype=object)
+    descriptions = pd.Series(rng.choice(merchants, 10000))
+    pd.testing.assert_series_equal(clean_descriptions(descriptions), descriptions.apply(clean_text))
@@ -0,0 +1,82 @@
+import pandas as pd  # type: ignore
+from src.data_processor import preprocess_data  # type: ignore
+from src.dedup import FingerprintIndex, row_fingerprints  # type: ignore
+from src.ingestion import account_name, ingest_files  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+
+def export(dates, descriptions, amounts):
+    return preprocess_data(pd.DataFrame({'date': dates, 'description': descriptions, 'amount': amounts}))
+
+def test_fingerprint_ignores_formatting_but_not_account():
+    a = export(pd.to_datetime(['2024-03-01']), ['SWIGGY *ORDER 123'], [-250.0])
+    b = export(['2024-03-01'], ['swiggy order'], [-250.004])
+    assert row_fingerprints(a)[0] == row_fingerprints(b)[0]
+    b['account'] = 'hdfc'
+    assert row_fingerprints(a)[0] != row_fingerprints(b)[0]
+
+def test_overlapping_statements_keep_real_repeats(tmp_path):
+    path = str(tmp_path / 'fingerprints.bin')
+    index = FingerprintIndex(path)
+    # Two identical coffees on the 2nd are both real
+    week1 = export(['2024-03-01', '2024-03-02', '2024-03-02'], ['Rent', 'Coffee', 'Coffee'], [-9000.0, -4.5, -4.5])
+    kept, dropped = index.dedupe(week1)
+    assert len(kept) == 3 and dropped == 0
+    index.save()
+
+    # The next export repeats the 2nd (with a third coffee) and adds the 3rd
+    restored = FingerprintIndex(path)
+    restored.load()
+    week2 = export(['2024-03-02', '2024-03-02', '2024-03-02', '2024-03-03'],
+                   ['Coffee', 'Coffee', 'Coffee', 'Groceries'], [-4.5, -4.5, -4.5, -60.0])
+    kept, dropped = restored.dedupe(week2)
+    assert dropped == 2
+    assert kept['description'].tolist() == ['Coffee', 'Groceries']
+    restored.save()
+
+    # Appended records replay on load; a reset forgets everything
+    reloaded = FingerprintIndex(path)
+    reloaded.load()
+    assert reloaded.dedupe(week2)[1] == 4
+    reloaded.reset()
+    reloaded.save()
+    empty = FingerprintIndex(path)
+    empty.load()
+    assert len(empty) == 0
+
+def test_multi_file_ingestion_drops_overlap(tmp_path):
+    march = "Date,Description,Amount\n2024-03-30,Uber,-120\n2024-03-31,Netflix,-649\n"
+    overlap = "Date,Description,Amount\n2024-03-31,Netflix,-649\n2024-04-01,Salary,50000\n"
+    files = [('hdfc_mar.csv', march.encode()), ('hdfc_mar_apr.csv', overlap.encode())]
+    categorizer = ExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'))
+
+    merged, timings = ingest_files(files, categorizer, max_workers=1, index=FingerprintIndex())
+    assert merged['description'].tolist() == ['Uber', 'Netflix', 'Salary']
+    assert [t['duplicates'] for t in timings] == [0, 1]
+
+def test_account_name_drops_only_the_period():
+    assert account_name('HDFC_Mar-2024.csv') == 'hdfc'
+    assert account_name('sbi_statement_20240301_to_20240331.csv') == 'sbi'
+    # Card and account numbers are not dates, so two cards stay apart
+    assert account_name('card_4321_2024-03.csv') == 'card_4321'
+    assert account_name('card_9876_jan2024.csv') == 'card_9876'
+    assert account_name('axis-xx4321-032024.csv') == 'axis_xx4321'
+    # A repeated browser download is the same account
+    assert account_name('Statement (1).csv') == account_name('statement.csv') == 'statement'
+    assert account_name('HDFC_Mar-2024 (2).csv') == 'hdfc'
+    # Last four digits that could be a year, next to a dated token
+    assert account_name('card_2019_mar2024.csv') == 'card_2019'
+    assert account_name('card_1999_20240301.csv') == 'card_1999'
+
+def test_chosen_accounts_override_file_names(tmp_path):
+    rows = "Date,Description,Amount\n2024-03-31,Netflix,-649\n"
+    files = [('statement.csv', rows.encode()), ('Statement (1).csv', rows.encode())]
+    categorizer = ExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'))
+
+    # Same account: the second copy is a duplicate
+    merged, _ = ingest_files(files, categorizer, max_workers=1, index=FingerprintIndex(),
+                             accounts=['hdfc savings', 'hdfc savings'])
+    assert merged['account'].tolist() == ['hdfc savings']
+    # Two accounts with the same charge keep both
+    merged, _ = ingest_files(files, categorizer, max_workers=1, index=FingerprintIndex(),
+                             accounts=['hdfc savings', 'sbi card'])
+    assert sorted(merged['account']) == ['hdfc savings', 'sbi card']
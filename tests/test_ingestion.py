@@ -0,0 +1,73 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from src.data_processor import load_data, preprocess_data  # type: ignore
+from src.ingestion import ChunkStore, ExpenseReducer, ingest_csv, ingest_files  # type: ignore
+from src.model import AnomalyDetector, ExpenseCategorizer  # type: ignore
+
+def statement(path, n=500, start='2024-01-01'):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Date': pd.date_range(start, periods=n, freq='D').strftime('%Y-%m-%d'),
+        'Description': rng.choice(['STARBUCKS COFFEE', 'UBER TRIP', 'SALARY CREDIT', 'AMAZON ORDER'], n),
+        'Amount': -rng.gamma(2.0, 40.0, n).round(2)
+    })
+    df.loc[df['Description'] == 'SALARY CREDIT', 'Amount'] = 50000.0
+    df.loc[7, 'Amount'] = -90000.0
+    df.to_csv(path, index=False)
+    return path
+
+def test_store_round_trip(tmp_path):
+    store = ChunkStore(str(tmp_path / 'store'))
+    store.reset()
+    df = pd.DataFrame({'date': pd.to_datetime(['2024-01-01', '2024-01-02']),
+                       'description': ['coffee', None], 'amount': [-4.5, -12.0]})
+    assert store.append(df) == 0
+    store.add_columns(0, pd.DataFrame({'is_anomaly': [1, -1], 'description': ['tea', 'cake']}))
+
+    loaded = store.load()
+    assert len(store) == 1
+    assert list(loaded.columns) == ['date', 'amount', 'is_anomaly', 'description']
+    assert loaded['date'].equals(df['date'])
+    assert list(loaded['description']) == ['tea', 'cake']
+    assert store.read(0, ['amount'])['amount'].tolist() == [-4.5, -12.0]
+
+def test_reducer_matches_full_data():
+    values = np.random.default_rng(1).gamma(2.0, 40.0, 10000)
+    reducer = ExpenseReducer(sample_size=1000)
+    for chunk in np.array_split(values, 7):
+        reducer.update(chunk)
+    assert reducer.count == 10000 and len(reducer.sample) == 1000
+    assert np.isclose(reducer.mean, values.mean())
+    assert np.isclose(reducer.std, values.std(ddof=1))
+
+def test_streamed_upload_matches_in_memory(tmp_path):
+    path = statement(str(tmp_path / 'statement.csv'))
+    categorizer = ExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'))
+    store = ChunkStore(str(tmp_path / 'store'))
+
+    summary = ingest_csv(path, categorizer, AnomalyDetector(), store, chunksize=120)
+    assert summary['rows'] == 500 and summary['chunks'] == 5
+
+    streamed = store.load()
+    full = categorizer.predict(preprocess_data(load_data(path)))
+    assert streamed['category'].tolist() == full['category'].tolist()
+    assert streamed['is_anomaly'].isin([1, -1]).all()
+    assert streamed.loc[7, 'is_anomaly'] == -1
+
+def test_multi_file_ingestion_merges_sorted(tmp_path):
+    files = []
+    for month in (3, 1, 2):
+        path = statement(str(tmp_path / f'hdfc_{month}.csv'), n=28, start=f'2024-0{month}-01')
+        with open(path, 'rb') as f:
+            files.append((f'hdfc_{month}.csv', f.read()))
+    categorizer = ExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'))
+
+    parallel, timings = ingest_files(files, categorizer, max_workers=2)
+    serial, _ = ingest_files(files, categorizer, max_workers=1)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+    assert len(parallel) == 84 and parallel['date'].is_monotonic_increasing
+    assert (parallel['account'] == 'hdfc').all()
+    assert parallel['date'].iloc[0] == pd.Timestamp('2024-01-01')
+    assert [t['file'] for t in timings] == ['hdfc_3.csv', 'hdfc_1.csv', 'hdfc_2.csv']
+    assert all(t['rows'] == 28 for t in timings)
@@ -0,0 +1,43 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from src.advisor import FinancialAdvisor  # type: ignore
+from src.merchant_index import MerchantIndex  # type: ignore
+from src.subscription_detector import SubscriptionDetector  # type: ignore
+
+def test_groups_spelling_variants(tmp_path):
+    path = str(tmp_path / 'merchants.joblib')
+    index = MerchantIndex(path)
+    keys = index.canonicalize(['NETFLIX.COM 8231', 'NETFLIX.COM 9912', 'UBER *TRIP 8812 POS',
+                               'UBER EATS 1', 'upi-swiggy-order 991', 'POS 1234', None])
+    assert list(keys) == ['netflix com', 'netflix com', 'uber trip', 'uber eats', 'swiggy order', '', '']
+
+    # A typo joins the existing merchant; the index survives a reload
+    assert index.canonicalize(['NETFLX.COM 77'])[0] == 'netflix com'
+    index.save()
+    restored = MerchantIndex(path)
+    restored.load()
+    assert len(restored) == len(index)
+    assert list(restored.canonicalize(['NETFLIX.COM 5555', 'UBER EATS 2'])) == ['netflix com', 'uber eats']
+
+def test_distinct_merchants_stay_apart():
+    rng = np.random.default_rng(0)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    names = {''.join(rng.choice(letters, 8)) for _ in range(2000)}
+    raws = [f"{name.upper()} {n} POS" for name in names for n in (1111, 2222)]
+    keys = MerchantIndex().canonicalize(raws)
+    assert len(set(keys)) == len(names)
+
+def test_detectors_group_by_merchant():
+    dates = pd.date_range('2024-01-05', periods=6, freq='MS') + pd.Timedelta(days=4)
+    df = pd.DataFrame({
+        'date': dates,
+        'description': [f"NETFLIX.COM {n}" for n in range(8231, 8237)],
+        'amount': -15.99,
+        'category': 'Entertainment'
+    })
+    assert SubscriptionDetector().detect_subscriptions(df).empty
+    subs = SubscriptionDetector(merchant_index=MerchantIndex()).detect_recurring(df)
+    assert list(subs['Description']) == ['netflix com']
+
+    insights = FinancialAdvisor(df, 1000, merchant_index=MerchantIndex()).generate_actionable_insights()
+    assert any(i['title'] == 'Habit Spotted' and "'netflix com'" in i['text'] for i in insights)
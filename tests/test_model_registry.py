@@ -0,0 +1,58 @@
+import os
+import pandas as pd  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+from src.model_registry import ModelRegistry, get_model_registry, session_memory_report  # type: ignore
+
+def train_frame():
+    return pd.DataFrame({
+        'clean_description': ['uber', 'lyft', 'netflix', 'spotify'],
+        'category': ['Transport', 'Transport', 'Entertainment', 'Entertainment']
+    })
+
+def test_registry_loads_once_and_reloads_on_change(tmp_path):
+    import joblib  # type: ignore
+    path = str(tmp_path / 'bundle.pkl')
+    joblib.dump({'value': 1}, path)
+
+    registry = ModelRegistry()
+    first = registry.get(path)
+    assert registry.get(path) is first
+    stats = registry.stats()[os.path.abspath(path)]
+    assert stats['loads'] == 1 and stats['hits'] == 1
+
+    joblib.dump({'value': 2, 'padding': 'x' * 100}, path)
+    assert registry.get(path)['value'] == 2
+    assert registry.stats()[os.path.abspath(path)]['loads'] == 2
+
+def test_sessions_share_one_model(tmp_path):
+    model_path = str(tmp_path / 'model.pkl')
+    ExpenseCategorizer(model_path=model_path).train(train_frame())
+
+    a = ExpenseCategorizer(model_path=model_path)
+    b = ExpenseCategorizer(model_path=model_path)
+    a.load_model()
+    b.load_model()
+    assert a.clf is b.clf
+
+    # Training in one session must not mutate the shared objects
+    shared_clf = a.clf
+    a.train_incremental(train_frame())
+    assert b.clf is shared_clf
+    assert a.clf is not shared_clf
+
+    # The other session picks up the newly saved model
+    b.sync_shared_model()
+    assert b.model_version == a.model_version
+    assert b.clf is a.clf
+
+def test_session_memory_report(tmp_path):
+    model_path = str(tmp_path / 'model.pkl')
+    ExpenseCategorizer(model_path=model_path).train(train_frame())
+    categorizer = ExpenseCategorizer(model_path=model_path)
+    categorizer.load_model()
+
+    report = session_memory_report({'categorizer': categorizer, 'data': train_frame(), 'business_data': None})
+    assert report['data_bytes'] > 0
+    assert report['business_data_bytes'] == 0
+    assert report['shared_model_bytes'] == categorizer.manifest['nbytes'] > 0
+    assert get_model_registry().stats()[os.path.abspath(categorizer.artifact_path)]['loads'] <= 1
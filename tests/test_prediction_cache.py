@@ -0,0 +1,88 @@
+import os
+import joblib  # type: ignore
+import pandas as pd  # type: ignore
+from src.prediction_cache import PredictionCache  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+
+def test_cache_lru_eviction(tmp_path):
+    cache = PredictionCache(str(tmp_path / 'cache.pkl'), max_size=2)
+    cache.reset('v1')
+    cache.update(['uber', 'netflix'], ['Transport', 'Entertainment'], [0.9, 0.8])
+    # Touch 'uber' so 'netflix' becomes least recently used
+    cache.lookup(['uber'])
+    cache.update(['rent'], ['Housing'], [0.7])
+
+    found, cats, confs = cache.lookup(['uber', 'netflix', 'rent'])
+    assert list(found) == [True, False, True]
+    assert cats[0] == 'Transport' and confs[2] == 0.7
+    stats = cache.stats()
+    assert stats['size'] == 2
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+def test_cache_persistence_is_versioned(tmp_path):
+    path = str(tmp_path / 'cache.pkl')
+    cache = PredictionCache(path)
+    cache.reset('v1')
+    cache.update(['uber'], ['Transport'], [0.9])
+    cache.save()
+
+    same = PredictionCache(path)
+    same.load('v1')
+    assert same.lookup(['uber'])[0][0]
+
+    retrained = PredictionCache(path)
+    retrained.load('v2')
+    assert not retrained.lookup(['uber'])[0][0]
+
+def test_predict_uses_cache_across_sessions(tmp_path):
+    model_path = str(tmp_path / 'model.pkl')
+    categorizer = ExpenseCategorizer(model_path=model_path)
+    categorizer.train(pd.DataFrame({
+        'clean_description': ['uber', 'lyft', 'netflix', 'spotify'],
+        'category': ['Transport', 'Transport', 'Entertainment', 'Entertainment']
+    }))
+    first = categorizer.predict(pd.DataFrame({'clean_description': ['uber', 'netflix']}))
+
+    # New session: load from disk, the cache should answer before the vectorizer
+    session = ExpenseCategorizer(model_path=model_path)
+    session.load_model()
+    calls = []
+    session.vectorizer.transform = lambda docs: calls.append(docs)
+    second = session.predict(pd.DataFrame({'clean_description': ['netflix', 'uber']}))
+    assert calls == []
+    assert list(second['category']) == list(first['category'])[::-1]
+    assert session.cache.stats()['hits'] == 2
+
+    # Retraining invalidates the cache
+    session.train(pd.DataFrame({
+        'clean_description': ['uber', 'netflix'],
+        'category': ['Transport', 'Entertainment']
+    }))
+    assert session.cache.stats()['size'] == 0
+
+def test_save_is_throttled_and_uses_unique_temp_files(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.pkl')
+    cache = PredictionCache(path, save_interval=3600)
+    cache.reset('v1')
+    cache.update(['uber'], ['Transport'], [0.9])
+    cache.save_if_due()
+    assert os.path.exists(path)
+
+    # Within the interval further updates are not written...
+    cache.update(['netflix'], ['Entertainment'], [0.8])
+    cache.save_if_due()
+    reloaded = PredictionCache(path)
+    reloaded.load('v1')
+    assert reloaded.stats()['size'] == 1
+
+    # ...until an explicit save, which never reuses a shared temp name
+    temp_paths = []
+    real_dump = joblib.dump
+    monkeypatch.setattr(joblib, 'dump', lambda payload, target: temp_paths.append(target) or real_dump(payload, target))
+    cache.save()
+    cache.update(['lyft'], ['Transport'], [0.7])
+    cache.save()
+    assert len(set(temp_paths)) == 2 and f"{path}.tmp" not in temp_paths
+    reloaded.load('v1')
+    assert reloaded.stats()['size'] == 3
+    assert os.listdir(tmp_path) == ['cache.pkl']
@@ -0,0 +1,42 @@
+import pandas as pd  # type: ignore
+from src.subscription_detector import SubscriptionDetector  # type: ignore
+
+def test_detects_monthly_charges_by_merchant():
+    df = pd.DataFrame({
+        'date': ['2024-01-05', '2024-01-07', '2024-02-05', '2024-01-09', '2024-03-06', '2024-01-20',
+                 '2024-01-10', '2024-02-09', '2024-03-11', '2024-03-15'],
+        'description': ['NETFLIX', 'COFFEE', 'NETFLIX', 'COFFEE', 'NETFLIX', 'COFFEE',
+                        'POWER CO', 'POWER CO', 'POWER CO', 'SALARY'],
+        'amount': [-15.99, -4.5, -15.99, -4.0, -15.99, -5.0, -80.0, -120.0, -95.0, 3000.0]
+    })
+    subs = SubscriptionDetector().detect_subscriptions(df)
+
+    assert list(subs.columns) == ['Description', 'Avg Amount', 'Frequency', 'Type', 'Next Expected', 'Confidence']
+    assert list(subs['Description']) == ['NETFLIX', 'POWER CO']
+    netflix, power = subs.iloc[0], subs.iloc[1]
+    # Gaps of 31 and 30 days -> 30.5, next date truncates to +30 days
+    assert (netflix['Avg Amount'], netflix['Type'], netflix['Next Expected']) == (15.99, 'Fixed', '2024-04-05')
+    assert (power['Avg Amount'], power['Type'], power['Confidence']) == (98.33, 'Variable', 'Medium')
+
+def test_no_subscriptions_returns_empty_frame():
+    df = pd.DataFrame({'date': ['2024-01-01', '2024-01-02'], 'description': ['A', 'A'], 'amount': [-5.0, -5.0]})
+    assert SubscriptionDetector().detect_subscriptions(df).empty
+    assert SubscriptionDetector().detect_subscriptions(df[df['amount'] > 0]).empty
+
+def test_detect_recurring_finds_each_cadence():
+    rows = [(d, 'GYM', -20.0) for d in pd.date_range('2024-01-01', '2024-03-31', freq='7D')]
+    rows += [(d, 'NETFLIX', -15.99) for d in ['2024-01-05', '2024-02-05', '2024-03-06', '2024-04-05']]
+    rows += [(d, 'CAR INSURANCE', -300.0) for d in ['2023-04-10', '2023-07-11', '2023-10-09', '2024-01-10']]
+    rows += [(d, 'DOMAIN RENEWAL', -12.0) for d in ['2022-03-03', '2023-03-02', '2024-03-01']]
+    # Frequent but irregular spending is not recurring
+    rows += [(d, 'COFFEE', -4.0) for d in ['2024-01-02', '2024-01-03', '2024-01-09', '2024-01-30', '2024-02-14',
+                                          '2024-02-15', '2024-03-01', '2024-03-20', '2024-03-21']]
+    df = pd.DataFrame(rows, columns=['date', 'description', 'amount'])
+
+    found = SubscriptionDetector().detect_recurring(df).set_index('Description')
+    assert sorted(found.index) == ['CAR INSURANCE', 'DOMAIN RENEWAL', 'GYM', 'NETFLIX']
+    assert found.loc['GYM', ['Frequency', 'Phase', 'Next Expected']].tolist() == ['Weekly', 'Monday', '2024-04-01']
+    assert found.loc['NETFLIX', ['Frequency', 'Phase']].tolist() == ['Monthly', 'Day 5']
+    assert found.loc['CAR INSURANCE', 'Frequency'] == 'Quarterly'
+    assert found.loc['DOMAIN RENEWAL', ['Frequency', 'Period (Days)']].tolist() == ['Annual', 364.5]
+    assert (found['Confidence'] == 'High').all()
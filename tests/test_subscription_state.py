@@ -0,0 +1,85 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from src.subscription_detector import SubscriptionDetector  # type: ignore
+from src.subscription_state import SubscriptionState  # type: ignore
+
+def history():
+    rows = [(d, 'GYM', -20.0) for d in pd.date_range('2024-01-01', '2024-06-30', freq='7D')]
+    rows += [(d, 'NETFLIX', -15.99) for d in pd.date_range('2024-01-01', '2024-06-30', freq='MS') + pd.Timedelta(days=4)]
+    rows += [(d, 'CAR INSURANCE', -300.0) for d in ['2023-07-11', '2023-10-09', '2024-01-10', '2024-04-10']]
+    rows += [(d, 'COFFEE', -4.0) for d in ['2024-01-02', '2024-01-03', '2024-01-30', '2024-02-14', '2024-03-20']]
+    rows += [('2024-03-01', 'SALARY', 3000.0)]
+    df = pd.DataFrame(rows, columns=['date', 'description', 'amount'])
+    df['date'] = pd.to_datetime(df['date'])
+    return df.sort_values('date', ignore_index=True)
+
+def test_incremental_updates_match_one_pass(tmp_path):
+    df = history()
+    full = SubscriptionState()
+    assert full.update(df) == len(df) - 1
+
+    path = str(tmp_path / 'subscriptions.joblib')
+    incremental = SubscriptionState(path)
+    for rows in np.array_split(np.arange(len(df)), 4):
+        incremental.update(df.iloc[rows])
+        incremental.save()
+        incremental = SubscriptionState(path)
+        incremental.load()
+    assert incremental.update(df) == 0
+
+    # Same cadences as one detect_recurring pass over the whole history
+    one_pass = SubscriptionDetector().detect_recurring(df)
+    pd.testing.assert_frame_equal(full.subscriptions(), one_pass, check_dtype=False)
+    pd.testing.assert_frame_equal(incremental.subscriptions(), one_pass, check_dtype=False)
+    subs = incremental.subscriptions().set_index('Description')
+    assert subs['Frequency'].to_dict() == {'CAR INSURANCE': 'Quarterly', 'GYM': 'Weekly', 'NETFLIX': 'Monthly'}
+
+def test_identical_charges_are_counted_and_renamed_merchants_rekeyed():
+    class Renames:
+        """Merchant index stand-in whose canonical names can be changed."""
+        def __init__(self):
+            self.names = {}
+            self.version = 0
+
+        def canonicalize(self, descriptions):
+            return np.array([self.names.get(d, d.lower()) for d in descriptions], dtype=object)
+
+    index = Renames()
+    state = SubscriptionState(merchant_index=index)
+    df = history()
+    state.update(df[df['description'] != 'NETFLIX'])
+    # Two identical same-day charges are both kept, once
+    twice = df[df['description'] == 'COFFEE'].iloc[[0, 0]]
+    assert state.update(twice) == 1
+    assert state.update(twice) == 0
+    assert (state.charges['description'] == 'COFFEE').sum() == 6
+
+    # The merchant index merges the gym into a new canonical name
+    index.names['GYM'] = 'fitness club'
+    index.version += 1
+    assert state.update(df[df['description'] == 'NETFLIX']) == 6
+    subs = state.subscriptions().set_index('Description')
+    assert sorted(subs.index) == ['car insurance', 'fitness club', 'netflix']
+    assert set(state.charges['merchant']) == {'car insurance', 'coffee', 'fitness club', 'netflix'}
+    assert list(state.merchants.index) == ['car insurance', 'coffee', 'fitness club', 'netflix']
+    assert state.merchants.loc['fitness club', 'gap_mean'] == 7
+
+def test_rerun_with_absorbed_frame_returns_at_once(monkeypatch):
+    import src.subscription_state as module
+    df = history()
+    state = SubscriptionState()
+    state.update(df)
+    calls = []
+    monkeypatch.setattr(module, 'row_fingerprints', lambda frame: calls.append(frame))
+    assert state.update(df) == 0
+    assert calls == []
+
+def test_upcoming_calendar():
+    state = SubscriptionState()
+    state.update(history())
+    calendar = state.upcoming(days=14, today='2024-07-01')
+    assert list(calendar['Description']) == ['GYM', 'NETFLIX', 'GYM', 'CAR INSURANCE', 'GYM']
+    assert calendar['Date'].dt.strftime('%m-%d').tolist() == ['07-01', '07-05', '07-08', '07-10', '07-15']
+
+    # A year later every subscription has lapsed
+    assert state.upcoming(days=14, today='2025-07-01').empty
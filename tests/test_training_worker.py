@@ -0,0 +1,49 @@
+import pandas as pd  # type: ignore
+from src.model import ExpenseCategorizer  # type: ignore
+from src.business_model import BusinessExpenseCategorizer  # type: ignore
+from src.training_worker import TrainingWorker  # type: ignore
+
+def make_frame(n=6):
+    return pd.DataFrame({
+        'clean_description': ['uber', 'lyft', 'netflix', 'spotify', 'rent', 'landlord'][:n],
+        'category': ['Transport', 'Transport', 'Entertainment', 'Entertainment', 'Housing', 'Housing'][:n]
+    })
+
+def test_worker_trains_in_background_and_swaps(tmp_path):
+    worker = TrainingWorker(debounce_seconds=0.05)
+    categorizer = ExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'))
+    assert worker.status('personal')['state'] == 'idle'
+
+    worker.submit('personal', categorizer, 'train_incremental', make_frame())
+    assert worker.status('personal')['state'] in ('queued', 'running')
+    assert worker.wait('personal', timeout=30)
+
+    status = worker.status('personal')
+    assert status['state'] == 'done'
+    assert categorizer.is_trained and categorizer.mode == 'incremental'
+    result = categorizer.predict(pd.DataFrame({'clean_description': ['netflix']}))
+    assert result['category'].iloc[0] == 'Entertainment'
+
+def test_worker_debounces_bursts(tmp_path):
+    worker = TrainingWorker(debounce_seconds=0.3)
+    categorizer = ExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'))
+    for n in (2, 4, 6):
+        worker.submit('personal', categorizer, 'train_incremental', make_frame(n))
+    assert worker.wait('personal', timeout=30)
+
+    status = worker.status('personal')
+    assert status['state'] == 'done'
+    assert status['coalesced'] == 2
+    # Only the latest frame was trained on
+    assert len(categorizer.learned) == 6
+
+def test_worker_reports_failures_without_swapping():
+    worker = TrainingWorker(debounce_seconds=0.01)
+    categorizer = BusinessExpenseCategorizer()
+    worker.submit('business', categorizer, 'train', pd.DataFrame({'amount': [1, 2]}))
+    assert worker.wait('business', timeout=30)
+
+    status = worker.status('business')
+    assert status['state'] == 'failed'
+    assert 'description' in status['error']
+    assert not categorizer.is_trained
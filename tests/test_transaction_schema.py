@@ -0,0 +1,87 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from src.advisor import FinancialAdvisor  # type: ignore
+from src.anomaly_baselines import BaselineIndex, RunningStats  # type: ignore
+from src.merchant_index import MerchantIndex  # type: ignore
+from src.model import AnomalyDetector  # type: ignore
+from src.model_registry import frame_nbytes  # type: ignore
+from src.subscription_state import SubscriptionState  # type: ignore
+from src.transaction_schema import apply_schema, memory_report, unapply_schema  # type: ignore
+
+def processed_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    merchants = np.array([f"UPI-MERCHANT {i:03d} *PAYMENT" for i in range(300)], dtype=object)
+    categories = np.array(['Groceries', 'Dining', 'Transport', 'Shopping', 'Utilities', 'Income'], dtype=object)
+    description = rng.choice(merchants, n)
+    return pd.DataFrame({
+        'date': pd.date_range('2020-01-01', periods=n, freq='min').strftime('%Y-%m-%d').astype(object),
+        'description': description,
+        'amount': -rng.gamma(2.0, 40.0, n).round(2),
+        'clean_description': pd.Series(description).str.lower().astype(object),
+        'category': rng.choice(categories, n),
+        'is_anomaly': np.where(rng.random(n) < 0.01, -1, 1),
+        'anomaly_reason': np.where(rng.random(n) < 0.01, 'Massive Transaction (>10k)', '').astype(object)
+    })
+
+def test_schema_shrinks_session_frame():
+    df = processed_frame(1_000_000)
+    before = frame_nbytes(df)
+    optimized = apply_schema(df.copy())
+    after = frame_nbytes(optimized)
+    print(f"1M rows: {before / 1024 ** 2:,.1f} MB -> {after / 1024 ** 2:,.1f} MB")
+    assert after * 5 < before
+
+    # Same values, canonical dtypes
+    assert optimized['category'].dtype == 'category'
+    assert optimized['is_anomaly'].dtype == np.int8
+    assert optimized['date'].dtype == 'datetime64[ns]'
+    assert (optimized['description'].astype(object) == df['description']).all()
+    assert optimized['amount'].equals(df['amount'])
+
+def test_apply_schema_is_idempotent_and_lossless():
+    df = pd.DataFrame({'date': ['2024-01-01', 'not a date'], 'description': ['a', None],
+                       'amount': [-5.0, -7.5], 'is_anomaly': [1.0, np.nan]})
+    optimized = apply_schema(apply_schema(df.copy()))
+    assert list(optimized['date']) == ['2024-01-01', 'not a date']
+    assert optimized['is_anomaly'].isna().iloc[1]
+    assert optimized['description'].dtype == 'category'
+    assert unapply_schema(optimized)['description'].dtype == object
+
+def test_memory_report_and_streaming_detection_on_optimized_frame():
+    df = apply_schema(processed_frame(200))
+    report = memory_report(df)
+    assert report['column'].iloc[-1] == 'total'
+    assert report['bytes'].iloc[-1] == frame_nbytes(df)
+
+    # Appended rows may carry reasons the categorical has never seen
+    new = processed_frame(5, seed=1).drop(columns=['is_anomaly', 'anomaly_reason'])
+    new.loc[0, 'amount'] = -50000.0
+    combined = pd.concat([df, new], ignore_index=True)
+    result = apply_schema(AnomalyDetector(running=RunningStats()).detect_new(combined))
+    assert result['is_anomaly'].notna().all()
+    assert result['anomaly_reason'].dtype == 'category'
+
+def test_consumers_accept_categorical_descriptions_with_gaps():
+    dates = pd.date_range('2024-01-05', periods=8, freq='MS')
+    df = pd.DataFrame({
+        'date': list(dates) + [dates[-1]],
+        'description': ['NETFLIX.COM 8231'] * 8 + [np.nan],
+        'amount': [-15.99] * 8 + [-40.0],
+        'category': ['Entertainment'] * 9
+    })
+    df['clean_description'] = df['description'].str.lower()
+    df = apply_schema(df)
+    assert isinstance(df['description'].dtype, pd.CategoricalDtype)
+
+    insights = FinancialAdvisor(df, 1000).generate_actionable_insights()
+    assert any(i['title'] == 'Habit Spotted' for i in insights)
+    insights = FinancialAdvisor(df, 1000, merchant_index=MerchantIndex()).generate_actionable_insights()
+    assert any("'netflix com'" in i['text'] for i in insights)
+
+    baselines = BaselineIndex(merchant_index=MerchantIndex())
+    assert baselines.update(df) == 9
+    assert baselines.score(df)['baseline'].iloc[0] == 'merchant'
+
+    state = SubscriptionState(merchant_index=MerchantIndex())
+    assert state.update(df) == 8
+    assert list(state.subscriptions()['Description']) == ['netflix com']
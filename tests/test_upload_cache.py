@@ -0,0 +1,42 @@
+import os
+import pandas as pd  # type: ignore
+from src.upload_cache import UploadCache  # type: ignore
+
+def frame(n):
+    return pd.DataFrame({
+        'date': ['2024-01-01'] * n,
+        'description': ['Coffee Shop'] * n,
+        'amount': [-4.5] * n,
+        'category': ['Dining'] * n,
+        'is_anomaly': [1] * n
+    })
+
+def test_key_depends_on_bytes_and_model_version():
+    assert UploadCache.key(b'a,b\n1,2\n', 'v1') == UploadCache.key(b'a,b\n1,2\n', 'v1')
+    assert UploadCache.key(b'a,b\n1,2\n', 'v1') != UploadCache.key(b'a,b\n1,2\n', 'v2')
+    assert UploadCache.key(b'a,b\n1,2\n', 'v1') != UploadCache.key(b'a,b\n1,3\n', 'v1')
+
+def test_round_trip_and_miss(tmp_path):
+    cache = UploadCache(str(tmp_path / 'cache'))
+    key = cache.key(b'statement', 'v1')
+    assert cache.get(key) is None
+
+    df = frame(3)
+    cache.put(key, df)
+    loaded = cache.get(key)
+    assert loaded.astype(object).equals(df.astype(object))
+    assert cache.stats()['entries'] == 1
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = UploadCache(str(tmp_path / 'cache'))
+    for name in ('a', 'b'):
+        cache.put(name, frame(1000))
+    cache.max_bytes = cache.stats()['nbytes']
+    # Reading 'a' makes 'b' the least recently used entry
+    os.utime(os.path.join(cache.root, 'a'), (0, 0))
+    os.utime(os.path.join(cache.root, 'b'), (0, 0))
+    assert cache.get('a') is not None
+
+    cache.put('c', frame(1000))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None